@@ -0,0 +1,120 @@
+"""
+Memory used per node of a large form.
+
+Builds (offscreen) the form of an array of objects, whose items each have an `id` scope and dereference a definition,
+and reports the Python memory allocated per widget, with the number of distinct contexts (and schema nodes, where
+widgets share them) held by the widgets. Memory allocated by Qt itself is not traced. The schema is written to a
+temporary directory, with the document of its `id` scope, so that its references resolve.
+
+Run from a checkout (without installing the package), the package of that checkout is measured:
+
+    python benchmarks/memory.py --items 10000
+
+Widgets are found through their Qt children, so that the benchmark also runs against revisions predating
+`iter_json_children`, to compare them. The package found on PYTHONPATH takes precedence over that of the checkout:
+
+    PYTHONPATH=<checkout of other revision> python benchmarks/memory.py
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import click
+from PyQt5 import QtWidgets
+
+# Fall back to the package of this checkout, after any found on PYTHONPATH
+sys.path.append(str(Path(__file__).absolute().parents[1]))
+
+import qtjsonschema
+from qtjsonschema.widgets import JSONBaseWidget, create_widget
+
+
+def create_item_schema() -> dict:
+    return {
+        "id": "item.json",
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "count": {"type": "integer"},
+            "enabled": {"type": "boolean"},
+            "position": {"$ref": "#/definitions/position"},
+        },
+        "definitions": {
+            "position": {
+                "type": "object",
+                "properties": {
+                    "x": {"type": "number"},
+                    "y": {"type": "number"},
+                },
+            },
+        },
+    }
+
+
+def write_schema(directory: Path) -> tuple:
+    """Write the schema, and the document of the `id` scope of its items, returning the schema and its URI"""
+    item_schema = create_item_schema()
+    schema = {"type": "array", "items": item_schema}
+
+    (directory / "item.json").write_text(json.dumps(item_schema))
+    schema_path = directory / "root.json"
+    schema_path.write_text(json.dumps(schema))
+
+    return schema, schema_path.as_uri()
+
+
+def create_document(items: int) -> list:
+    return [{"name": "Item {}".format(i), "count": i, "enabled": i % 2 == 0, "position": {"x": i, "y": -i}}
+            for i in range(items)]
+
+
+def iter_widgets(widget: JSONBaseWidget):
+    """Iterate over a widget and its (built) descendants"""
+    yield widget
+    yield from (w for w in widget.findChildren(QtWidgets.QWidget) if isinstance(w, JSONBaseWidget))
+
+
+@click.command()
+@click.option('--items', default=2000, help='Number of array items.')
+def measure_memory(items):
+    """Report the Python memory allocated per widget of a large form."""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = QtWidgets.QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        schema, schema_uri = write_schema(Path(directory))
+        document = create_document(items)
+
+        gc.collect()
+        tracemalloc.start()
+        start, _ = tracemalloc.get_traced_memory()
+
+        widget = create_widget("root", schema, schema_uri)
+        widget.load_json_object(document)
+        app.processEvents()
+
+        gc.collect()
+        end, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    widgets = list(iter_widgets(widget))
+    contexts = {id(w.ctx) for w in widgets}
+    summary = "{} widgets, {} contexts".format(len(widgets), len(contexts))
+
+    # Widgets of earlier revisions hold their schema and context themselves
+    if hasattr(widget, 'node'):
+        summary += ", {} schema nodes".format(len({id(w.node) for w in widgets}))
+
+    click.echo("Measured {}".format(Path(qtjsonschema.__file__).parent))
+    click.echo(summary)
+    click.echo("{:.0f} bytes per widget ({:.1f} MiB, peak {:.1f} MiB)".format(
+        (end - start) / len(widgets), (end - start) / 2 ** 20, (peak - start) / 2 ** 20))
+
+
+if __name__ == "__main__":
+    measure_memory()
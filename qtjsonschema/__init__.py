@@ -1,2 +1,13 @@
 version = '0.1.0'
-from .widgets import create_widget
+from .defaults import generate_default_instance
+
+__all__ = ['create_widget', 'generate_default_instance', 'version']
+
+
+def __getattr__(name):
+    # Widgets (and so Qt) are imported on first use, so that the other modules can be used without Qt
+    if name == 'create_widget':
+        from .widgets import create_widget
+        return create_widget
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -7,52 +7,154 @@ Filling the form will generate JSON.
 """
 
 import collections
+import getpass
 import json
-from json import dumps
+import os
 from pathlib import Path
 
 import click
-from PyQt5 import QtCore, QtWidgets
-from jsonschema import Draft4Validator, FormatChecker
+from PyQt5 import QtCore, QtNetwork, QtWidgets
+from jsonschema import FormatChecker, SchemaError
 
-from .widgets import create_widget
+from .diff import diff_widget
+from .latency import EventRecorder
+from .offsets import LazyJSONArray, LazyJSONObject, open_lazy_json
+from .progressive import ProgressiveBuilder
+from .serialise import write_json
+from .session import SchemaSession, SessionCache
+from .style import install_stylesheet, set_different, set_state
+
+# Size of JSON files (in bytes) from which values are indexed and parsed on demand
+LAZY_LOAD_SIZE = 64 * 1024 * 1024
+
+
+def _get_user_id() -> str:
+    """Return the id of the current user (the user name where there are no numeric ids)"""
+    if hasattr(os, 'getuid'):
+        return str(os.getuid())
+    return getpass.getuser()
+
+
+# Local socket name of the single-instance editor server, which is private to each user
+SERVER_NAME = "qtjsonschema-editor-{}".format(_get_user_id())
+
+# Time within which a connection to the editor server must send its request (milliseconds)
+REQUEST_TIMEOUT = 5000
+
+# Time for which the editor server remains after its last window is closed (milliseconds)
+RESIDENT_TIMEOUT = 10 * 60 * 1000
+
+# Options which may be handed to the editor server
+SERVER_REQUEST_OPTIONS = frozenset(['schema', 'json_files', 'sort_keys', 'indent', 'watch_schema', 'progressive',
+                                    'lazy_load_size', 'bundle_path'])
+
+
+class DocumentView(QtWidgets.QScrollArea):
+    """Scrollable region holding the form of a single document"""
+
+    def __init__(self, schema_widget, parent=None, builder=None):
+        super().__init__(parent)
+
+        self.schema_widget = schema_widget
+        self.builder = builder
+        self.file_path = None
+        self.differences = []
+
+        # Whether values of the document are parsed on demand from a large file
+        self.is_lazy = False
+
+        self.setWidget(schema_widget)
+        self.setWidgetResizable(True)
+
+    def set_schema_widget(self, schema_widget):
+        if schema_widget is self.schema_widget:
+            return
+
+        self.takeWidget().deleteLater()
+        self.schema_widget = schema_widget
+        self.setWidget(schema_widget)
 
 
 class MainWindow(QtWidgets.QWidget):
-    schema = None
 
-    def __init__(self, parent=None, validation_interval=100):
+    def __init__(self, parent=None, validation_interval=100, sort_keys=True, indent=4, watch_schema=False,
+                 reload_delay=200, progressive=False, lazy_load_size=LAZY_LOAD_SIZE, session_cache=None,
+                 bundle_path=None):
         QtWidgets.QWidget.__init__(self, parent)
 
+        self.sort_keys = sort_keys
+        self.indent = indent
+        self.watch_schema = watch_schema
+        self.progressive = progressive
+        self.lazy_load_size = lazy_load_size
+        self.session_cache = session_cache
+        self.bundle_path = bundle_path
+
         self.setWindowTitle("PyQt JSON Schema Editor")
 
         self.menu = QtWidgets.QMenuBar(self)
         self.file_menu = self.menu.addMenu("&File")
 
+        _action_new_document = QtWidgets.QAction("&New Document", self)
+        _action_new_document.triggered.connect(self._handle_new_document)
+
         _action_open_json = QtWidgets.QAction("&Open File", self)
         _action_open_json.triggered.connect(self._handle_open_json)
 
+        _action_open_json_tab = QtWidgets.QAction("Open File in New &Tab", self)
+        _action_open_json_tab.triggered.connect(self._handle_open_json_tab)
+
         _action_open_schema = QtWidgets.QAction("Open &JSON Schema", self)
         _action_open_schema.triggered.connect(self._handle_open_schema)
 
         _action_save = QtWidgets.QAction("&Save", self)
         _action_save.triggered.connect(self._handle_save)
 
+        _action_compare = QtWidgets.QAction("Co&mpare with File", self)
+        _action_compare.triggered.connect(self._handle_compare)
+
+        _action_clear_comparison = QtWidgets.QAction("C&lear Comparison", self)
+        _action_clear_comparison.triggered.connect(self.clear_comparison)
+
         _action_quit = QtWidgets.QAction("&Close", self)
         _action_quit.triggered.connect(self._handle_quit)
 
+        self.file_menu.addAction(_action_new_document)
         self.file_menu.addAction(_action_open_json)
+        self.file_menu.addAction(_action_open_json_tab)
         self.file_menu.addAction(_action_open_schema)
         self.file_menu.addAction(_action_save)
         self.file_menu.addSeparator()
+        self.file_menu.addAction(_action_compare)
+        self.file_menu.addAction(_action_clear_comparison)
+        self.file_menu.addSeparator()
         self.file_menu.addAction(_action_quit)
 
-        # Scrollable region for schema form
-        self.content_region = QtWidgets.QScrollArea(self)
-        self.schema_widget = None
-        self.schema = None
+        # Tabbed region of open documents, each sharing the schema session
+        self.documents = QtWidgets.QTabWidget(self)
+        self.documents.setTabsClosable(True)
+        self.documents.setMovable(True)
+        self.documents.tabCloseRequested.connect(self.close_document)
+        self.documents.currentChanged.connect(self._current_document_changed)
+        self.session = None
+        self.schema_path = None
+
+        # Reload schema when changed on disk, once writes have settled
+        self._schema_watcher = QtCore.QFileSystemWatcher(self)
+        self._schema_watcher.fileChanged.connect(self._schema_file_changed)
+
+        self._reload_timer = QtCore.QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(reload_delay)
+        self._reload_timer.timeout.connect(self.reload_schema)
 
         self._validation_label = QtWidgets.QLabel()
+        self._comparison_label = QtWidgets.QLabel()
+        self._comparison_label.hide()
+
+        self._progress_bar = QtWidgets.QProgressBar()
+        self._progress_bar.setFormat("Building form: %v of %m")
+        self._progress_bar.hide()
         self._format_checker = FormatChecker()
 
         self._validation_timer = QtCore.QTimer(self)
@@ -62,7 +164,9 @@ class MainWindow(QtWidgets.QWidget):
         vbox = QtWidgets.QVBoxLayout()
         vbox.addWidget(self.menu)
         vbox.addWidget(self._validation_label)
-        vbox.addWidget(self.content_region)
+        vbox.addWidget(self._comparison_label)
+        vbox.addWidget(self._progress_bar)
+        vbox.addWidget(self.documents)
         vbox.setContentsMargins(0, 0, 0, 0)
 
         hbox = QtWidgets.QHBoxLayout()
@@ -75,52 +179,216 @@ class MainWindow(QtWidgets.QWidget):
     def format_checker(self) -> FormatChecker:
         return self._format_checker
 
+    @property
+    def schema(self):
+        if self.session is None:
+            return None
+        return self.session.schema
+
+    @property
+    def schema_widget(self):
+        """Root widget of the current document"""
+        document = self.documents.currentWidget()
+        if document is None:
+            return None
+        return document.schema_widget
+
     def load_schema(self, file_path):
         """
-            Load a schema and create the root element.
+            Load a schema, closing open documents and creating an empty document.
         """
-        schema_path = Path(file_path) #.absolute()
-        schema_path_absolute = Path(file_path).absolute()
-        with schema_path.open() as f:
-            schema = json.loads(f.read(), object_pairs_hook=collections.OrderedDict)
+        self.set_session(self._load_session(file_path))
+
+        if self.schema_path is not None:
+            self._schema_watcher.removePath(self.schema_path)
 
-        Draft4Validator.check_schema(schema)
+        self.schema_path = str(Path(file_path).absolute())
+        if self.watch_schema:
+            self._schema_watcher.addPath(self.schema_path)
+
+    def reload_schema(self):
+        """
+            Reload the schema from disk, rebuilding only the parts of open documents whose schema has changed.
+        """
+        try:
+            session = self._load_session(self.schema_path)
+        except (OSError, ValueError, SchemaError) as err:
+            self._validation_label.setText("Schema could not be reloaded:\n{}".format(err))
+            set_state(self._validation_label, "invalid")
+            return
+
+        for index in range(self.documents.count()):
+            document = self.documents.widget(index)
+            document.set_schema_widget(session.reload_widget(document.schema_widget))
+
+        self.session = session
+        self.setWindowTitle("{} - PyQt JSON Schema".format(session.title))
+
+    def _load_session(self, file_path) -> SchemaSession:
+        if self.session_cache is not None:
+            return self.session_cache.get(file_path, self._format_checker, self.bundle_path)
+        return SchemaSession.from_file(file_path, self._format_checker, self.bundle_path)
+
+    def set_session(self, session: SchemaSession):
+        """
+            Edit documents of the given schema session, closing open documents and creating an empty document.
+        """
+        while self.documents.count():
+            self.close_document(0)
 
-        schema_title = schema.get("title", "<root>")
-        self.setWindowTitle("{} - PyQt JSON Schema".format(schema_title))
-        self.schema_widget = create_widget(schema_title, schema, schema_path_absolute.as_uri())
-        self.content_region.setWidget(self.schema_widget)
-        self.content_region.setWidgetResizable(True)
-        self.schema = schema
+        self.session = session
+        self.setWindowTitle("{} - PyQt JSON Schema".format(session.title))
+        self.new_document()
 
         self._validation_timer.start()
 
-    def load_json(self, json_file):
+    def new_document(self) -> DocumentView:
         """
-            Load a schema and create the root element.
+            Create a new, empty document from the current schema session.
+        """
+        builder = None
+        if self.progressive:
+            builder = ProgressiveBuilder(self)
+
+        document = DocumentView(self.session.create_widget(builder), self, builder)
+        index = self.documents.addTab(document, "Untitled")
+        self.documents.setCurrentIndex(index)
+
+        if builder is not None:
+            builder.progress.connect(lambda built, deferred: self._build_progress(document, built, deferred))
+            builder.finished.connect(lambda: self._build_finished(document))
+
+        return document
+
+    def close_document(self, index):
+        document = self.documents.widget(index)
+        self.documents.removeTab(index)
+
+        if document.builder is not None:
+            document.builder.cancel()
+            document.builder.deleteLater()
+
+        document.deleteLater()
+
+    def load_json(self, json_file, new_document=False):
+        """
+            Load a JSON file into the current document, or into a new document.
+            Large files are indexed, and the items of their arrays parsed when first displayed.
+        """
+        if os.path.getsize(json_file) >= self.lazy_load_size:
+            data = open_lazy_json(json_file)
+        else:
+            with open(json_file) as f:
+                data = json.loads(f.read(), object_pairs_hook=collections.OrderedDict)
+
+        document = self.documents.currentWidget()
+        if new_document or document is None:
+            document = self.new_document()
+
+        document.schema_widget.load_json_object(data)
+        document.file_path = json_file
+        document.is_lazy = document.is_lazy or isinstance(data, (LazyJSONObject, LazyJSONArray))
+        self.documents.setTabText(self.documents.indexOf(document), Path(json_file).name)
+
+    def compare_json(self, json_file):
+        """
+            Highlight the fields of the current document which differ from a JSON file, and return the differences.
         """
         with open(json_file) as f:
             data = json.loads(f.read(), object_pairs_hook=collections.OrderedDict)
-            # from jsonschema import validate
-            # validate(data, self.schema)
-            self.schema_widget.load_json_object(data)
+
+        self.clear_comparison()
+
+        document = self.documents.currentWidget()
+        document.differences = diff_widget(document.schema_widget, data)
+        for difference in document.differences:
+            set_different(difference.widget, True)
+
+        count = len(document.differences)
+        self._comparison_label.setText("{} {} from {}".format(count, "difference" if count == 1 else "differences",
+                                                              Path(json_file).name))
+        self._comparison_label.show()
+
+        return document.differences
+
+    def clear_comparison(self):
+        """
+            Remove the highlighting of differences from the current document.
+        """
+        document = self.documents.currentWidget()
+        if document is not None:
+            for difference in document.differences:
+                try:
+                    set_different(difference.widget, False)
+                except RuntimeError:
+                    pass  # Widget has since been deleted
+            document.differences = []
+
+        self._comparison_label.hide()
+
+    def _current_document_changed(self, index):
+        # Comparisons are made per document
+        document = self.documents.currentWidget()
+        if document is None or not document.differences:
+            self._comparison_label.hide()
+
+        if document is None or document.builder is None or not document.builder.is_active:
+            self._progress_bar.hide()
+
+    def _build_progress(self, document, built, deferred):
+        if document is not self.documents.currentWidget():
+            return
+
+        self._progress_bar.setRange(0, deferred)
+        self._progress_bar.setValue(built)
+        self._progress_bar.show()
+
+    def _build_finished(self, document):
+        if document is self.documents.currentWidget():
+            self._progress_bar.hide()
+
+    def _schema_file_changed(self, path):
+        # Editors which replace the file on save cause it to be removed from the watcher
+        if path not in self._schema_watcher.files() and Path(path).exists():
+            self._schema_watcher.addPath(path)
+
+        self._reload_timer.start()
 
     def _do_validation(self):
         label = self._validation_label
 
-        validator = Draft4Validator(self.schema, format_checker=self._format_checker)
+        schema_widget = self.schema_widget
+        if schema_widget is None:
+            label.setText("")
+            return
+
+        # Validation would build the remainder of a progressively built form at once
+        document = self.documents.currentWidget()
+        if document.builder is not None and document.builder.is_active:
+            return
 
-        errors = [err for err in validator.iter_errors(self.schema_widget.dump_json_object())]
+        # Nor is a large document parsed in full on every change
+        if document.is_lazy:
+            label.setText("Live validation is paused for large documents")
+            set_state(label, None)
+            return
+
+        errors = [err for err in self.session.iter_errors(schema_widget.dump_json_object())]
         if errors:
             error = errors[0]
             error_string = ("{} errors" if len(errors) > 1 else "{} error").format(len(errors))
-            label.setText("{}.\nFirst error in {}:\n{}".format(error_string, '#/' + '/'.join(error.schema_path),
-                                                               error.message))
-            label.setStyleSheet("QLabel { color: red; }")
+            label.setText("{}.\nFirst error at {} in {}:\n{}".format(
+                error_string, '/' + '/'.join(str(p) for p in error.path),
+                '#/' + '/'.join(str(p) for p in error.schema_path), error.message))
+            set_state(label, "invalid")
 
         else:
             label.setText("Object validates")
-            label.setStyleSheet("QLabel { color: green; }")
+            set_state(label, "valid")
+
+    def _handle_new_document(self):
+        if self.session is not None:
+            self.new_document()
 
     def _handle_open_json(self):
         # Open JSON File
@@ -128,6 +396,15 @@ class MainWindow(QtWidgets.QWidget):
         if json_file:
             self.load_json(json_file)
 
+    def _handle_open_json_tab(self):
+        # Open JSON File in a new document
+        if self.session is None:
+            return
+
+        json_file, _ = QtWidgets.QFileDialog.getOpenFileName(self, 'Open Schema', filter="JSON File (*.json)")
+        if json_file:
+            self.load_json(json_file, new_document=True)
+
     def _handle_open_schema(self):
         # Open JSON Schema
         schema, _ = QtWidgets.QFileDialog.getOpenFileName(self, 'Open Schema', filter="JSON Schema (*.schema *.json)")
@@ -136,32 +413,240 @@ class MainWindow(QtWidgets.QWidget):
 
     def _handle_save(self):
         # Save JSON output
-        obj = self.content_region.widget().dump_json_object()
+        schema_widget = self.schema_widget
+        if schema_widget is None:
+            return
+
         outfile, _ = QtWidgets.QFileDialog.getSaveFileName(self, 'Save JSON', filter="JSON (*.json)")
         if outfile:
-            with open(outfile, 'w') as f:
-                f.write(dumps(obj, sort_keys=True, indent=4))
+            write_json(outfile, schema_widget, indent=self.indent, sort_keys=self.sort_keys)
+
+    def _handle_compare(self):
+        # Compare current document with a JSON file
+        if self.schema_widget is None:
+            return
+
+        json_file, _ = QtWidgets.QFileDialog.getOpenFileName(self, 'Compare with File', filter="JSON File (*.json)")
+        if json_file:
+            self.compare_json(json_file)
 
     def _handle_quit(self):
         # TODO: Check if saved?
         self.close()
 
 
+def open_editor_window(schema=None, json_files=(), **options) -> MainWindow:
+    """
+        Show an editor window, loading a schema and JSON files (each opening in a new tab).
+        The window is closed if they cannot be loaded.
+    """
+    main_window = MainWindow(**options)
+    main_window.show()
+    main_window.resize(1000, 800)
+
+    try:
+        if schema:
+            main_window.load_schema(schema)
+            for i, json_file in enumerate(json_files):
+                main_window.load_json(json_file, new_document=i > 0)
+    except BaseException:
+        main_window.close()
+        main_window.deleteLater()
+        raise
+
+    return main_window
+
+
+class EditorServer(QtCore.QObject):
+    """Resident editor process, opening windows on behalf of later invocations of the editor.
+
+    Invocations hand their options over a local socket, as a line of JSON. Windows share a session cache, so that
+    each schema (and the resources it references) is loaded and checked only once, for as long as it is unchanged.
+    """
+
+    def __init__(self, parent=None, resident_timeout=RESIDENT_TIMEOUT, request_timeout=REQUEST_TIMEOUT):
+        super().__init__(parent)
+
+        self.session_cache = SessionCache()
+        self.windows = []
+        self.request_timeout = request_timeout
+
+        # Only the user running the server may connect to it
+        self._server = QtNetwork.QLocalServer(self)
+        self._server.setSocketOptions(QtNetwork.QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self._new_connection)
+
+        self._quit_timer = QtCore.QTimer(self)
+        self._quit_timer.setSingleShot(True)
+        self._quit_timer.setInterval(resident_timeout)
+        self._quit_timer.timeout.connect(QtWidgets.QApplication.quit)
+
+    def listen(self, name=SERVER_NAME) -> bool:
+        if self._server.listen(name):
+            return True
+
+        # The socket of a server which did not shut down cleanly is removed, but not that of a server which is busy
+        if self._server.serverError() != QtNetwork.QAbstractSocket.AddressInUseError or not _is_server_stale(name):
+            return False
+
+        QtNetwork.QLocalServer.removeServer(name)
+        return self._server.listen(name)
+
+    def open_window(self, schema=None, json_files=(), **options) -> MainWindow:
+        self._quit_timer.stop()
+
+        window = open_editor_window(schema, json_files, session_cache=self.session_cache, **options)
+        window.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+        window.destroyed.connect(lambda: self._window_closed(window))
+        self.windows.append(window)
+
+        return window
+
+    def _window_closed(self, window):
+        self.windows.remove(window)
+        if not self.windows:
+            self._quit_timer.start()
+
+    # Unlike a closure over the socket, which may be collected (with its connection) if nothing else refers to the
+    # socket, a slot of the server remains connected for as long as the socket
+    @QtCore.pyqtSlot()
+    def _socket_ready_read(self):
+        self._read_request(self.sender())
+
+    def _new_connection(self):
+        socket = self._server.nextPendingConnection()
+        socket.disconnected.connect(socket.deleteLater)
+        socket.readyRead.connect(self._socket_ready_read)
+
+        # Connections which do not send a whole request in time are dropped
+        timer = QtCore.QTimer(socket)
+        timer.setSingleShot(True)
+        timer.timeout.connect(socket.abort)
+        timer.start(self.request_timeout)
+
+    def _read_request(self, socket):
+        if not socket.canReadLine():
+            return
+
+        line = bytes(socket.readLine())
+        socket.disconnectFromServer()
+        socket.deleteLater()
+
+        try:
+            request = json.loads(line.decode())
+            if not isinstance(request, dict):
+                raise ValueError("Request is not a JSON object")
+
+            unknown_options = request.keys() - SERVER_REQUEST_OPTIONS
+            if unknown_options:
+                raise ValueError("Unknown options {}".format(", ".join(sorted(unknown_options))))
+
+            self.open_window(**request)
+
+        # Besides unreadable files and schemas, documents which do not fit their schema fail to load with any
+        # exception, which would abort the server (and close its windows) were it to escape this slot
+        except Exception as err:
+            QtWidgets.QMessageBox.warning(None, "PyQt JSON Schema Editor", "Could not open editor:\n{}".format(err))
+            if not self.windows:
+                self._quit_timer.start()
+
+
+def _is_server_stale(name: str, timeout=1000) -> bool:
+    """Return True if the socket of a server remains, but no server accepts connections on it"""
+    socket = QtNetwork.QLocalSocket()
+    socket.connectToServer(name)
+    if socket.waitForConnected(timeout):
+        socket.disconnectFromServer()
+        return False
+
+    return socket.error() == QtNetwork.QLocalSocket.ConnectionRefusedError
+
+
+def send_to_server(request: dict, name=SERVER_NAME, timeout=1000) -> bool:
+    """
+        Hand the options of an editor window to a running editor server, returning False if there is none.
+    """
+    socket = QtNetwork.QLocalSocket()
+    socket.connectToServer(name)
+    if not socket.waitForConnected(timeout):
+        return False
+
+    socket.write(json.dumps(request).encode() + b'\n')
+    socket.waitForBytesWritten(timeout)
+    socket.disconnectFromServer()
+    if socket.state() != QtNetwork.QLocalSocket.UnconnectedState:
+        socket.waitForDisconnected(timeout)
+
+    return True
+
+
+def _parse_indent(ctx, param, value):
+    """Return the indentation of saved JSON given on the command line, None (for a single line) if given as `none`
+    or -1"""
+    if value.lower() in ('none', '-1'):
+        return None
+
+    try:
+        indent = int(value)
+    except ValueError:
+        indent = -1
+
+    if indent < 0:
+        raise click.BadParameter("must be a number of spaces, or 'none' for a single line")
+    return indent
+
+
 @click.command()
 @click.option('--schema', default=None, help='Schema file to generate an editing window from.')
-@click.option('--json', default=None, help='Schema file to generate an editing window from.')
-def json_editor(schema, json):
+@click.option('--json', default=None, multiple=True,
+              help='JSON file to edit. May be given several times, each opening in a new tab.')
+@click.option('--sort-keys/--schema-order', default=True, help='Order of object keys in saved JSON.')
+@click.option('--indent', default='4', callback=_parse_indent, metavar='INTEGER|none',
+              help="Indentation of saved JSON, or 'none' to save it on a single line.")
+@click.option('--watch', is_flag=True, help='Reload the schema when it changes on disk, preserving entered values.')
+@click.option('--progressive', is_flag=True, help='Build the form progressively, keeping the window responsive.')
+@click.option('--lazy-load-size', default=LAZY_LOAD_SIZE,
+              help='Size (in bytes) of JSON files from which array items are only parsed when displayed.')
+@click.option('--record-latency', default=None,
+              help='File to which to record input events, for replay by qtjsonschema.latency.')
+@click.option('--single-instance', is_flag=True,
+              help='Open in a running editor (keeping its schemas loaded), or start one for later invocations.')
+@click.option('--bundle', default=None,
+              help='Bundle (made by qtjsonschema.bundle) from which to load the documents referenced by the schema.')
+def json_editor(schema, json, sort_keys, indent, watch, progressive, lazy_load_size, record_latency,
+                single_instance, bundle):
     import sys
 
-    app = QtWidgets.QApplication(sys.argv)
-    main_window = MainWindow()
-    main_window.show()
-    main_window.resize(1000, 800)
+    # Windows of a running editor server are not recorded
+    if single_instance and record_latency:
+        raise click.UsageError("--record-latency cannot be used with --single-instance")
 
-    if schema:
-        main_window.load_schema(schema)
-        if json:
-            main_window.load_json(json)
+    options = dict(sort_keys=sort_keys, indent=indent, watch_schema=watch, progressive=progressive,
+                   lazy_load_size=lazy_load_size, bundle_path=bundle)
+
+    if single_instance:
+        # Paths are resolved here, as the server may run in another directory
+        request = dict(options, schema=schema and os.path.abspath(schema),
+                       bundle_path=bundle and os.path.abspath(bundle),
+                       json_files=[os.path.abspath(f) for f in json])
+        if send_to_server(request):
+            return
+
+    app = QtWidgets.QApplication(sys.argv)
+    install_stylesheet(app)
+
+    if single_instance:
+        server = EditorServer(app)
+        if server.listen():
+            app.setQuitOnLastWindowClosed(False)
+        main_window = server.open_window(**request)
+    else:
+        main_window = open_editor_window(schema, json, **options)
+
+    if record_latency:
+        recorder = EventRecorder(main_window, options)
+        recorder.start()
+        app.aboutToQuit.connect(lambda: recorder.save(record_latency))
 
     app.exec_()
 
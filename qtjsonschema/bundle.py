@@ -0,0 +1,275 @@
+"""
+Offline schema bundles.
+
+A bundle holds a schema and every document it references (directly or not), so that its references resolve without
+network access, and from a single file. Documents are stored one after another, followed by an index of their URIs and
+byte ranges; the bundle is memory-mapped, and each document is parsed only when first referenced.
+
+Documents are recorded relative to the root schema (unless on another host), and are served relative to wherever the
+root schema is found, so that a schema family may be bundled on one machine and used at another path on another.
+
+    python -m qtjsonschema.bundle schema.json schema.bundle
+    python -m qtjsonschema --schema schema.json --bundle schema.bundle
+"""
+
+import collections
+import json
+import mmap
+import os
+import posixpath
+import struct
+import tempfile
+from collections.abc import Mapping, Sequence
+
+import click
+from uritools import uricompose, urijoin, urisplit
+
+from .tools import ResourceLoader, URILoaderRegistry, create_default_uri_loader_registry
+
+BUNDLE_MAGIC = b'QTJSBNDL'
+BUNDLE_VERSION = 1
+
+# Magic, then the byte range of the index
+_HEADER = struct.Struct('<8sQQ')
+
+# Draft 4 keywords holding a schema, an array of schemas, or an object of schemas
+_SCHEMA_KEYWORDS = ('additionalItems', 'additionalProperties', 'items', 'not')
+_SCHEMA_ARRAY_KEYWORDS = ('allOf', 'anyOf', 'oneOf', 'items')
+_SCHEMA_OBJECT_KEYWORDS = ('properties', 'patternProperties', 'definitions', 'dependencies')
+
+
+def get_document_uri(uri: str) -> str:
+    """Return URI of the document holding the given URI (without its fragment)"""
+    result = urisplit(uri)
+    return uricompose(result.scheme, result.authority, result.path)
+
+
+def get_relative_uri(uri: str, base_uri: str) -> str:
+    """Return a reference to a URI relative to a base URI, or the URI itself if on another scheme or authority"""
+    result, base_result = urisplit(uri), urisplit(base_uri)
+    if ((result.scheme, result.authority) != (base_result.scheme, base_result.authority)
+            or not result.path.startswith('/') or not base_result.path.startswith('/')):
+        return uri
+
+    relative = posixpath.relpath(result.path, posixpath.dirname(base_result.path))
+
+    # A first segment containing a colon would be read as a scheme
+    if ':' in relative.split('/', 1)[0]:
+        relative = './' + relative
+    return relative
+
+
+def iter_references(schema: dict, scope_uri: str):
+    """Iterate over the (absolute) URIs of the references of a schema document, following `id` scope changes
+
+    :param schema: dict-like JSON object
+    :param scope_uri: URI of schema document
+    """
+    stack = [(schema, scope_uri)]
+
+    while stack:
+        schema, scope_uri = stack.pop()
+        if not isinstance(schema, Mapping):
+            continue
+
+        if isinstance(schema.get('id'), str):
+            scope_uri = urijoin(scope_uri, schema['id'])
+
+        if isinstance(schema.get('$ref'), str):
+            yield urijoin(scope_uri, schema['$ref'])
+
+        for keyword in _SCHEMA_KEYWORDS:
+            if keyword in schema:
+                stack.append((schema[keyword], scope_uri))
+
+        for keyword in _SCHEMA_ARRAY_KEYWORDS:
+            if isinstance(schema.get(keyword), Sequence):
+                stack.extend((s, scope_uri) for s in schema[keyword])
+
+        for keyword in _SCHEMA_OBJECT_KEYWORDS:
+            if isinstance(schema.get(keyword), Mapping):
+                stack.extend((s, scope_uri) for s in schema[keyword].values())
+
+
+def crawl_schema(schema: dict, schema_uri: str, registry: URILoaderRegistry = None) -> dict:
+    """Return the documents of a schema and those it references, by URI (the schema first)
+
+    Referenced documents are loaded through the registry, and so from wherever the editor would load them.
+
+    :param schema: dict-like JSON object
+    :param schema_uri: absolute URI of schema document
+    :param registry: URILoaderRegistry used to load referenced documents (created if omitted)
+    """
+    if registry is None:
+        registry = create_default_uri_loader_registry(schema, schema_uri)
+
+    root_uri = get_document_uri(schema_uri)
+    documents = collections.OrderedDict([(root_uri, schema)])
+    pending = [root_uri]
+
+    while pending:
+        document_uri = pending.pop()
+
+        for uri in iter_references(documents[document_uri], document_uri):
+            uri = get_document_uri(uri)
+            if uri not in documents:
+                documents[uri] = registry.load_uri(uri)
+                pending.append(uri)
+
+    return documents
+
+
+def write_bundle(file_path: str, documents: dict):
+    """Write documents to a bundle file, replacing it atomically
+
+    :param file_path: path to bundle file
+    :param documents: JSON documents by absolute URI, the root schema first
+    """
+    root_uri = next(iter(documents), None)
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(bytes(_HEADER.size))
+
+            ranges = collections.OrderedDict()
+            for uri, document in documents.items():
+                start = f.tell()
+                f.write(json.dumps(document, separators=(',', ':')).encode())
+                ranges[get_relative_uri(uri, root_uri)] = [start, f.tell()]
+
+            index = {
+                'version': BUNDLE_VERSION,
+                'root': root_uri,
+                'documents': ranges,
+            }
+
+            index_start = f.tell()
+            f.write(json.dumps(index).encode())
+            index_end = f.tell()
+
+            f.seek(0)
+            f.write(_HEADER.pack(BUNDLE_MAGIC, index_start, index_end))
+
+        os.replace(temp_path, file_path)
+
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class BundleResourceLoader(ResourceLoader):
+    """ResourceLoader corresponding to the documents of a bundle file.
+
+    Documents are served relative to the URI of the root schema, being that at which it was bundled unless given. A
+    root document given with its URI is served in place of the bundled copy (which may be out of date).
+    """
+
+    def __init__(self, file_path: str, root_uri: str = None, root_document: dict = None):
+        self.file_path = file_path
+        self.root_document = root_document
+
+        with open(file_path, 'rb') as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, index_start, index_end = _HEADER.unpack_from(self._buffer)
+        except struct.error:
+            magic = None
+
+        try:
+            if magic != BUNDLE_MAGIC:
+                raise ValueError("{} is not a schema bundle".format(file_path))
+
+            index = json.loads(self._buffer[index_start:index_end])
+            if index['version'] != BUNDLE_VERSION:
+                raise ValueError("Unsupported schema bundle version {}".format(index['version']))
+
+        except BaseException:
+            self.close()
+            raise
+
+        self.root_uri = get_document_uri(root_uri) if root_uri else index['root']
+        self._ranges = {urijoin(self.root_uri, uri): r for uri, r in index['documents'].items()}
+
+    def close(self):
+        """Unmap the bundle file, after which no documents can be loaded"""
+        self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __contains__(self, uri):
+        return uri in self._ranges
+
+    def __len__(self):
+        return len(self._ranges)
+
+    @property
+    def schemes(self) -> set:
+        """URI schemes of the bundled documents"""
+        return {urisplit(uri).scheme for uri in self._ranges}
+
+    def load_resource(self, uri: str) -> dict:
+        if uri == self.root_uri and self.root_document is not None:
+            return self.root_document
+
+        try:
+            start, end = self._ranges[uri]
+        except KeyError:
+            raise ValueError("{} is not in bundle {}".format(uri, self.file_path))
+
+        return json.loads(self._buffer[start:end], object_pairs_hook=collections.OrderedDict)
+
+    def __repr__(self):
+        return "BundleResourceLoader({!r})".format(self.file_path)
+
+
+class _BundleSchemeLoader(ResourceLoader):
+    """ResourceLoader serving the documents of a bundle, and loading other URIs of the same scheme as before."""
+
+    def __init__(self, bundle: BundleResourceLoader, fallback: ResourceLoader = None):
+        self.bundle = bundle
+        self.fallback = fallback
+
+    def load_resource(self, uri: str) -> dict:
+        if uri in self.bundle or self.fallback is None:
+            return self.bundle.load_resource(uri)
+        return self.fallback.load_resource(uri)
+
+    def __repr__(self):
+        return "{!r} (before {!r})".format(self.bundle, self.fallback)
+
+
+def register_bundle(registry: URILoaderRegistry, bundle: BundleResourceLoader):
+    """Load the documents of a bundle from the bundle, rather than by their URI scheme
+
+    :param registry: URILoaderRegistry
+    :param bundle: BundleResourceLoader
+    """
+    for scheme in bundle.schemes:
+        registry.register_for_scheme(scheme, _BundleSchemeLoader(bundle, registry.scheme_to_loader.get(scheme)))
+
+
+@click.command()
+@click.argument('schema_file')
+@click.argument('bundle_file')
+def bundle_schema(schema_file, bundle_file):
+    """Bundle a schema and all documents it references into one file, for use without network access.
+
+    The bundle is not updated when the documents change, and must be rebuilt.
+    """
+    from .session import SchemaSession
+
+    session = SchemaSession.from_file(schema_file)
+    documents = crawl_schema(session.schema, session.schema_uri, session.registry)
+    write_bundle(bundle_file, documents)
+
+    click.echo("Bundled {} documents into {}".format(len(documents), bundle_file))
+
+
+if __name__ == "__main__":
+    bundle_schema()
@@ -0,0 +1,191 @@
+"""
+Columnar validation of large arrays of flat objects.
+
+Validating an array of many objects of the same flat schema with `jsonschema` checks every keyword of every item in
+turn. Instead, the items are transposed into one column per property, and each keyword is checked against a whole
+column at once (with NumPy, where available). The error of each failing value is then made by the keyword function of
+the validator, so that errors are identical to those of `Draft4Validator`, in the same order.
+"""
+
+from jsonschema import Draft4Validator, ValidationError, validators
+
+from .tools import canonical_key
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Minimum number of items for which the columnar validation is used
+COLUMNAR_THRESHOLD = 256
+
+ANNOTATION_KEYWORDS = {"title", "description", "default"}
+OBJECT_KEYWORDS = ANNOTATION_KEYWORDS | {"type", "properties", "required"}
+PROPERTY_KEYWORDS = ANNOTATION_KEYWORDS | {"type", "enum", "minimum", "maximum", "exclusiveMinimum",
+                                           "exclusiveMaximum", "minLength", "maxLength"}
+
+# Python types of instances of each (draft 4) primitive type; booleans are not numbers
+PRIMITIVE_TYPES = {
+    "string": {str},
+    "integer": {int},
+    "number": {int, float},
+    "boolean": {bool},
+    "null": {type(None)},
+}
+
+# Magnitude beyond which integers are not exactly represented as floats
+FLOAT_EXACT_LIMIT = 2 ** 53
+
+_MISSING = object()
+
+
+def is_columnar_schema(schema) -> bool:
+    """Return True if the given items schema describes flat objects which can be validated by column
+
+    :param schema: dict-like JSON object
+    """
+    if not isinstance(schema, dict) or schema.get("type") != "object" or not schema.keys() <= OBJECT_KEYWORDS:
+        return False
+
+    for property_schema in schema.get("properties", {}).values():
+        if not isinstance(property_schema, dict) or not property_schema.keys() <= PROPERTY_KEYWORDS:
+            return False
+
+        json_type = property_schema.get("type", "null")
+        if not isinstance(json_type, str) or json_type not in PRIMITIVE_TYPES:
+            return False
+
+    return True
+
+
+def iter_columnar_errors(schema: dict, instances: list, validator=None):
+    """Iterate over the validation errors of a list of objects against a flat object schema
+
+    Errors are relative to the array, as from the `items` keyword.
+
+    :param schema: dict-like JSON object, for which `is_columnar_schema` is True
+    :param instances: list of dicts
+    :param validator: validator whose keyword functions make the error messages (Draft4Validator if omitted)
+    """
+    if validator is None:
+        validator = Draft4Validator(schema)
+
+    errors = []
+    keywords = list(schema)
+
+    if "required" in schema:
+        position = keywords.index("required")
+        for name in schema["required"]:
+            for row, instance in enumerate(instances):
+                if name not in instance:
+                    for message in _get_messages(validator, "required", [name], instance, schema):
+                        error = ValidationError(message, validator="required", validator_value=schema["required"],
+                                                instance=instance, schema=schema, path=[row], schema_path=["required"])
+                        errors.append(((row, position), error))
+
+    if "properties" in schema:
+        position = keywords.index("properties")
+        for property_position, (name, property_schema) in enumerate(schema["properties"].items()):
+            column = [instance.get(name, _MISSING) for instance in instances]
+
+            for keyword_position, keyword in enumerate(property_schema):
+                value = property_schema[keyword]
+                for row in _check_column(property_schema, keyword, column):
+                    for message in _get_messages(validator, keyword, value, column[row], property_schema):
+                        error = ValidationError(message, validator=keyword, validator_value=value,
+                                                instance=column[row], schema=property_schema, path=[row, name],
+                                                schema_path=["properties", name, keyword])
+                        errors.append(((row, position, property_position, keyword_position), error))
+
+    errors.sort(key=lambda e: e[0])
+    return (error for _, error in errors)
+
+
+def _check_column(schema: dict, keyword: str, column: list):
+    """Yield the row of each value of column failing the given keyword"""
+    value = schema[keyword]
+
+    if keyword == "type":
+        types = PRIMITIVE_TYPES[value]
+        for row, instance in enumerate(column):
+            if instance is not _MISSING and type(instance) not in types:
+                yield row
+
+    elif keyword == "enum":
+        keys = {canonical_key(e) for e in value}
+        for row, instance in enumerate(column):
+            if instance is not _MISSING and canonical_key(instance) not in keys:
+                yield row
+
+    elif keyword == "minimum":
+        if schema.get("exclusiveMinimum", False):
+            yield from _compare_numbers(column, value, lambda x: x <= value)
+        else:
+            yield from _compare_numbers(column, value, lambda x: x < value)
+
+    elif keyword == "maximum":
+        if schema.get("exclusiveMaximum", False):
+            yield from _compare_numbers(column, value, lambda x: x >= value)
+        else:
+            yield from _compare_numbers(column, value, lambda x: x > value)
+
+    elif keyword == "minLength":
+        yield from _compare_lengths(column, lambda x: x < value)
+
+    elif keyword == "maxLength":
+        yield from _compare_lengths(column, lambda x: x > value)
+
+
+def _get_messages(validator, keyword: str, value, instance, schema: dict) -> list:
+    """Return the messages of the errors of the validator's keyword function for a failing value
+
+    The messages of `jsonschema` vary between its versions, and so are not reproduced here.
+    """
+    return [error.message for error in validator.VALIDATORS[keyword](validator, value, instance, schema)]
+
+
+def _compare_numbers(column: list, bound, predicate) -> list:
+    """Return rows of numeric values (excluding booleans) satisfying predicate, a comparison with bound"""
+    # Integers which floats cannot represent exactly are compared one by one, as by the item validator
+    if numpy is not None and _is_float_exact(bound) and all(_is_float_exact(v) for v in column):
+        values = numpy.array([v if type(v) in (int, float) else numpy.nan for v in column], dtype=float)
+        with numpy.errstate(invalid='ignore'):
+            return numpy.flatnonzero(predicate(values)).tolist()
+
+    return [row for row, v in enumerate(column) if type(v) in (int, float) and predicate(v)]
+
+
+def _is_float_exact(value) -> bool:
+    return type(value) is not int or -FLOAT_EXACT_LIMIT <= value <= FLOAT_EXACT_LIMIT
+
+
+def _compare_lengths(column: list, predicate) -> list:
+    """Return rows of string values whose length satisfies predicate"""
+    if numpy is not None:
+        lengths = numpy.array([len(v) if type(v) is str else -1 for v in column], dtype=numpy.int64)
+        return numpy.flatnonzero(predicate(lengths) & (lengths >= 0)).tolist()
+
+    return [row for row, v in enumerate(column) if type(v) is str and predicate(len(v))]
+
+
+def columnar_items(validator, items, instance, schema):
+    """`items` keyword validator, validating large arrays of flat objects by column"""
+    if (validator.is_type(instance, "array") and len(instance) >= COLUMNAR_THRESHOLD and isinstance(items, dict)
+            and all(isinstance(item, dict) for item in instance)):
+        ref = items.get("$ref")
+        if isinstance(ref, str):
+            # Columnar schemas have no references of their own, so their errors need not be made in the scope of the
+            # reference
+            resolved = validator._resolver.lookup(ref).contents
+            if is_columnar_schema(resolved):
+                return iter_columnar_errors(resolved, instance, validator)
+
+        elif is_columnar_schema(items):
+            return iter_columnar_errors(items, instance, validator)
+
+    return _draft4_items(validator, items, instance, schema)
+
+
+_draft4_items = Draft4Validator.VALIDATORS["items"]
+
+ColumnarDraft4Validator = validators.extend(Draft4Validator, {"items": columnar_items})
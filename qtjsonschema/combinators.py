@@ -0,0 +1,106 @@
+"""
+Branch selection for the `oneOf` and `anyOf` combinators.
+"""
+
+from collections.abc import Mapping
+
+from .tools import canonical_key, get_json_type
+
+# Keywords which only apply to objects or to arrays, implying the type of a branch which does not declare one
+OBJECT_KEYWORDS = ('properties', 'patternProperties', 'additionalProperties', 'required', 'minProperties',
+                   'maxProperties', 'dependencies')
+ARRAY_KEYWORDS = ('items', 'additionalItems', 'minItems', 'maxItems', 'uniqueItems')
+
+
+def get_branch_types(schema: dict):
+    """Return the set of JSON types described by a branch, or None if it describes values of any type
+
+    :param schema: dict-like JSON object
+    """
+    json_type = schema.get('type')
+    if isinstance(json_type, str):
+        return frozenset([json_type])
+    if json_type is not None:
+        return frozenset(json_type)
+
+    if any(k in schema for k in OBJECT_KEYWORDS):
+        return frozenset(['object'])
+    if any(k in schema for k in ARRAY_KEYWORDS):
+        return frozenset(['array'])
+    return None
+
+
+class DiscriminatorIndex:
+    """Index choosing the branch of a `oneOf`/`anyOf` schema which describes a given JSON value.
+
+    Rather than validating the value against every branch, branches are discriminated by their declared (or implied)
+    type, their required properties, and the `const`/`enum` values of their properties (or of the branch itself).
+    The index is built once, after which selection costs only a lookup per discriminating property of the value.
+    """
+
+    def __init__(self, schemas: list):
+        self._types = []
+        self._required = []
+
+        # Discriminating property name (None for the branch itself) -> {value key -> branch indices}
+        self._values = {}
+        # Discriminating property name -> indices of branches which constrain it
+        self._constrained = {}
+
+        for index, schema in enumerate(schemas):
+            self._types.append(get_branch_types(schema))
+            self._required.append(frozenset(schema.get('required', ())))
+
+            self._add_discriminator(None, schema, index)
+            for name, property_schema in schema.get('properties', {}).items():
+                self._add_discriminator(name, property_schema, index)
+
+    def _add_discriminator(self, name, schema: dict, index: int):
+        if 'const' in schema:
+            values = [schema['const']]
+        elif 'enum' in schema:
+            values = schema['enum']
+        else:
+            return
+
+        keys = self._values.setdefault(name, {})
+        for value in values:
+            keys.setdefault(canonical_key(value), set()).add(index)
+
+        self._constrained.setdefault(name, set()).add(index)
+
+    def _get_type_candidates(self, value) -> list:
+        json_type = get_json_type(value)
+        accepted = {json_type, 'number'} if json_type == 'integer' else {json_type}
+        return [i for i, types in enumerate(self._types) if types is None or types & accepted]
+
+    def select(self, value):
+        """Return the index of the branch describing the given value, or None if no branch does
+
+        :param value: JSON value
+        """
+        candidates = self._get_type_candidates(value)
+        scores = dict.fromkeys(candidates, 0)
+
+        # The value itself, then (for objects) its properties
+        discriminators = [(None, value)] if None in self._values else []
+
+        if isinstance(value, Mapping):
+            discriminators.extend((name, value[name]) for name in self._values if name is not None and name in value)
+            keys = value.keys()
+            scores = {i: s for i, s in scores.items() if self._required[i] <= keys}
+
+        for name, discriminator_value in discriminators:
+            try:
+                matching = self._values[name].get(canonical_key(discriminator_value), ())
+            except TypeError:
+                continue
+
+            constrained = self._constrained[name]
+            scores = {i: s + (i in matching) for i, s in scores.items() if i in matching or i not in constrained}
+
+        if not scores:
+            return None
+
+        # Prefer the branch which matched the most discriminators, then the first declared
+        return max(scores, key=lambda i: (scores[i], -i))
@@ -0,0 +1,130 @@
+"""
+Default documents of schemas.
+
+The default document of an object schema is its `default`, merged over the default documents of its properties, so
+that nested defaults apply unless overridden by an enclosing one. Default documents are computed once per resolved
+schema node (in its `id` scope) and cached in the SchemaCache of the registry, and a widget tree loads the default
+document of its root in a single pass.
+
+Branches of `oneOf`/`anyOf` schemas, and the items of arrays, apply their own defaults when their widgets are built.
+"""
+
+import copy
+
+from .tools import Context, URILoaderRegistry, create_default_uri_loader_registry
+
+#: Value of schemas without a default document
+NO_DEFAULT = object()
+
+# Marks defaults missing from the cache
+_NOT_CACHED = object()
+
+
+def get_default(schema: dict, ctx: Context):
+    """Return the (cached) default document of a resolved schema node, or NO_DEFAULT
+
+    The document is shared between all users of the schema, and must not be modified.
+
+    :param schema: dict-like JSON object, resolved
+    :param ctx: Context of given schema
+    """
+    default, _ = _get_default(schema, ctx, ())
+    return default
+
+
+def generate_default(schema: dict, ctx: Context):
+    """Return the default document of a resolved schema node, or NO_DEFAULT, without caching it
+
+    :param schema: dict-like JSON object, resolved
+    :param ctx: Context of given schema
+    """
+    default, _ = _generate_default(schema, ctx, ())
+    return default
+
+
+def _get_default(schema: dict, ctx: Context, stack: tuple) -> tuple:
+    """Return the default document of a schema node, with the position in `stack` (the enclosing schema nodes) of the
+    outermost node whose recurrence cut the document short, or the length of the stack if none did.
+
+    Recursive schemas have no defaults beyond their first recurrence, so the documents of recursive schemas depend on
+    the node for which they are generated. Only complete documents are shared with the documents of other nodes;
+    those cut short are cached for the node for which they were generated.
+    """
+    cache = ctx.registry.schema_cache
+    # The same schema object may be reached in several `id` scopes, in which its references resolve differently
+    kind, recursive_kind = ('default', ctx), ('recursive_default', ctx)
+
+    default = cache.find(kind, schema, _NOT_CACHED)
+    if default is not _NOT_CACHED:
+        return default, len(stack)
+
+    for position, (enclosing_schema, enclosing_ctx) in enumerate(stack):
+        if enclosing_schema is schema and enclosing_ctx is ctx:
+            return NO_DEFAULT, position
+
+    if not stack:
+        default = cache.find(recursive_kind, schema, _NOT_CACHED)
+        if default is not _NOT_CACHED:
+            return default, 0
+
+    default, cut = _generate_default(schema, ctx, stack + ((schema, ctx),))
+    if cut > len(stack):
+        cache.get(kind, schema, lambda s: default)
+    elif not stack:
+        cache.get(recursive_kind, schema, lambda s: default)
+
+    return default, min(cut, len(stack))
+
+
+def _generate_default(schema: dict, ctx: Context, stack: tuple) -> tuple:
+    default = schema.get("default", NO_DEFAULT)
+    cut = len(stack)
+
+    if "oneOf" in schema or "anyOf" in schema or schema.get("type") != "object" or "properties" not in schema:
+        return default, cut
+
+    property_defaults = {}
+    for name, property_schema in schema["properties"].items():
+        property_default, property_cut = _get_default(*ctx.resolve(property_schema), stack)
+        cut = min(cut, property_cut)
+        if property_default is not NO_DEFAULT:
+            property_defaults[name] = property_default
+
+    if not property_defaults:
+        return default, cut
+
+    if default is NO_DEFAULT:
+        return property_defaults, cut
+
+    return _merge(property_defaults, default), cut
+
+
+def _merge(base, override):
+    if not (isinstance(base, dict) and isinstance(override, dict)):
+        return override
+
+    merged = dict(base)
+    for k, v in override.items():
+        merged[k] = _merge(merged[k], v) if k in merged else v
+    return merged
+
+
+def generate_default_instance(schema: dict, schema_uri: str = None, registry: URILoaderRegistry = None):
+    """Return the default instance of a schema, being the values a form built from the schema initially loads
+
+    Object schemas without defaults give an empty object, other schemas without defaults give None.
+
+    :param schema: dict-like JSON object
+    :param schema_uri: URI of schema document (if any)
+    :param registry: URILoaderRegistry used to load referenced documents
+    """
+    if registry is None:
+        registry = create_default_uri_loader_registry(schema, schema_uri)
+
+    schema, ctx = Context(schema_uri or "#", registry).resolve(schema)
+
+    default = get_default(schema, ctx)
+    if default is NO_DEFAULT:
+        return {} if schema.get("type") == "object" else None
+
+    return copy.deepcopy(default)
@@ -0,0 +1,68 @@
+"""
+Dependency graphs of object schemas, for the `dependencies` keyword.
+"""
+
+from .tools import Context
+
+
+class DependencyGraph:
+    """Precomputed `dependencies` of an object schema.
+
+    Property dependencies make properties required when another (the trigger) is present, and schema dependencies
+    apply a further schema to the object, whose `required` properties are likewise made required. The graph maps each
+    trigger to its dependents, and each dependent back to its triggers, so that a change in the presence of one
+    property re-evaluates only the properties depending on it.
+
+    Given the context of the schema, referenced dependency schemas are resolved to find the properties they require.
+    """
+
+    def __init__(self, schema: dict, ctx: Context = None):
+        # Trigger name to names of the properties it requires, or to the schema it applies
+        self.property_dependencies = {}
+        self.schema_dependencies = {}
+
+        # Trigger name to names of the properties it requires (by either kind of dependency)
+        self.dependents = {}
+        # Required property name to the names of the triggers requiring it
+        self.required_by = {}
+
+        for trigger, dependency in schema.get("dependencies", {}).items():
+            if isinstance(dependency, list):
+                self.property_dependencies[trigger] = required = tuple(dependency)
+            else:
+                self.schema_dependencies[trigger] = dependency
+                if ctx is not None:
+                    dependency, _ = ctx.resolve(dependency)
+                required = tuple(dependency.get("required", ()))
+
+            if required:
+                self.dependents[trigger] = required
+                for name in required:
+                    self.required_by.setdefault(name, []).append(trigger)
+
+        self.triggers = self.property_dependencies.keys() | self.schema_dependencies.keys()
+
+    def get_dependents(self, trigger: str) -> tuple:
+        """Return names of the properties made required by a trigger"""
+        return self.dependents.get(trigger, ())
+
+    def is_required(self, name: str, is_present) -> bool:
+        """Return True if a property is required by a present trigger
+
+        :param name: property name
+        :param is_present: callable returning True if the named property is present
+        """
+        return any(is_present(t) for t in self.required_by.get(name, ()))
+
+
+def get_dependency_graph(schema: dict, ctx: Context) -> DependencyGraph:
+    """Return the shared DependencyGraph for an object schema
+
+    Graphs are identified by the `dependencies` object of the schema and its context, so that each widget of a schema
+    uses the same graph.
+
+    :param schema: dict-like JSON object
+    :param ctx: Context of given schema
+    """
+    return ctx.registry.schema_cache.get(('dependency_graph', ctx), schema.get("dependencies", {}),
+                                         lambda d: DependencyGraph(schema, ctx))
@@ -0,0 +1,112 @@
+"""
+Structural comparison of widget trees with JSON values.
+
+Both sides are compared by their structural hashes (see `hashing`), and only subtrees whose hashes differ are
+descended into. Widget hashes are cached between comparisons, and the hashes of the compared JSON value are computed
+once, so that unchanged subtrees are skipped in constant time.
+"""
+
+from .hashing import hash_json_value
+from .widgets import JSONBaseWidget
+
+
+class Difference:
+    """Difference between the value of a widget tree and a JSON value"""
+
+    CHANGED = 'changed'
+    NOT_IN_VALUE = 'not in compared value'
+    ONLY_IN_VALUE = 'only in compared value'
+
+    def __init__(self, path: tuple, widget: JSONBaseWidget, kind: str):
+        self.path = path
+        self.widget = widget
+        self.kind = kind
+
+    @property
+    def pointer(self) -> str:
+        """JSON pointer to the differing value"""
+        return '/' + '/'.join(str(p).replace('~', '~0').replace('/', '~1') for p in self.path)
+
+    def __repr__(self):
+        return "Difference({!r}, {!r})".format(self.pointer, self.kind)
+
+
+def diff_widget(widget: JSONBaseWidget, data) -> list:
+    """Return the differences between the value of a widget and a JSON value
+
+    Differences are reported against the innermost widget holding the differing value.
+
+    :param widget: JSONBaseWidget
+    :param data: JSON value
+    """
+    return list(_iter_differences(widget, widget, data, {}, {}, ()))
+
+
+def _materialise(node):
+    # Differences are reported against built widgets, rather than placeholders which are about to be replaced
+    if isinstance(node, JSONBaseWidget):
+        return node.materialise()
+    return node
+
+
+def _get_hash(node, memo: dict) -> bytes:
+    if isinstance(node, JSONBaseWidget):
+        return node.json_hash()
+    return hash_json_value(node, memo)
+
+
+def _get_children(node):
+    if isinstance(node, JSONBaseWidget):
+        if node.json_type is None:
+            return None, None
+        return node.json_type, node.iter_json_children()
+
+    if isinstance(node, dict):
+        return 'object', iter(node.items())
+
+    if isinstance(node, (list, tuple)):
+        return 'array', iter(node)
+
+    return None, None
+
+
+def _iter_differences(node, owner: JSONBaseWidget, data, node_memo: dict, data_memo: dict, path: tuple):
+    if _get_hash(node, node_memo) == hash_json_value(data, data_memo):
+        return
+
+    json_type, children = _get_children(node)
+
+    if json_type == 'object' and isinstance(data, dict):
+        keys = set()
+
+        for key, child in children:
+            keys.add(key)
+            child = _materialise(child)
+            child_owner = child if isinstance(child, JSONBaseWidget) else owner
+
+            if key in data:
+                yield from _iter_differences(child, child_owner, data[key], node_memo, data_memo, path + (key,))
+            else:
+                yield Difference(path + (key,), child_owner, Difference.NOT_IN_VALUE)
+
+        for key in data:
+            if key not in keys:
+                yield Difference(path + (key,), owner, Difference.ONLY_IN_VALUE)
+
+    elif json_type == 'array' and isinstance(data, (list, tuple)):
+        children = [_materialise(c) for c in children]
+
+        for index, (child, datum) in enumerate(zip(children, data)):
+            child_owner = child if isinstance(child, JSONBaseWidget) else owner
+            yield from _iter_differences(child, child_owner, datum, node_memo, data_memo, path + (index,))
+
+        for index in range(len(data), len(children)):
+            child = children[index]
+            child_owner = child if isinstance(child, JSONBaseWidget) else owner
+            yield Difference(path + (index,), child_owner, Difference.NOT_IN_VALUE)
+
+        for index in range(len(children), len(data)):
+            yield Difference(path + (index,), owner, Difference.ONLY_IN_VALUE)
+
+    else:
+        yield Difference(path, owner, Difference.CHANGED)
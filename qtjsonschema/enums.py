@@ -0,0 +1,66 @@
+"""
+Shared models of enumerated values.
+"""
+
+import json
+
+from PyQt5 import QtCore
+
+from .tools import SchemaCache, canonical_key
+
+
+class EnumIndex:
+    """Model and value index of an enum, shared by every widget of the same enum schema.
+
+    Values are indexed by their canonical key, so that lookup takes constant time and distinguishes `1`, `True` and
+    `"1"`.
+    """
+
+    def __init__(self, values: list):
+        self.values = values
+        self._indices = {}
+        for i, value in enumerate(values):
+            self._indices.setdefault(canonical_key(value), i)
+
+        # Non-string values are written as JSON, to distinguish them from strings
+        if all(isinstance(v, str) for v in values):
+            labels = list(values)
+        else:
+            labels = [json.dumps(v) for v in values]
+
+        self._label_indices = {}
+        for i, label in enumerate(labels):
+            self._label_indices.setdefault(label, i)
+
+        self.model = QtCore.QStringListModel(labels)
+
+    def __len__(self):
+        return len(self.values)
+
+    def index_of(self, value) -> int:
+        """Return the index of the given value, or -1 if it is not enumerated
+
+        :param value: JSON value
+        """
+        try:
+            return self._indices.get(canonical_key(value), -1)
+        except TypeError:
+            return -1
+
+    def index_of_label(self, label: str) -> int:
+        """Return the index of the value with the given label, or -1 if no such value exists
+
+        :param label: displayed label
+        """
+        return self._label_indices.get(label, -1)
+
+
+def get_enum_index(values: list, cache: SchemaCache) -> EnumIndex:
+    """Return the shared EnumIndex for an enum
+
+    Enums are identified by the list object of the schema, so that each widget of a schema uses the same index.
+
+    :param values: list of enumerated values
+    :param cache: SchemaCache of the schema
+    """
+    return cache.get('enum_index', values, EnumIndex)
@@ -0,0 +1,70 @@
+"""
+Structural (Merkle) hashes of JSON values.
+
+Containers are hashed from the hashes of their children, so that a hash cached for an unchanged subtree can be reused,
+and two subtrees compared in constant time once hashed. Equal JSON values have equal hashes, irrespective of object
+key order, and of whether integral numbers are written as integers or floats.
+"""
+
+import json
+from hashlib import blake2b
+
+DIGEST_SIZE = 16
+
+
+def hash_leaf(value) -> bytes:
+    """Return hash of a JSON value, encoded as a whole
+
+    :param value: JSON value
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+
+    return blake2b(json.dumps(value, sort_keys=True).encode(), digest_size=DIGEST_SIZE).digest()
+
+
+def hash_object(items) -> bytes:
+    """Return hash of an object from the hashes of its properties
+
+    :param items: iterable of (name, hash) pairs
+    """
+    digest = blake2b(b'{', digest_size=DIGEST_SIZE)
+    for name, item_hash in sorted(items):
+        digest.update(hash_leaf(name))
+        digest.update(item_hash)
+    return digest.digest()
+
+
+def hash_array(item_hashes) -> bytes:
+    """Return hash of an array from the hashes of its items
+
+    :param item_hashes: iterable of hashes
+    """
+    digest = blake2b(b'[', digest_size=DIGEST_SIZE)
+    for item_hash in item_hashes:
+        digest.update(item_hash)
+    return digest.digest()
+
+
+def hash_json_value(value, memo: dict = None) -> bytes:
+    """Return structural hash of a JSON value
+
+    :param value: JSON value
+    :param memo: dict in which to record the hashes of containers (by id), for repeated lookup of subtrees
+    """
+    if memo is not None and isinstance(value, (dict, list, tuple)):
+        try:
+            return memo[id(value)]
+        except KeyError:
+            pass
+
+    if isinstance(value, dict):
+        value_hash = hash_object((k, hash_json_value(v, memo)) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        value_hash = hash_array(hash_json_value(v, memo) for v in value)
+    else:
+        return hash_leaf(value)
+
+    if memo is not None:
+        memo[id(value)] = value_hash
+    return value_hash
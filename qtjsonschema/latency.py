@@ -0,0 +1,336 @@
+"""
+Interaction latency recording and replay.
+
+Input events received by an editor window are recorded (see the `--record-latency` option of the editor), and can then
+be replayed against the same schema and document, headlessly on the offscreen platform, in a window opened with the
+options recorded alongside the events (such as `--progressive` and `--lazy-load-size`). Each replayed event is timed
+from its dispatch until the work it causes (layout, repainting) has been done, and the event loop is watched for stalls
+between events, such as those caused by validation timers.
+
+    python -m qtjsonschema --schema S --json J --record-latency recording.json
+    python -m qtjsonschema.latency --schema S --json J recording.json
+"""
+
+import json
+import math
+import os
+import time
+
+import click
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+RECORDING_VERSION = 1
+
+# Interval between frames (seconds), beyond which the event loop is considered stalled
+FRAME_INTERVAL = 1 / 60
+
+# Time for which replay waits between iterations of the event loop (seconds)
+IDLE_INTERVAL = 0.001
+
+EVENT_TYPES = {
+    'KeyPress': QtCore.QEvent.KeyPress,
+    'KeyRelease': QtCore.QEvent.KeyRelease,
+    'MouseButtonPress': QtCore.QEvent.MouseButtonPress,
+    'MouseButtonRelease': QtCore.QEvent.MouseButtonRelease,
+    'MouseButtonDblClick': QtCore.QEvent.MouseButtonDblClick,
+}
+
+_EVENT_NAMES = {t: n for n, t in EVENT_TYPES.items()}
+_KEY_EVENTS = {QtCore.QEvent.KeyPress, QtCore.QEvent.KeyRelease}
+
+
+def get_widget_path(root: QtWidgets.QWidget, widget: QtWidgets.QWidget) -> list:
+    """Return path of a widget from a root widget, as [class name, index among siblings of that class] pairs
+
+    Paths identify the same widget in another window built from the same schema and document.
+    """
+    path = []
+    while widget is not root:
+        parent = widget.parentWidget()
+        siblings = [c for c in parent.children() if type(c) is type(widget)]
+        path.append([type(widget).__name__, siblings.index(widget)])
+        widget = parent
+
+    path.reverse()
+    return path
+
+
+def find_widget(root: QtWidgets.QWidget, path: list) -> QtWidgets.QWidget:
+    """Return the widget at a path from a root widget (see `get_widget_path`)"""
+    widget = root
+    for class_name, index in path:
+        siblings = [c for c in widget.children() if type(c).__name__ == class_name]
+        try:
+            widget = siblings[index]
+        except IndexError:
+            raise LookupError("No widget at {}".format(path))
+
+    return widget
+
+
+class EventRecorder(QtCore.QObject):
+    """Record the input events received by the widgets of a window.
+
+    Only key and mouse button events delivered within the window are recorded; events of popups (such as the lists
+    of combo boxes) are not. The options of the window are saved with the events, so that it is opened alike for replay.
+    """
+
+    def __init__(self, root: QtWidgets.QWidget, options: dict = None, parent=None):
+        super().__init__(parent)
+
+        self.root = root
+        self.options = dict(options or {})
+        self.events = []
+        self.size = None
+
+        self._start_time = None
+        self._last_event = None
+
+    def start(self):
+        # Positions of mouse events depend on the layout, and so on the size of the window
+        self.size = [self.root.width(), self.root.height()]
+        self._start_time = time.perf_counter()
+        QtWidgets.QApplication.instance().installEventFilter(self)
+
+    def stop(self):
+        QtWidgets.QApplication.instance().removeEventFilter(self)
+
+    def save(self, file_path: str):
+        recording = {
+            'version': RECORDING_VERSION,
+            'size': self.size,
+            'options': self.options,
+            'events': self.events,
+        }
+        with open(file_path, 'w') as f:
+            json.dump(recording, f, indent=1)
+
+    def eventFilter(self, obj, event):
+        event_type = event.type()
+        if (event_type in _EVENT_NAMES and isinstance(obj, QtWidgets.QWidget)
+                and (obj is self.root or self.root.isAncestorOf(obj))):
+            self._record(obj, event)
+
+        return False
+
+    def _record(self, widget: QtWidgets.QWidget, event):
+        # Events ignored by a widget are delivered again to its parent
+        if event.type() in _KEY_EVENTS:
+            key = (event.type(), event.timestamp(), event.key())
+        else:
+            key = (event.type(), event.timestamp(), event.globalPos())
+
+        if key == self._last_event:
+            return
+        self._last_event = key
+
+        record = {
+            'time': time.perf_counter() - self._start_time,
+            'type': _EVENT_NAMES[event.type()],
+            'target': get_widget_path(self.root, widget),
+            'modifiers': int(event.modifiers()),
+        }
+
+        if event.type() in _KEY_EVENTS:
+            record.update(key=event.key(), text=event.text(), autorepeat=event.isAutoRepeat())
+        else:
+            record.update(x=event.localPos().x(), y=event.localPos().y(), button=int(event.button()),
+                          buttons=int(event.buttons()))
+
+        self.events.append(record)
+
+
+def create_event(record: dict) -> QtCore.QEvent:
+    """Return the input event of a recorded event"""
+    event_type = EVENT_TYPES[record['type']]
+    modifiers = QtCore.Qt.KeyboardModifiers(record['modifiers'])
+
+    if event_type in _KEY_EVENTS:
+        return QtGui.QKeyEvent(event_type, record['key'], modifiers, record['text'], record['autorepeat'])
+
+    return QtGui.QMouseEvent(event_type, QtCore.QPointF(record['x'], record['y']),
+                             QtCore.Qt.MouseButton(record['button']), QtCore.Qt.MouseButtons(record['buttons']),
+                             modifiers)
+
+
+class LatencyReport:
+    """Latencies of replayed events (seconds), by event type, and stalls of the event loop between events.
+
+    Events handled in more than a frame are counted as slow, apart from the stalls.
+    """
+
+    def __init__(self):
+        self.latencies = {}
+        self.stalls = []
+
+    def add_latency(self, event_type: str, latency: float):
+        self.latencies.setdefault(event_type, []).append(latency)
+
+    def add_stall(self, duration: float):
+        self.stalls.append(duration)
+
+    def summary(self) -> dict:
+        all_latencies = [t for latencies in self.latencies.values() for t in latencies]
+        summary = {'all': _summarise(all_latencies)}
+        summary.update((event_type, _summarise(latencies)) for event_type, latencies in sorted(self.latencies.items()))
+
+        slow_latencies = [t for t in all_latencies if t > FRAME_INTERVAL]
+        summary['slow_events'] = {
+            'count': len(slow_latencies),
+            'dropped_frames': sum(int(t // FRAME_INTERVAL) for t in slow_latencies),
+        }
+
+        summary['stalls'] = {
+            'count': len(self.stalls),
+            'dropped_frames': sum(int(d // FRAME_INTERVAL) for d in self.stalls),
+            'longest': max(self.stalls, default=0.0),
+        }
+        return summary
+
+    def format(self) -> str:
+        summary = self.summary()
+        stalls = summary.pop('stalls')
+        slow_events = summary.pop('slow_events')
+
+        lines = ["{:<20} {:>6} {:>9} {:>9} {:>9} {:>9}".format(
+            "event", "count", "p50 ms", "p95 ms", "p99 ms", "max ms")]
+        for event_type, s in summary.items():
+            lines.append("{:<20} {:>6} {:>9.2f} {:>9.2f} {:>9.2f} {:>9.2f}".format(
+                event_type, s['count'], s['p50'] * 1e3, s['p95'] * 1e3, s['p99'] * 1e3, s['max'] * 1e3))
+
+        lines.append("{} events slower than {:.1f} ms ({} dropped frames)".format(
+            slow_events['count'], FRAME_INTERVAL * 1e3, slow_events['dropped_frames']))
+        lines.append("{} stalls between events over {:.1f} ms ({} dropped frames), longest {:.2f} ms".format(
+            stalls['count'], FRAME_INTERVAL * 1e3, stalls['dropped_frames'], stalls['longest'] * 1e3))
+        return "\n".join(lines)
+
+
+def percentile(values: list, p: float) -> float:
+    """Return the p-th percentile of values (nearest rank)
+
+    :param values: sorted list of numbers
+    :param p: percentile, from 0 to 100
+    """
+    if not values:
+        return 0.0
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+def _summarise(latencies: list) -> dict:
+    latencies = sorted(latencies)
+    return {
+        'count': len(latencies),
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'max': latencies[-1] if latencies else 0.0,
+    }
+
+
+def replay(root: QtWidgets.QWidget, recording: dict, speed: float = 1.0) -> LatencyReport:
+    """Replay recorded events on a window, returning their latencies
+
+    Events are dispatched at their recorded times (scaled by speed), the event loop running in between.
+
+    :param root: window built from the schema and document of the recording
+    :param recording: recorded events (see `EventRecorder`)
+    :param speed: replay speed, relative to the recording
+    """
+    app = QtWidgets.QApplication.instance()
+    report = LatencyReport()
+
+    root.resize(*recording['size'])
+    app.processEvents()
+
+    start_time = time.perf_counter()
+
+    for record in recording['events']:
+        _run_event_loop(app, start_time + record['time'] / speed, report)
+
+        target = find_widget(root, record['target'])
+        event = create_event(record)
+
+        # Events not delivered by the platform do not move the focus themselves
+        if event.type() == QtCore.QEvent.MouseButtonPress and target.focusPolicy() & QtCore.Qt.ClickFocus:
+            target.setFocus(QtCore.Qt.MouseFocusReason)
+
+        dispatch_time = time.perf_counter()
+        app.sendEvent(target, event)
+        app.sendPostedEvents()
+        app.processEvents()
+
+        report.add_latency(record['type'], time.perf_counter() - dispatch_time)
+
+    return report
+
+
+def open_recorded_window(schema: str, json_files, recording: dict) -> QtWidgets.QWidget:
+    """Open an editor window with the options of a recording, loading a schema and JSON files
+
+    :param schema: schema file of the recording
+    :param json_files: JSON files open when recording
+    :param recording: recorded events (see `EventRecorder`)
+    """
+    from .__main__ import open_editor_window
+
+    # Recordings made before options were recorded were made with the default options
+    return open_editor_window(schema, json_files, **recording.get('options', {}))
+
+
+def _run_event_loop(app: QtWidgets.QApplication, until: float, report: LatencyReport):
+    """Run the event loop until the given time, recording stalls
+
+    Each iteration handles the events pending at its start, and is timed on its own. (Given a time limit, a single
+    call would go on handling events for as long as any are pending, such as the zero-interval timers of a progressive
+    build, and so time the whole wait as one stall.)
+    """
+    while True:
+        iteration_start = time.perf_counter()
+        remaining = until - iteration_start
+        if remaining <= 0:
+            return
+
+        app.processEvents()
+
+        iteration_end = time.perf_counter()
+        duration = iteration_end - iteration_start
+        if duration > FRAME_INTERVAL:
+            report.add_stall(duration)
+
+        # Wait briefly between iterations, rather than spinning
+        time.sleep(max(min(IDLE_INTERVAL, until - iteration_end), 0))
+
+
+@click.command()
+@click.option('--schema', required=True, help='Schema file of the recording.')
+@click.option('--json', default=None, multiple=True, help='JSON files open when recording.')
+@click.option('--speed', default=1.0, help='Replay speed, relative to the recording.')
+@click.option('--report', default=None, help='File to which to write the latency summary as JSON.')
+@click.argument('recording_file')
+def replay_latency(schema, json, speed, report, recording_file):
+    """Replay a recording headlessly, reporting per-event latency percentiles and frame stalls."""
+    import sys
+    import json as json_module
+
+    from .style import install_stylesheet
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    with open(recording_file) as f:
+        recording = json_module.load(f)
+
+    app = QtWidgets.QApplication(sys.argv)
+    install_stylesheet(app)
+
+    main_window = open_recorded_window(schema, json, recording)
+
+    latency_report = replay(main_window, recording, speed)
+    click.echo(latency_report.format())
+
+    if report:
+        with open(report, 'w') as f:
+            json_module.dump(latency_report.summary(), f, indent=4)
+
+
+if __name__ == "__main__":
+    replay_latency()
@@ -0,0 +1,205 @@
+"""
+Models for objects used as maps, with keys described by `patternProperties` and `additionalProperties`.
+"""
+
+import json
+from functools import lru_cache
+
+from PyQt5 import QtCore
+
+from .tools import Context, compile_pattern
+
+PREVIEW_LENGTH = 80
+
+# Number of property names whose routes are cached by each router
+ROUTE_CACHE_SIZE = 1024
+
+
+class PropertyRouter:
+    """Route property names of an object to their subschema.
+
+    Names are matched against every pattern of `patternProperties`, before falling back to `additionalProperties`.
+    A name matching several patterns is routed to an `allOf` of their subschemas (in declaration order), which has no
+    editor of its own, so that such values are kept as they were loaded. Declared `properties` are not routed.
+    """
+
+    def __init__(self, schema: dict):
+        self._properties = schema.get('properties', {})
+        self._patterns = [(compile_pattern(p), s) for p, s in schema.get('patternProperties', {}).items()]
+
+        # Undeclared additional properties are not edited, though an explicit True permits any value
+        additional = schema.get('additionalProperties')
+        if additional is True:
+            additional = {}
+        elif additional is False:
+            additional = None
+
+        self._additional_schema = additional
+
+        # Combined subschemas by the positions of their patterns, so that each combination is routed to one schema
+        self._combined = {}
+        # Routes of the most recently used names (the names of a large map are routed as their rows are shown)
+        self._cached_route = lru_cache(ROUTE_CACHE_SIZE)(self._find_route)
+
+    @property
+    def is_open(self) -> bool:
+        """True if properties other than those declared in `properties` may be added"""
+        return bool(self._patterns) or self._additional_schema is not None
+
+    def route(self, name: str):
+        """Return subschema for given property name, or None if the property is not permitted
+
+        :param name: property name
+        """
+        return self._cached_route(name)
+
+    def _find_route(self, name: str):
+        matches = tuple(i for i, (p, s) in enumerate(self._patterns) if p.search(name))
+        if not matches:
+            return self._additional_schema
+        if len(matches) == 1:
+            return self._patterns[matches[0]][1]
+
+        try:
+            return self._combined[matches]
+        except KeyError:
+            schema = self._combined[matches] = {"allOf": [self._patterns[i][1] for i in matches]}
+            return schema
+
+    def accepts(self, name: str) -> bool:
+        """Return True if the given name may be added as a dynamic property
+
+        :param name: property name
+        """
+        return name not in self._properties and self.route(name) is not None
+
+
+def get_property_router(schema: dict, ctx: Context) -> PropertyRouter:
+    """Return the shared PropertyRouter for an object schema
+
+    :param schema: dict-like JSON object
+    :param ctx: Context of given schema
+    """
+    return ctx.registry.schema_cache.get('property_router', schema, PropertyRouter)
+
+
+class JSONMapModel(QtCore.QAbstractTableModel):
+    """Table model of the dynamic properties of an object, holding the raw JSON values.
+
+    Values are only formatted for display when their rows are visible, so that maps with many entries are loaded and
+    dumped in linear time.
+    """
+
+    KEY_COLUMN = 0
+    VALUE_COLUMN = 1
+
+    HEADERS = ("Key", "Value")
+
+    def __init__(self, router: PropertyRouter, parent=None):
+        super().__init__(parent)
+
+        self.router = router
+        self._keys = []
+        self._values = []
+        self._rows = {}
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._keys)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() == self.KEY_COLUMN:
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            if index.column() == self.KEY_COLUMN:
+                return self._keys[row]
+
+            preview = json.dumps(self._values[row])
+            if len(preview) > PREVIEW_LENGTH:
+                preview = preview[:PREVIEW_LENGTH - 3] + "..."
+            return preview
+
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if role != QtCore.Qt.EditRole or index.column() != self.KEY_COLUMN:
+            return False
+
+        row = index.row()
+        old_key = self._keys[row]
+        if value == old_key:
+            return True
+
+        if value in self._rows or not self.router.accepts(value):
+            return False
+
+        del self._rows[old_key]
+        self._keys[row] = value
+        self._rows[value] = row
+
+        self.dataChanged.emit(index, index)
+        return True
+
+    def key(self, row: int) -> str:
+        return self._keys[row]
+
+    def value(self, row: int):
+        return self._values[row]
+
+    def set_value(self, row: int, value):
+        self._values[row] = value
+
+        index = self.index(row, self.VALUE_COLUMN)
+        self.dataChanged.emit(index, index)
+
+    def contains(self, key: str) -> bool:
+        return key in self._rows
+
+    def add_entry(self, key: str, value) -> int:
+        """Append entry and return its row"""
+        row = len(self._keys)
+
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self._keys.append(key)
+        self._values.append(value)
+        self._rows[key] = row
+        self.endInsertRows()
+
+        return row
+
+    def remove_entry(self, row: int):
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self._rows[self._keys[row]]
+        del self._keys[row]
+        del self._values[row]
+        self.endRemoveRows()
+
+        # Rows after the removed row have moved
+        for i in range(row, len(self._keys)):
+            self._rows[self._keys[i]] = i
+
+    def set_entries(self, entries: dict):
+        """Replace all entries with those of the given dict"""
+        self.beginResetModel()
+        self._keys = list(entries.keys())
+        self._values = list(entries.values())
+        self._rows = {k: i for i, k in enumerate(self._keys)}
+        self.endResetModel()
+
+    def iter_entries(self):
+        return zip(self._keys, self._values)
@@ -0,0 +1,374 @@
+"""
+Random-access offset indexes over large JSON files.
+
+A single scan of a (memory-mapped) JSON file records the byte offsets of the values held by the top-level container,
+and by each container among the properties of a top-level object. Lazy documents built on the index parse a value
+only when it is looked up, so that an array widget need only parse the items which are displayed.
+
+The index is cached in a file alongside the JSON file, keyed by its size and modification time, so that reopening a
+large document does not scan it again.
+"""
+
+import base64
+import collections
+import json
+import mmap
+import os
+import re
+import tempfile
+from array import array
+from collections.abc import Mapping, Sequence
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.offsets'
+
+# Depth of containers whose values are indexed (the root container, and its children)
+INDEX_DEPTH = 2
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+# Numbers, and the true, false and null literals
+_LITERAL = rb'[^\s,:\[\]{}"]+'
+# Text other than brackets, as runs of other characters separated by strings. Each run is followed by a string or a
+# bracket, so that the text can be matched in only one way (were runs and strings alternatives within a repetition,
+# a failed match would be retried for every way of splitting the runs, exponentially many with nesting)
+_CONTENT = rb'[^"\[\]{}]*(?:' + _STRING + rb'[^"\[\]{}]*)*'
+
+# Text up to the next bracket outside strings (and the bracket), to skip the contents of deeply nested containers
+_NEXT_BRACKET = re.compile(_CONTENT + rb'([\[\]{}])', re.DOTALL)
+
+
+def _compile_value(depth: int):
+    """Compile an expression matching a value (and surrounding whitespace), for containers nested no deeper than
+    `depth`"""
+    container = rb'[\[{]' + _CONTENT + rb'[\]}]'
+    for _ in range(depth - 1):
+        container = rb'[\[{]' + _CONTENT + rb'(?:' + container + _CONTENT + rb')*[\]}]'
+    return re.compile(rb'[ \t\n\r]*(?:' + _STRING + rb'|' + _LITERAL + rb'|' + container + rb')[ \t\n\r]*', re.DOTALL)
+
+
+# Values skipped by a single match, most often the items of a large array (a failed match takes time linear in the
+# length of the value, so deeper values are only scanned twice)
+_KEY = re.compile(_STRING, re.DOTALL)
+_SHALLOW_VALUE = _compile_value(6)
+
+_COMMA, _COLON = b','[0], b':'[0]
+_OPEN_OBJECT, _OPEN_ARRAY = b'{'[0], b'['[0]
+_CLOSE_OBJECT, _CLOSE_ARRAY = b'}'[0], b']'[0]
+
+
+class OffsetIndex:
+    """Byte offsets of the values of a JSON container.
+
+    The container itself is held in `buffer[start:end]`, and its values in `buffer[starts[i]:ends[i]]` (including
+    surrounding whitespace). Objects record their keys in order, and indexed containers among their values are held in
+    `children` by position. The items of arrays are not indexed further.
+    """
+
+    def __init__(self, json_type: str, start: int):
+        self.json_type = json_type
+        self.start = start
+        self.end = None
+        self.keys = [] if json_type == 'object' else None
+        self.starts = array('q')
+        self.ends = array('q')
+        self.children = {}
+
+    def __len__(self):
+        return len(self.starts)
+
+    def to_json(self) -> dict:
+        obj = {
+            'type': self.json_type,
+            'start': self.start,
+            'end': self.end,
+            'starts': _encode_offsets(self.starts),
+            'ends': _encode_offsets(self.ends),
+            'children': {str(p): c.to_json() for p, c in self.children.items()},
+        }
+        if self.keys is not None:
+            obj['keys'] = self.keys
+        return obj
+
+    @classmethod
+    def from_json(cls, obj: dict) -> 'OffsetIndex':
+        index = cls(obj['type'], obj['start'])
+        index.end = obj['end']
+        if index.keys is not None:
+            index.keys = obj['keys']
+        index.starts = _decode_offsets(obj['starts'])
+        index.ends = _decode_offsets(obj['ends'])
+        index.children = {int(p): cls.from_json(c) for p, c in obj['children'].items()}
+        return index
+
+
+def _encode_offsets(offsets: array) -> str:
+    return base64.b64encode(offsets.tobytes()).decode('ascii')
+
+
+def _decode_offsets(data: str) -> array:
+    offsets = array('q')
+    offsets.frombytes(base64.b64decode(data))
+    return offsets
+
+
+def build_offset_index(data, max_depth: int = INDEX_DEPTH) -> OffsetIndex:
+    """Scan a JSON document, returning the offset index of its root container (or None if the root is not a container)
+
+    Only the indexed containers are tokenised; other values are skipped by regular expressions, which match a whole
+    value unless it is deeply nested (and its contents up to each bracket otherwise). The document is not otherwise
+    validated; malformed values are reported when parsed.
+
+    :param data: bytes-like JSON document, such as an mmap
+    :param max_depth: depth of containers whose values are indexed
+    """
+    position = _skip_whitespace(data, 0)
+    if position == len(data) or data[position] not in (_OPEN_OBJECT, _OPEN_ARRAY):
+        return None
+
+    try:
+        root, position = _index_container(data, position, 1, max_depth)
+    except IndexError:
+        raise ValueError("Unterminated container")
+
+    position = _skip_whitespace(data, position)
+    if position != len(data):
+        raise ValueError("Extra data at offset {}".format(position))
+
+    return root
+
+
+def _skip_whitespace(data, position: int) -> int:
+    return _WHITESPACE.match(data, position).end()
+
+
+def _index_container(data, start: int, depth: int, max_depth: int) -> tuple:
+    """Index the container opened at `start`, returning its index and the offset after it"""
+    is_object = data[start] == _OPEN_OBJECT
+    node = OffsetIndex('object' if is_object else 'array', start)
+    closer = _CLOSE_OBJECT if is_object else _CLOSE_ARRAY
+
+    position = start + 1
+    end = _skip_whitespace(data, position)
+    if data[end] == closer:
+        node.end = end + 1
+        return node, node.end
+
+    while True:
+        if is_object:
+            position = _skip_whitespace(data, position)
+            key = _KEY.match(data, position)
+            if key is None:
+                raise ValueError("Expected key at offset {}".format(position))
+            node.keys.append(json.loads(key.group()))
+
+            position = _skip_whitespace(data, key.end())
+            if data[position] != _COLON:
+                raise ValueError("Expected ':' at offset {}".format(position))
+            position += 1
+
+        node.starts.append(position)
+
+        if is_object and depth < max_depth:
+            position = _skip_whitespace(data, position)
+            if data[position] == _OPEN_OBJECT or data[position] == _OPEN_ARRAY:
+                node.children[len(node.starts) - 1], position = _index_container(data, position, depth + 1, max_depth)
+                position = _skip_whitespace(data, position)
+            else:
+                position = _skip_value(data, position)
+        else:
+            position = _skip_value(data, position)
+
+        node.ends.append(position)
+
+        char = data[position]
+        if char == closer:
+            node.end = position + 1
+            return node, node.end
+        if char != _COMMA:
+            raise ValueError("Unexpected {!r} at offset {}".format(chr(char), position))
+        position += 1
+
+
+def _skip_value(data, position: int) -> int:
+    """Return the offset after the value at `position` and the whitespace around it, without tokenising its contents"""
+    match = _SHALLOW_VALUE.match(data, position)
+    if match is not None:
+        return match.end()
+
+    position = _skip_whitespace(data, position)
+    if data[position] != _OPEN_OBJECT and data[position] != _OPEN_ARRAY:
+        raise ValueError("Expected value at offset {}".format(position))
+
+    return _skip_whitespace(data, _skip_container(data, position))
+
+
+def _skip_container(data, start: int) -> int:
+    """Return the offset after the container opened at `start`, without tokenising its contents"""
+    depth = 0
+    position = start
+
+    while True:
+        match = _NEXT_BRACKET.match(data, position)
+        if match is None:
+            raise ValueError("Unterminated container at offset {}".format(start))
+        position = match.end()
+
+        if data[position - 1] in (_OPEN_OBJECT, _OPEN_ARRAY):
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return position
+
+
+def get_index_path(file_path: str) -> str:
+    """Return path of the cached offset index of a JSON file"""
+    return os.fspath(file_path) + INDEX_SUFFIX
+
+
+def load_offset_index(file_path: str, buffer=None) -> OffsetIndex:
+    """Return the offset index of a JSON file, from the cache alongside the file if it is up to date
+
+    The index is built (and cached, where the directory is writable) otherwise.
+
+    :param file_path: path to JSON file
+    :param buffer: bytes-like contents of the file, if already mapped
+    """
+    stat = os.stat(file_path)
+    index_path = get_index_path(file_path)
+
+    try:
+        with open(index_path) as f:
+            cached = json.load(f)
+
+        if (cached['version'], cached['size'], cached['mtime_ns']) == (INDEX_VERSION, stat.st_size, stat.st_mtime_ns):
+            return OffsetIndex.from_json(cached['root']) if cached['root'] is not None else None
+
+    except (OSError, ValueError, KeyError):
+        pass
+
+    if buffer is None:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            index = build_offset_index(buffer)
+    else:
+        index = build_offset_index(buffer)
+
+    cached = {
+        'version': INDEX_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'root': index.to_json() if index is not None else None,
+    }
+
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index_path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cached, f)
+            os.replace(temp_path, index_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    except OSError:
+        # The index is only a cache
+        pass
+
+    return index
+
+
+def open_lazy_json(file_path: str):
+    """Open a JSON file, returning a lazy document whose values are parsed on demand
+
+    Documents whose root is not a container are parsed at once.
+
+    :param file_path: path to JSON file
+    """
+    with open(file_path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    index = load_offset_index(file_path, buffer)
+    if index is None:
+        return _parse(buffer, 0, len(buffer))
+
+    return _create_lazy_container(buffer, index)
+
+
+def materialise(value):
+    """Return a JSON value, parsing it in full if it is a lazy container
+
+    :param value: JSON value, LazyJSONObject or LazyJSONArray
+    """
+    if isinstance(value, _LazyJSONContainer):
+        return value.materialise()
+    return value
+
+
+def _parse(buffer, start: int, end: int):
+    return json.loads(buffer[start:end], object_pairs_hook=collections.OrderedDict)
+
+
+def _create_lazy_container(buffer, index: OffsetIndex):
+    if index.json_type == 'object':
+        return LazyJSONObject(buffer, index)
+    return LazyJSONArray(buffer, index)
+
+
+class _LazyJSONContainer:
+    def __init__(self, buffer, index: OffsetIndex):
+        self._buffer = buffer
+        self._index = index
+
+    def materialise(self):
+        """Return the container parsed in full"""
+        return _parse(self._buffer, self._index.start, self._index.end)
+
+    def _get_value(self, position: int):
+        try:
+            return _create_lazy_container(self._buffer, self._index.children[position])
+        except KeyError:
+            return _parse(self._buffer, self._index.starts[position], self._index.ends[position])
+
+
+class LazyJSONObject(_LazyJSONContainer, Mapping):
+    """Read-only JSON object whose values are parsed when looked up"""
+
+    def __init__(self, buffer, index: OffsetIndex):
+        super().__init__(buffer, index)
+
+        # As with json, the last of duplicate keys wins
+        self._positions = {k: i for i, k in enumerate(index.keys)}
+
+    def __getitem__(self, key):
+        return self._get_value(self._positions[key])
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __repr__(self):
+        return "LazyJSONObject({} keys)".format(len(self))
+
+
+class LazyJSONArray(_LazyJSONContainer, Sequence):
+    """Read-only JSON array whose items are parsed when looked up"""
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get_value(i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Array index out of range")
+
+        return self._get_value(index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __repr__(self):
+        return "LazyJSONArray({} items)".format(len(self))
@@ -0,0 +1,139 @@
+"""
+Progressive construction of widget trees on the Qt event loop.
+
+The properties of object widgets are first created as lightweight placeholders, which are then built breadth-first in
+small batches across event loop iterations, within a time budget per batch. The window therefore remains responsive,
+the top-level fields appear first, and the finished tree is identical to one constructed eagerly.
+"""
+
+import time
+from collections import deque
+
+from PyQt5 import QtCore, QtWidgets
+
+from .tools import Context
+from .widgets import JSONBaseWidget, _create_widget
+
+# Time spent building widgets per event loop iteration (seconds)
+FRAME_BUDGET = 0.010
+
+
+class PendingWidget(JSONBaseWidget, QtWidgets.QLabel):
+    """Placeholder for a widget whose construction has been deferred to a ProgressiveBuilder.
+
+    Values loaded into the placeholder are applied to the widget once built. Any request for the value of the
+    placeholder builds the widget immediately.
+    """
+
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget):
+        super().__init__(name, schema, ctx, parent)
+        self.setText("Loading {}...".format(name))
+
+        self.widget = None
+        self._pending_data = []
+
+    def materialise(self) -> JSONBaseWidget:
+        """Build the deferred widget (if not already built), replacing the placeholder in its parent"""
+        if self.widget is None:
+            # Defaults are among the values loaded into the placeholder by its parent
+            self.widget = _create_widget(self.name, self.schema, self.ctx, self.parent, apply_default=False)
+
+            for data in self._pending_data:
+                self.widget.load_json_object(data)
+            self._pending_data = []
+
+            self.parent.replace_child(self, self.widget)
+            self.builder.widget_built()
+
+        return self.widget
+
+    def dump_json_object(self):
+        return self.materialise().dump_json_object()
+
+    def json_hash(self) -> bytes:
+        return self.materialise().json_hash()
+
+    def reload_schema(self, schema: dict, ctx: Context) -> bool:
+        return False
+
+    def load_json_object(self, data):
+        if self.widget is None:
+            self._pending_data.append(data)
+        else:
+            self.widget.load_json_object(data)
+
+
+class ProgressiveBuilder(QtCore.QObject):
+    """Build deferred widgets across event loop iterations.
+
+    Pass the builder to `create_widget`, which defers the construction of nested widgets to it; building starts
+    when control returns to the event loop. `progress` is emitted after each batch with the number of widgets built
+    and the number deferred so far, and `finished` once the queue is empty (on the first iteration, if nothing was
+    deferred), after which the builder builds nothing further (later widgets are constructed eagerly).
+    """
+
+    progress = QtCore.pyqtSignal(int, int)
+    finished = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None, frame_budget=FRAME_BUDGET):
+        super().__init__(parent)
+
+        self.frame_budget = frame_budget
+        self.is_active = True
+        self.built_count = 0
+        self.deferred_count = 0
+
+        self._queue = deque()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._build_batch)
+
+        # Started now, so that the builder finishes even if nothing is deferred to it
+        self._timer.start()
+
+    def defer(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget) -> PendingWidget:
+        """Return placeholder for a widget, to be built by the builder"""
+        placeholder = PendingWidget(name, schema, ctx, parent)
+        self._queue.append(placeholder)
+        self.deferred_count += 1
+        return placeholder
+
+    def widget_built(self):
+        self.built_count += 1
+
+    def complete(self):
+        """Build all remaining widgets immediately"""
+        while self._queue:
+            self._queue.popleft().materialise()
+
+        self._finish()
+
+    def cancel(self):
+        """Abandon the remaining widgets, such as when the tree is discarded"""
+        self._queue.clear()
+        self._timer.stop()
+        self.is_active = False
+
+    def _build_batch(self):
+        # Nothing was deferred, or all was built on demand
+        if not self._queue:
+            self._finish()
+            return
+
+        deadline = time.perf_counter() + self.frame_budget
+
+        while self._queue and time.perf_counter() < deadline:
+            # Placeholders may already have been built on demand
+            self._queue.popleft().materialise()
+
+        self.progress.emit(self.built_count, self.deferred_count)
+
+        if not self._queue:
+            self._finish()
+
+    def _finish(self):
+        self._timer.stop()
+
+        if self.is_active:
+            self.is_active = False
+            self.finished.emit()
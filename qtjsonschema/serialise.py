@@ -0,0 +1,132 @@
+"""
+Streaming JSON serialisation of widget trees.
+
+Rather than building the full document with `dump_json_object()` and then the full output string, the tree is walked
+and written out in small chunks, so that peak memory is bounded by the depth of the document rather than its size.
+"""
+
+import json
+import os
+import tempfile
+
+from .widgets import JSONBaseWidget
+
+
+def iter_json_chunks(node, indent: int = 4, sort_keys: bool = True):
+    """Yield chunks of JSON text for a widget or plain JSON object.
+
+    Output is identical to `json.dumps(node.dump_json_object(), indent=indent, sort_keys=sort_keys)`.
+
+    :param node: JSONBaseWidget or dict-like JSON object
+    :param indent: indentation level (or None for a single line)
+    :param sort_keys: sort object keys, rather than using schema order
+    """
+    return _iter_chunks(node, indent, sort_keys, 0)
+
+
+def write_json(file_path: str, node, indent: int = 4, sort_keys: bool = True):
+    """Write a widget or plain JSON object to a file.
+
+    The output is written to a temporary file in the same directory, which is atomically renamed over `file_path`
+    once complete. An existing file is therefore never left partially written.
+
+    :param file_path: path of output file
+    :param node: JSONBaseWidget or dict-like JSON object
+    :param indent: indentation level (or None for a single line)
+    :param sort_keys: sort object keys, rather than using schema order
+    """
+    file_path = os.path.abspath(file_path)
+    directory, file_name = os.path.split(file_path)
+
+    fd, temp_path = tempfile.mkstemp(prefix=".{}.".format(file_name), suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            for chunk in iter_json_chunks(node, indent, sort_keys):
+                f.write(chunk)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.chmod(temp_path, _get_file_mode(file_path))
+        os.replace(temp_path, file_path)
+
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _get_file_mode(file_path: str) -> int:
+    try:
+        return os.stat(file_path).st_mode & 0o777
+
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _get_children(node):
+    """Return JSON type and children of a widget or plain JSON object.
+
+    Leaf widgets are dumped, and are thereafter treated as plain JSON objects.
+    """
+    if isinstance(node, JSONBaseWidget):
+        if node.json_type is None:
+            return _get_children(node.dump_json_object())
+
+        return node.json_type, node.iter_json_children(), node
+
+    if isinstance(node, dict):
+        return 'object', iter(node.items()), node
+
+    if isinstance(node, (list, tuple)):
+        return 'array', iter(node), node
+
+    return None, None, node
+
+
+def _iter_chunks(node, indent, sort_keys, level):
+    json_type, children, value = _get_children(node)
+
+    if json_type is None:
+        yield json.dumps(value)
+        return
+
+    if json_type == 'object':
+        start, end = '{', '}'
+        if sort_keys:
+            children = iter(sorted(children, key=lambda item: item[0]))
+
+    else:
+        start, end = '[', ']'
+
+    if indent is None:
+        item_separator = ', '
+        newline = closing_newline = ''
+    else:
+        item_separator = ','
+        newline = '\n' + ' ' * (indent * (level + 1))
+        closing_newline = '\n' + ' ' * (indent * level)
+
+    is_first = True
+    for child in children:
+        if is_first:
+            yield start
+            is_first = False
+        else:
+            yield item_separator
+
+        yield newline
+
+        if json_type == 'object':
+            key, child = child
+            yield json.dumps(key)
+            yield ': '
+
+        yield from _iter_chunks(child, indent, sort_keys, level + 1)
+
+    if is_first:
+        yield start + end
+    else:
+        yield closing_newline
+        yield end
@@ -0,0 +1,150 @@
+"""
+Schema sessions, sharing one resolved schema between many open documents.
+"""
+
+import collections
+import json
+import os
+import weakref
+from pathlib import Path
+
+from jsonschema import Draft4Validator, FormatChecker
+from referencing import Registry
+from referencing.jsonschema import DRAFT4
+from uritools import urijoin
+
+from .bundle import BundleResourceLoader, register_bundle
+from .columnar import ColumnarDraft4Validator
+from .tools import create_default_uri_loader_registry
+from .widgets import JSONBaseWidget, create_widget, reload_widget
+
+
+class SchemaSession:
+    """Checked schema, URI loader registry and validator shared between the documents editing it.
+
+    Documents created from the same session share resolved references and loaded resources, so that each additional
+    document costs little more than its own widgets and data. The bundle of a session (if any) is closed with the
+    session, or once the session is no longer used.
+    """
+
+    def __init__(self, schema: dict, schema_uri: str = None, format_checker: FormatChecker = None,
+                 bundle: BundleResourceLoader = None):
+        Draft4Validator.check_schema(schema)
+
+        self.schema = schema
+        self.schema_uri = schema_uri
+        self.title = schema.get("title", "<root>")
+        self.registry = create_default_uri_loader_registry(schema, schema_uri)
+
+        # Referenced documents held by a bundle are loaded from it, without network access. The registry may outlive
+        # the session in a reference cycle, so the bundle is unmapped when the session is collected
+        self.bundle = bundle
+        if bundle is not None:
+            register_bundle(self.registry, bundle)
+            self._finalizer = weakref.finalize(self, bundle.close)
+
+        # Large arrays of flat objects are validated by column
+        references = Registry(retrieve=_create_retriever(self.registry, schema_uri))
+        self.validator = ColumnarDraft4Validator(schema, registry=references, format_checker=format_checker)
+
+    @classmethod
+    def from_file(cls, file_path: str, format_checker: FormatChecker = None,
+                  bundle_path: str = None) -> 'SchemaSession':
+        """Load a session from a schema file
+
+        :param file_path: path to schema file
+        :param format_checker: FormatChecker used by session validator
+        :param bundle_path: path to bundle of referenced documents (optional)
+        """
+        schema_path = Path(file_path)
+        with schema_path.open() as f:
+            schema = json.loads(f.read(), object_pairs_hook=collections.OrderedDict)
+
+        schema_uri = schema_path.absolute().as_uri()
+
+        # Documents are served relative to the schema, which is used in place of its bundled copy
+        bundle = BundleResourceLoader(bundle_path, schema_uri, schema) if bundle_path else None
+        return cls(schema, schema_uri, format_checker, bundle)
+
+    def create_widget(self, builder=None) -> JSONBaseWidget:
+        """Create a new root widget for a document of this schema
+
+        :param builder: ProgressiveBuilder to which the construction of nested widgets is deferred (optional)
+        """
+        return create_widget(self.title, self.schema, self.schema_uri, registry=self.registry, builder=builder)
+
+    def reload_widget(self, widget: JSONBaseWidget) -> JSONBaseWidget:
+        """Update a root widget created by another session for the schema of this session, preserving its values.
+        Returns the given widget, or its replacement if the root itself was rebuilt.
+
+        :param widget: root widget
+        """
+        return reload_widget(widget, self.title, self.schema, self.schema_uri, registry=self.registry)
+
+    def iter_errors(self, data):
+        """Iterate over validation errors for the given data
+
+        :param data: JSON object
+        """
+        return self.validator.iter_errors(data)
+
+    def close(self):
+        """Close the bundle of the session (if any), after which bundled documents not yet loaded cannot be loaded"""
+        if self.bundle is not None:
+            self._finalizer()
+
+    def __repr__(self):
+        return "SchemaSession({!r})".format(self.schema_uri)
+
+
+def _create_retriever(registry, schema_uri: str = None):
+    """Return a function retrieving the documents referenced by the validator through the same (cached) registry as
+    the widgets
+
+    The validator resolves references relative to the `id` of the schema (if any), so references relative to its file
+    are completed here. The function does not refer to the session, which would otherwise be kept alive by its
+    validator.
+    """
+    def retrieve(uri: str):
+        return DRAFT4.create_resource(registry.load_uri(urijoin(schema_uri or "", uri)))
+
+    return retrieve
+
+
+class SessionCache:
+    """Sessions loaded from schema files, reused for as long as the file (and bundle, if any) is unchanged.
+
+    A session replaced after its files have changed is released by the cache, and its bundle closed once no window
+    edits its documents.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+
+    def get(self, file_path: str, format_checker: FormatChecker = None, bundle_path: str = None) -> SchemaSession:
+        """Return the session of a schema file, loading it if not cached or if the file has since changed
+
+        :param file_path: path to schema file
+        :param format_checker: FormatChecker used by session validator, if loaded
+        :param bundle_path: path to bundle of referenced documents (optional)
+        """
+        file_path = str(Path(file_path).absolute())
+        mtime = os.stat(file_path).st_mtime_ns
+
+        if bundle_path:
+            bundle_path = str(Path(bundle_path).absolute())
+            mtime = mtime, os.stat(bundle_path).st_mtime_ns
+
+        key = file_path, bundle_path
+
+        try:
+            cached_mtime, session = self._sessions[key]
+        except KeyError:
+            pass
+        else:
+            if cached_mtime == mtime:
+                return session
+
+        session = SchemaSession.from_file(file_path, format_checker, bundle_path)
+        self._sessions[key] = mtime, session
+        return session
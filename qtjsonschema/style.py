@@ -0,0 +1,92 @@
+"""
+Application stylesheet for JSON schema widgets.
+
+Widgets are styled through dynamic properties matched by a single application-wide stylesheet, rather than by
+stylesheets of their own, so that changing their state only repolishes the widget concerned.
+"""
+
+from PyQt5 import QtCore, QtWidgets
+
+VALID_COLOUR = '#c4df9b'
+INVALID_COLOUR = '#f6989d'
+DIFFERENT_COLOUR = '#fbe3a1'
+
+STYLESHEET = """
+/* qtjsonschema */
+QLabel[heading="true"] {{ font-weight: bold; }}
+*[required="true"] > QLabel {{ font-weight: bold; }}
+QCheckBox[required="true"] {{ font-weight: bold; }}
+QLabel[state="unsupported"] {{ font-style: italic; }}
+QLabel[state="valid"] {{ color: green; }}
+QLabel[state="invalid"] {{ color: red; }}
+QLineEdit[state="valid"] {{ background-color: {valid}; }}
+QLineEdit[state="invalid"] {{ background-color: {invalid}; }}
+*[different="true"] {{ background-color: {different}; }}
+""".format(valid=VALID_COLOUR, invalid=INVALID_COLOUR, different=DIFFERENT_COLOUR)
+
+
+def install_stylesheet(app: QtWidgets.QApplication = None):
+    """Append the widget stylesheet to that of the application, if not already installed
+
+    :param app: QApplication (defaults to the running application)
+    """
+    if app is None:
+        app = QtWidgets.QApplication.instance()
+        if app is None:
+            return
+
+    stylesheet = app.styleSheet()
+    if STYLESHEET not in stylesheet:
+        app.setStyleSheet(stylesheet + STYLESHEET)
+
+
+def set_heading(widget: QtWidgets.QWidget):
+    """Style widget as a heading"""
+    widget.setProperty("heading", True)
+
+
+def set_state(widget: QtWidgets.QWidget, state: str):
+    """Set the state property of a widget, repolishing it only if the state has changed
+
+    :param widget: QWidget
+    :param state: one of 'valid', 'invalid' or 'unsupported' (or None)
+    """
+    _set_property(widget, "state", state)
+
+
+def set_required(widget: QtWidgets.QWidget, required: bool):
+    """Style widget as required (by a dependency), repolishing it only if this has changed
+
+    :param widget: QWidget
+    :param required: True if the widget is required
+    """
+    if _set_property(widget, "required", required):
+        # The labels of the widget are styled by the property of their parent
+        for label in widget.findChildren(QtWidgets.QLabel, options=QtCore.Qt.FindDirectChildrenOnly):
+            _repolish(label)
+
+
+def set_different(widget: QtWidgets.QWidget, different: bool):
+    """Highlight widget as differing from a compared value, repolishing it only if the highlight has changed
+
+    :param widget: QWidget
+    :param different: True if the widget differs
+    """
+    # Plain QWidget subclasses only draw stylesheet backgrounds when asked to
+    widget.setAttribute(QtCore.Qt.WA_StyledBackground, True)
+    _set_property(widget, "different", different)
+
+
+def _set_property(widget: QtWidgets.QWidget, name: str, value) -> bool:
+    if widget.property(name) == value:
+        return False
+
+    widget.setProperty(name, value)
+    _repolish(widget)
+    return True
+
+
+def _repolish(widget: QtWidgets.QWidget):
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
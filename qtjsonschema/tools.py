@@ -1,4 +1,8 @@
+import re
+import sys
+import weakref
 from abc import ABC, abstractmethod
+from collections.abc import Mapping, Sequence
 from functools import lru_cache
 from json import load as load_json
 from platform import system
@@ -61,11 +65,65 @@ class DocumentLoader(ResourceLoader):
         return self.document
 
 
+class SchemaCache:
+    """Values derived from the objects of loaded schemas, such as enum indexes and default documents.
+
+    Objects are identified by their id, and held (so that the id is not reused) for the lifetime of the cache. Each
+    URILoaderRegistry has its own cache, released with the registry (as when a changed schema is reloaded).
+    """
+
+    def __init__(self):
+        self._values = {}
+
+    def get(self, kind: str, obj, create):
+        """Return the value of the given kind derived from an object, creating it if not cached
+
+        :param kind: name of the kind of value
+        :param obj: schema object from which the value is derived
+        :param create: callable returning the value, given the object
+        """
+        key = kind, id(obj)
+
+        try:
+            cached_obj, value = self._values[key]
+        except KeyError:
+            pass
+        else:
+            if cached_obj is obj:
+                return value
+
+        value = create(obj)
+        self._values[key] = obj, value
+        return value
+
+    def find(self, kind: str, obj, default=None):
+        """Return the cached value of the given kind derived from an object, or `default` if not cached
+
+        :param kind: name of the kind of value
+        :param obj: schema object from which the value is derived
+        :param default: value returned if none is cached
+        """
+        try:
+            cached_obj, value = self._values[kind, id(obj)]
+        except KeyError:
+            return default
+
+        return value if cached_obj is obj else default
+
+    def clear(self):
+        self._values.clear()
+
+    def __len__(self):
+        return len(self._values)
+
+
 class URILoaderRegistry:
     """Registry to load a URI according to URI scheme"""
 
     def __init__(self):
         self.scheme_to_loader = {}
+        # Values derived from the schemas loaded through this registry
+        self.schema_cache = SchemaCache()
 
     def load_resource_from_loader(self, loader: ResourceLoader, uri: str) -> dict:
         """Return JSON object returned by loader for given URI
@@ -89,7 +147,7 @@ class URILoaderRegistry:
 
         if result.fragment:
             assert result.fragment.startswith("/")
-            reference = Reference(result.fragment[1:])
+            reference = get_reference(result.fragment[1:])
             return reference.extract(resource)
 
         return resource
@@ -110,9 +168,99 @@ def create_cached_uri_loader_registry(cache_size=1024):
     return CachedURILoaderRegistry
 
 
+def create_default_uri_loader_registry(schema: dict, schema_uri: str = None) -> URILoaderRegistry:
+    """Create a cached URILoaderRegistry with loaders registered for the supported URI schemes
+
+    :param schema: dict-like JSON object
+    :param schema_uri: URI corresponding to given schema object
+    """
+    registry_class = create_cached_uri_loader_registry()
+    registry = registry_class()
+
+    http_loader = HTTPResourceLoader()
+    file_resource_loader = FileResourceLoader()
+    document_loader = DocumentLoader(schema, schema_uri)
+
+    registry.register_for_scheme('http', http_loader)
+    registry.register_for_scheme('https', http_loader)
+    registry.register_for_scheme('file', file_resource_loader)
+    registry.register_for_scheme(None, document_loader)
+
+    return registry
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern: str):
+    """Return compiled regular expression for a schema pattern, shared by all users of the same pattern
+
+    :param pattern: regular expression source
+    """
+    return re.compile(pattern)
+
+
+def canonical_key(value):
+    """Return hashable key for a JSON value, such that equal JSON values have equal keys.
+
+    Booleans are distinct from numbers (`True` vs `1`), and the key order of objects is ignored.
+
+    :param value: JSON value
+    """
+    if isinstance(value, bool):
+        return 'boolean', value
+
+    if isinstance(value, (int, float)):
+        return 'number', value
+
+    if isinstance(value, str):
+        return 'string', value
+
+    if value is None:
+        return ('null',)
+
+    if isinstance(value, dict):
+        return 'object', frozenset((k, canonical_key(v)) for k, v in value.items())
+
+    if isinstance(value, (list, tuple)):
+        return 'array', tuple(canonical_key(v) for v in value)
+
+    raise TypeError("Value {!r} is not a JSON value".format(value))
+
+
+def get_json_type(value) -> str:
+    """Return the JSON schema (draft 4) primitive type name of a JSON value
+
+    :param value: JSON value
+    """
+    if isinstance(value, bool):
+        return 'boolean'
+
+    if isinstance(value, int):
+        return 'integer'
+
+    if isinstance(value, float):
+        return 'number'
+
+    if isinstance(value, str):
+        return 'string'
+
+    if value is None:
+        return 'null'
+
+    # Including lazy containers (see `offsets`)
+    if isinstance(value, Mapping):
+        return 'object'
+
+    if isinstance(value, Sequence):
+        return 'array'
+
+    raise TypeError("Value {!r} is not a JSON value".format(value))
+
+
 class Reference:
+    __slots__ = ('elements',)
+
     def __init__(self, uri: str):
-        self.elements = [e.replace('~1', '/').replace('~0', '~') for e in uri.split('/')]
+        self.elements = tuple(e.replace('~1', '/').replace('~0', '~') for e in uri.split('/'))
 
     def extract(self, obj: dict):
         """Return JSON object associated with this reference URI
@@ -124,12 +272,40 @@ class Reference:
         return obj
 
 
+@lru_cache(maxsize=None)
+def get_reference(uri: str) -> Reference:
+    """Return Reference for a JSON pointer, shared by all references to the same pointer
+
+    :param uri: JSON pointer, without its leading '/'
+    """
+    return Reference(uri)
+
+
 class Context:
-    """Object describing JSON scope context for dereferencing '$ref' references whilst respecting 'id' fields"""
+    """Object describing JSON scope context for dereferencing '$ref' references whilst respecting 'id' fields
+
+    Contexts are immutable, and interned: constructing a context equal to one which is alive returns that context, so
+    that every node of a scope shares one context.
+    """
+
+    __slots__ = ('scope_uri', 'registry', '__weakref__')
+
+    _instances = weakref.WeakValueDictionary()
+
+    def __new__(cls, scope_uri: str, registry: URILoaderRegistry):
+        key = cls, scope_uri, registry
 
-    def __init__(self, scope_uri: str, registry: URILoaderRegistry):
-        self.scope_uri = scope_uri
-        self.registry = registry
+        ctx = cls._instances.get(key)
+        if ctx is None:
+            ctx = super().__new__(cls)
+            object.__setattr__(ctx, 'scope_uri', sys.intern(scope_uri))
+            object.__setattr__(ctx, 'registry', registry)
+            cls._instances[key] = ctx
+
+        return ctx
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Context is immutable")
 
     def follow_uri(self, uri: str) -> 'Context':
         """Return new Context corresponding to scope after following uri
@@ -147,5 +323,19 @@ class Context:
         reference_path = urijoin(self.scope_uri, uri)
         return self.registry.load_uri(reference_path)
 
+    def resolve(self, schema: dict):
+        """Return schema and context after following `id` scope changes and `$ref` references
+
+        :param schema: dict-like JSON object in this context
+        """
+        ctx = self
+        if "id" in schema:
+            ctx = ctx.follow_uri(schema['id'])
+
+        while "$ref" in schema:
+            schema = ctx.dereference(schema['$ref'])
+
+        return schema, ctx
+
     def __repr__(self):
         return "Context({!r}, {!r})".format(self.scope_uri, self.registry)
@@ -0,0 +1,85 @@
+"""
+Incremental detection of duplicate array items, for the `uniqueItems` keyword.
+"""
+
+
+class UniqueItemIndex:
+    """Index of the items of an array by the structural hashes of their values.
+
+    The index is updated as single items are added, changed or removed. Each update reports the items whose duplicate
+    status may have changed, which are only those sharing the previous or the new value of the updated item.
+    """
+
+    def __init__(self):
+        # Hash of each item, and items (in insertion order) of each hash
+        self._hashes = {}
+        self._items = {}
+
+        # Number of items whose value occurs earlier in the array
+        self.duplicate_count = 0
+
+    def __contains__(self, item):
+        return item in self._hashes
+
+    def set(self, item, item_hash: bytes) -> list:
+        """Record the hash of an item, returning the items whose duplicate status may have changed
+
+        :param item: hashable item
+        :param item_hash: structural hash of the value of the item
+        """
+        previous_hash = self._hashes.get(item)
+        if previous_hash == item_hash:
+            return []
+
+        affected = self._discard(item, previous_hash) if previous_hash is not None else [item]
+
+        self._hashes[item] = item_hash
+        group = self._items.setdefault(item_hash, {})
+        group[item] = None
+
+        if len(group) > 1:
+            self.duplicate_count += 1
+
+        # The first duplicate also makes a duplicate of the item it duplicates
+        if len(group) == 2:
+            affected.extend(group)
+
+        return affected
+
+    def remove(self, item) -> list:
+        """Remove an item, returning the items whose duplicate status may have changed
+
+        :param item: hashable item
+        """
+        try:
+            item_hash = self._hashes.pop(item)
+        except KeyError:
+            return []
+
+        return self._discard(item, item_hash)
+
+    def is_duplicate(self, item) -> bool:
+        """Return True if the value of an item is shared by another item"""
+        try:
+            return len(self._items[self._hashes[item]]) > 1
+        except KeyError:
+            return False
+
+    def clear(self):
+        self._hashes.clear()
+        self._items.clear()
+        self.duplicate_count = 0
+
+    def _discard(self, item, item_hash: bytes) -> list:
+        group = self._items[item_hash]
+        del group[item]
+
+        if group:
+            self.duplicate_count -= 1
+        else:
+            del self._items[item_hash]
+
+        # The last remaining item of a value is no longer a duplicate
+        if len(group) == 1:
+            return [item, *group]
+        return [item]
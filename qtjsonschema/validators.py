@@ -1,9 +1,22 @@
-import re
+import atexit
+import multiprocessing
+import time
 
-from PyQt5 import QtGui
-from jsonschema import FormatChecker, FormatError
+from PyQt5 import QtCore
+from jsonschema import FormatChecker
+from jsonschema.exceptions import FormatError
 
 from .errors import ValidationError
+from .style import set_state
+from .tools import compile_pattern
+
+# Time permitted for a pattern to be evaluated, before it is reported as unresponsive (seconds)
+PATTERN_TIMEOUT = 0.5
+# Time permitted for the pattern worker process to start, before patterns are reported as unable to be evaluated
+# (seconds)
+PATTERN_START_TIMEOUT = 10.0
+# Interval at which pending pattern evaluations are polled (milliseconds)
+PATTERN_POLL_INTERVAL = 10
 
 
 class FormatValidator:
@@ -19,13 +32,230 @@ class FormatValidator:
         return True
 
 
+def _search_pattern(pattern, text):
+    # Evaluated in the PatternEvaluator worker process
+    return compile_pattern(pattern).search(text) is not None
+
+
+class PatternUnavailableError(Exception):
+    """Error raised when a pattern cannot be evaluated, as the worker process could not be started"""
+
+
+class _UnavailableResult:
+    """Result of a search which could not be queued, in place of the AsyncResult of the worker"""
+
+    def ready(self) -> bool:
+        return True
+
+    def get(self):
+        raise PatternUnavailableError
+
+
+class PatternEvaluator:
+    """Evaluate patterns in a worker process.
+
+    A pattern which backtracks catastrophically only occupies the worker, which is restarted once it has made no
+    progress for the timeout, rather than blocking the GUI thread. Searches queued behind other searches are therefore
+    not timed out merely for waiting, and those abandoned by a restart are submitted again to the new worker.
+
+    The worker is spawned, and so imports the main module of the process. If it cannot be started (as within a worker
+    spawned by a main module which does not guard its code with `if __name__ == "__main__"`), or does not start within
+    the start timeout, searches fail with PatternUnavailableError; they are not evaluated in the GUI thread instead,
+    where a catastrophic pattern would block it.
+    """
+
+    def __init__(self, timeout=PATTERN_TIMEOUT, start_timeout=PATTERN_START_TIMEOUT):
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.last_progress = time.monotonic()
+        self.started = False
+        # False once the worker has failed to start
+        self.available = True
+        # Number of times the worker has been restarted
+        self.generation = 0
+        self._pool = None
+        self._start_time = None
+
+    def submit(self, pattern: str, text: str) -> 'PendingSearch':
+        """Begin searching text for pattern, and return the pending search"""
+        return PendingSearch(self, pattern, text, self.timeout)
+
+    def apply(self, pattern: str, text: str):
+        """Queue a search in the worker process (starting it if needed), returning its AsyncResult
+
+        If the worker is unavailable, the result raises PatternUnavailableError.
+        """
+        if self._pool is None and self.available:
+            self._start()
+
+        if self._pool is None:
+            return _UnavailableResult()
+
+        return self._pool.apply_async(_search_pattern, (pattern, text), callback=self._record_progress)
+
+    def _start(self):
+        try:
+            self._pool = multiprocessing.get_context('spawn').Pool(1)
+        except (OSError, RuntimeError):
+            self.available = False
+            return
+
+        # Worker start-up is not counted against the timeout of the first search
+        self.started = False
+        self._start_time = time.monotonic()
+        self._pool.apply_async(_search_pattern, ('', ''), callback=self._record_start)
+
+    def check_started(self) -> bool:
+        """Return True if the worker has started, abandoning it if it has not started within the start timeout"""
+        if not self.started and self._pool is not None and time.monotonic() - self._start_time > self.start_timeout:
+            self.available = False
+            self.restart()
+
+        return self.started
+
+    def restart(self):
+        """Terminate the worker process, abandoning pending searches"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+            self.generation += 1
+
+    def _record_start(self, result):
+        # Called from the result handler thread of the pool
+        self.last_progress = time.monotonic()
+        self.started = True
+
+    def _record_progress(self, result):
+        # Called from the result handler thread of the pool
+        self.last_progress = time.monotonic()
+
+    def restart_generation(self, generation: int):
+        """Terminate the worker process of the given generation, if it has not already been restarted"""
+        if generation == self.generation:
+            self.restart()
+
+
+class PendingSearch:
+    """Search submitted to a PatternEvaluator"""
+
+    def __init__(self, evaluator: PatternEvaluator, pattern: str, text: str, timeout: float):
+        self._evaluator = evaluator
+        self._pattern = pattern
+        self._text = text
+        self.timeout = timeout
+        self._submit()
+
+    def _submit(self):
+        self._generation = self._evaluator.generation
+        self._result = self._evaluator.apply(self._pattern, self._text)
+        self._submitted = time.monotonic()
+
+    def _resubmit_abandoned(self):
+        # Searches pending when the worker was restarted (for another search) are submitted to the new worker
+        if self._generation != self._evaluator.generation and not self._result.ready():
+            self._submit()
+
+    def ready(self) -> bool:
+        return self._result.ready() or self.timed_out()
+
+    def timed_out(self) -> bool:
+        self._resubmit_abandoned()
+        if self._result.ready() or not self._evaluator.check_started():
+            return False
+
+        waiting_since = max(self._submitted, self._evaluator.last_progress)
+        return time.monotonic() - waiting_since > self.timeout
+
+    def found(self) -> bool:
+        """Return True if the pattern was found, raising TimeoutError if the search is unresponsive, or
+        PatternUnavailableError if the worker is unavailable"""
+        if self.timed_out():
+            self._evaluator.restart_generation(self._generation)
+            raise TimeoutError
+
+        return self._result.get()
+
+    def settled(self) -> bool:
+        """Return True once a search whose result is no longer wanted has stopped occupying the worker.
+
+        The search has completed, was abandoned by a restart (and is not submitted again), or has timed out, in which
+        case the worker is restarted.
+        """
+        if self._result.ready() or self._generation != self._evaluator.generation:
+            return True
+
+        if self.timed_out():
+            self._evaluator.restart_generation(self._generation)
+            return True
+
+        return False
+
+
+_pattern_evaluator = None
+
+
+def get_pattern_evaluator() -> PatternEvaluator:
+    """Return the PatternEvaluator shared by the process"""
+    global _pattern_evaluator
+
+    if _pattern_evaluator is None:
+        _pattern_evaluator = PatternEvaluator()
+        atexit.register(_pattern_evaluator.restart)
+
+    return _pattern_evaluator
+
+
 class RegexValidator:
-    def __init__(self, pattern):
-        self._matcher = re.compile(pattern)
+    """Validate that text contains a match of a pattern (with ECMA 262 semantics, the pattern is not anchored).
+
+    Called directly, the pattern is evaluated synchronously. Widgets instead `submit` the text, to be evaluated by the
+    shared PatternEvaluator within a bounded time.
+    """
+
+    def __init__(self, pattern, evaluator: PatternEvaluator = None):
+        self.pattern = pattern
+        self._matcher = compile_pattern(pattern)
+        self._evaluator = evaluator
 
     def __call__(self, text):
-        if self._matcher.match(text) is not None:
-            raise ValidationError("Value {!r} does not conform to regex {!r}".format(text, self._matcher))
+        if self._matcher.search(text) is None:
+            raise self._create_error(text)
+
+    def submit(self, text) -> 'PendingValidation':
+        """Begin validating text in the pattern evaluator, and return the pending validation"""
+        evaluator = self._evaluator or get_pattern_evaluator()
+        return PendingValidation(self, text, evaluator.submit(self.pattern, text))
+
+    def _create_error(self, text):
+        return ValidationError("Value {!r} does not conform to regex {!r}".format(text, self.pattern))
+
+
+class PendingValidation:
+    """Validation of text by a RegexValidator, evaluated in a PatternEvaluator"""
+
+    def __init__(self, validator: RegexValidator, text: str, search: PendingSearch):
+        self._validator = validator
+        self._text = text
+        self._search = search
+
+    def ready(self) -> bool:
+        return self._search.ready()
+
+    def settled(self) -> bool:
+        return self._search.settled()
+
+    def validate(self):
+        """Raise ValidationError if the text is invalid, or if the pattern is unresponsive or cannot be evaluated"""
+        try:
+            found = self._search.found()
+        except TimeoutError:
+            raise ValidationError("Pattern {!r} did not complete within {}s".format(self._validator.pattern,
+                                                                                     self._search.timeout))
+        except PatternUnavailableError:
+            raise ValidationError("Pattern {!r} could not be evaluated".format(self._validator.pattern))
+
+        if not found:
+            raise self._validator._create_error(self._text)
 
 
 class LengthValidator:
@@ -44,16 +274,26 @@ class LengthValidator:
 
 
 class ValidationFormatter:
-    """Format widget according to validator state"""
-    VALID_COLOUR = '#c4df9b'
-    INVALID_COLOUR = '#f6989d'
+    """Format widget according to validator state
 
+    Validators with a `submit` method are evaluated asynchronously; the widget is formatted once they have completed.
+    Searches for a previous value are left to finish (or time out) before those of the latest value are submitted, so
+    that typing queues no more than one search per validator in the shared worker.
+    """
     def __init__(self, widget, require_validator=True):
         self._validators = []
         self._widget = widget
         self._default_tooltip = widget.toolTip()
         self._require_validator = require_validator
 
+        self._pending = []
+        # Searches for previous values which still occupy the worker, and the value whose searches await them
+        self._superseded = []
+        self._queued_value = None
+        self._poll_timer = QtCore.QTimer(widget)
+        self._poll_timer.setInterval(PATTERN_POLL_INTERVAL)
+        self._poll_timer.timeout.connect(self._poll_pending)
+
     def add_validator(self, validator):
         self._validators.append(validator)
 
@@ -62,21 +302,59 @@ class ValidationFormatter:
         if not self._validators and self._require_validator:
             return
 
-        color_string = self.VALID_COLOUR
-        tooltip = self._default_tooltip
+        # Results for previous values are no longer wanted
+        self._supersede()
 
         for validator in self._validators:
+            if hasattr(validator, 'submit'):
+                continue
+
             try:
                 validator(value)
             except ValidationError as err:
-                tooltip = err.message
-                color_string = self.INVALID_COLOUR
+                self._format(err.message, 'invalid')
+                break
+        else:
+            if any(hasattr(v, 'submit') for v in self._validators):
+                self._queued_value = value
+            else:
+                self._format(self._default_tooltip, 'valid')
+
+        self._poll_pending()
+        if self._is_waiting() and not self._poll_timer.isActive():
+            self._poll_timer.start()
+
+    def _supersede(self):
+        self._superseded.extend(p for p in self._pending if not p.settled())
+        self._pending = []
+        self._queued_value = None
+
+    def _is_waiting(self) -> bool:
+        return bool(self._pending or self._superseded or self._queued_value is not None)
+
+    def _poll_pending(self):
+        self._superseded = [p for p in self._superseded if not p.settled()]
+
+        if not self._superseded and self._queued_value is not None:
+            self._pending = [v.submit(self._queued_value) for v in self._validators if hasattr(v, 'submit')]
+            self._queued_value = None
+
+        while self._pending and self._pending[0].ready():
+            pending = self._pending.pop(0)
+            try:
+                pending.validate()
+            except ValidationError as err:
+                self._supersede()
+                self._format(err.message, 'invalid')
                 break
 
-        palette = self._widget.palette()
-        colour = QtGui.QColor()
-        colour.setNamedColor(color_string)
-        palette.setColor(self._widget.backgroundRole(), colour)
+            if not self._pending:
+                self._format(self._default_tooltip, 'valid')
+
+        # Polling continues while superseded searches remain, so that they are timed out
+        if not self._is_waiting():
+            self._poll_timer.stop()
 
-        self._widget.setPalette(palette)
+    def _format(self, tooltip, state):
+        set_state(self._widget, state)
         self._widget.setToolTip(tooltip)
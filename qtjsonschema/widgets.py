@@ -2,10 +2,22 @@
 Widget definitions for JSON schema elements.
 """
 
+import weakref
+from types import MappingProxyType
+
 from PyQt5 import QtCore, QtWidgets, QtGui
 
+from .combinators import DiscriminatorIndex
+from .defaults import NO_DEFAULT, generate_default, get_default
+from .dependencies import get_dependency_graph
+from .enums import get_enum_index
 from .errors import UnsupportedSchemaError
-from .tools import FileResourceLoader, HTTPResourceLoader, Context, DocumentLoader, create_cached_uri_loader_registry
+from .hashing import hash_array, hash_json_value, hash_object
+from .maps import JSONMapModel, PropertyRouter, get_property_router
+from .offsets import LazyJSONArray, materialise
+from .style import INVALID_COLOUR, install_stylesheet, set_heading, set_required, set_state
+from .tools import Context, URILoaderRegistry, create_default_uri_loader_registry
+from .unique import UniqueItemIndex
 from .validators import ValidationFormatter, FormatValidator, LengthValidator, RegexValidator
 
 
@@ -14,6 +26,16 @@ from .validators import ValidationFormatter, FormatValidator, LengthValidator, R
 # oneOf, type, extends, properties, patternProperties,
 # additionalProperties
 
+# Keywords of a oneOf/anyOf schema which are inherited by each of its branches
+COMBINATOR_INHERITED_KEYWORDS = ("type", "properties", "required")
+
+# Keywords which a widget adopts in place when its schema is reloaded. Definitions are only used through `$ref`, which
+# each child resolves (and compares) for itself, and annotations are shown again by `update_annotations`.
+RELOAD_IGNORED_KEYWORDS = ("definitions", "title", "description", "default", "$schema")
+
+# Value of a new dynamic property, until the initial value of its editor is committed
+_NEW_ENTRY = object()
+
 
 def iter_layout_widgets(layout):
     for i in range(layout.count()):
@@ -56,10 +78,13 @@ class QColorButton(QtWidgets.QPushButton):
             self._color = color
             self.colorChanged.emit()
 
+        # A swatch icon avoids restyling the button
         if self._color:
-            self.setStyleSheet("background-color: %s;" % self._color)
+            pixmap = QtGui.QPixmap(16, 16)
+            pixmap.fill(QtGui.QColor(self._color))
+            self.setIcon(QtGui.QIcon(pixmap))
         else:
-            self.setStyleSheet("")
+            self.setIcon(QtGui.QIcon())
 
     def onColorPicker(self):
         dlg = QtWidgets.QColorDialog(self)
@@ -76,16 +101,79 @@ class QColorButton(QtWidgets.QPushButton):
         return super(QColorButton, self).mousePressEvent(event)
 
 
+class SchemaNode:
+    """Resolved schema and its context, with the metadata derived from them, shared by the widgets of the schema.
+
+    Widgets hold their node in place of the schema and context, so that (for instance) the items of a large array
+    share a single node.
+    """
+
+    __slots__ = ('schema', 'ctx', '_widget_class', '__weakref__')
+
+    def __init__(self, schema: dict, ctx: Context):
+        self.schema = schema
+        self.ctx = ctx
+        self._widget_class = None
+
+    @property
+    def widget_class(self) -> type:
+        """Widget class of the (resolved) schema"""
+        if self._widget_class is None:
+            self._widget_class = _get_widget_class(self.schema)
+        return self._widget_class
+
+
+# Live nodes by schema (which each node keeps alive, so that its id is not reused) and context
+_schema_nodes = weakref.WeakValueDictionary()
+
+
+def get_schema_node(schema: dict, ctx: Context) -> SchemaNode:
+    """Return the SchemaNode of a schema in a context, shared with the other widgets of the schema
+
+    :param schema: dict-like JSON object
+    :param ctx: Context of given schema
+    """
+    key = id(schema), ctx
+
+    node = _schema_nodes.get(key)
+    if node is None:
+        node = _schema_nodes[key] = SchemaNode(schema, ctx)
+    return node
+
+
 class JSONBaseWidget:
     """Base class for JSON handling widgets"""
 
-    def __init__(self, name: str, schema: dict, ctx: Context, parent: 'JSONBaseWidget'):
+    #: JSON type of container widgets ('object' or 'array'), whose children are given by `iter_json_children`
+    json_type = None
+
+    _json_hash = None
+    _builder = None
+
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: 'JSONBaseWidget', builder=None):
         super().__init__()
 
         self.name = name
-        self.schema = schema
+        self.node = get_schema_node(schema, ctx)
         self.parent = parent
-        self.ctx = ctx
+
+        # Only the root holds the builder of the tree, given to its constructor
+        if builder is not None:
+            assert parent is None, "Only the root of a tree is given its builder"
+            self._builder = builder
+
+    @property
+    def builder(self):
+        """ProgressiveBuilder (if any) to which the construction of nested widgets is deferred, shared by the tree"""
+        return self.parent.builder if self.parent is not None else self._builder
+
+    @property
+    def schema(self) -> dict:
+        return self.node.schema
+
+    @property
+    def ctx(self) -> Context:
+        return self.node.ctx
 
     @classmethod
     def supports_schema(cls, schema: dict) -> bool:
@@ -94,9 +182,73 @@ class JSONBaseWidget:
     def dump_json_object(self):
         raise NotImplementedError
 
+    def iter_json_children(self):
+        """Iterate over child widgets of a container widget.
+
+        Object widgets yield (name, widget) pairs, array widgets yield widgets.
+        """
+        raise NotImplementedError
+
+    def json_hash(self) -> bytes:
+        """Return structural hash of the JSON value of this widget.
+
+        The hash is cached until the value of the widget, or of any of its children, changes.
+        """
+        if self._json_hash is None:
+            if self.json_type is None:
+                self._json_hash = hash_json_value(self.dump_json_object())
+            elif self.json_type == 'object':
+                self._json_hash = hash_object((k, _get_node_hash(c)) for k, c in self.iter_json_children())
+            else:
+                self._json_hash = hash_array(_get_node_hash(c) for c in self.iter_json_children())
+
+        return self._json_hash
+
+    def mark_changed(self):
+        """Record that the JSON value of this widget has changed"""
+        # Widgets whose hash has not been computed hold no attribute for it
+        if self._json_hash is not None:
+            del self._json_hash
+        if self.parent is not None:
+            self.parent.child_changed(self)
+
+    def child_changed(self, child: 'JSONBaseWidget'):
+        """Record that the JSON value of a child widget has changed"""
+        self.mark_changed()
+
+    def replace_child(self, child: 'JSONBaseWidget', widget: 'JSONBaseWidget'):
+        """Replace a child widget (such as a placeholder) with another widget"""
+        raise NotImplementedError
+
+    def reload_schema(self, schema: dict, ctx: Context) -> bool:
+        """Adopt a changed (resolved) schema in place, returning False if the widget must be rebuilt instead.
+
+        Container widgets reload their children, rebuilding only those whose schema has changed.
+
+        :param schema: dict-like JSON object
+        :param ctx: Context of given schema
+        """
+        if (_get_widget_class(schema) is not type(self)
+                or _without(schema, *RELOAD_IGNORED_KEYWORDS) != _without(self.schema, *RELOAD_IGNORED_KEYWORDS)):
+            return False
+
+        self.node = get_schema_node(schema, ctx)
+        self.update_annotations()
+        return True
+
+    def update_annotations(self):
+        """Show the title and description of the schema, after it has been reloaded"""
+        pass
+
+    def materialise(self) -> 'JSONBaseWidget':
+        """Return the built widget, building it first if this is a placeholder"""
+        return self
+
     def initialise(self):
-        if 'default' in self.schema:
-            self.load_json_object(self.schema['default'])
+        """Load the default document of the schema, which includes the defaults of nested schemas"""
+        default = get_default(self.schema, self.ctx)
+        if default is not NO_DEFAULT:
+            self.load_json_object(default)
 
     def load_json_object(self, data):
         raise NotImplementedError
@@ -109,12 +261,11 @@ class UnsupportedSchemaWidget(JSONBaseWidget, QtWidgets.QLabel):
     If the element is a reference, the reference name is listed instead of a type.
     """
 
-    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget):
-        super().__init__(name, schema, ctx, parent)
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget, builder=None):
+        super().__init__(name, schema, ctx, parent, builder)
 
-        QtWidgets.QLabel.__init__(self, "(Unsupported schema entry: {}, {})"
-                                  .format(name, schema.get("type", "(?)")), parent)
-        self.setStyleSheet("QLabel { font-style: italic; }")
+        self.setText("(Unsupported schema entry: {}, {})".format(name, schema.get("type", "(?)")))
+        set_state(self, "unsupported")
 
     @classmethod
     def supports_schema(cls, schema: dict) -> bool:
@@ -132,10 +283,24 @@ class JSONObjectWidget(JSONBaseWidget, QtWidgets.QGroupBox):
 
     Objects have properties, each of which is a widget of its own.
     We display these in a group-box, which on most platforms will include a border.
+
+    Optional properties on which others depend (by `dependencies`) are excluded from the object, unless they have a
+    default or are loaded or included by the user. When one is included or excluded, only the properties depending on
+    it are re-evaluated: those it requires are marked as required, and the subform of its schema dependency is shown
+    (being built when first needed) or hidden.
     """
 
-    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget):
-        super().__init__(name, schema, ctx, parent)
+    json_type = 'object'
+
+    map_widget = None
+
+    # Presence controls of optional triggers, subforms of schema dependencies, and presence of dynamic triggers, which
+    # are held by the instance only for objects with dependencies
+    dependency_graph = None
+    _presence = _subforms = _dynamic_presence = MappingProxyType({})
+
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget, builder=None):
+        super().__init__(name, schema, ctx, parent, builder)
 
         self.setTitle(self.name)
         self.layout = QtWidgets.QVBoxLayout()
@@ -148,43 +313,462 @@ class JSONObjectWidget(JSONBaseWidget, QtWidgets.QGroupBox):
 
         self.properties = {}
 
-        if "properties" not in schema:
+        optional_triggers = set()
+        if "dependencies" in schema:
+            self.dependency_graph = get_dependency_graph(schema, ctx)
+            optional_triggers = self.dependency_graph.triggers - set(schema.get("required", ()))
+            self._presence = {}
+            self._subforms = {}
+
+        router = get_property_router(schema, ctx)
+
+        if "properties" not in schema and not router.is_open:
             label = QtWidgets.QLabel("Invalid object description (missing properties)", self)
-            label.setStyleSheet("QLabel { color: red; }")
+            set_state(label, "invalid")
             self.layout.addWidget(label)
 
         else:
-            for k, v in schema['properties'].items():
-                widget = _create_widget(k, v, ctx, self)
+            for k, v in schema.get('properties', {}).items():
+                if k in optional_triggers:
+                    self._add_presence_checkbox(k, v)
+
+                widget = _create_child_widget(k, v, ctx, self)
                 self.layout.addWidget(widget)
                 self.properties[k] = widget
 
-                # TODO pattern properties control widget
+                # Hidden only once parented by the layout, as showing an unparented widget opens a window
+                if not self._is_present(k):
+                    widget.hide()
+
+        if router.is_open:
+            self.map_widget = JSONMapWidget(name, schema, ctx, self, router)
+            self.layout.addWidget(self.map_widget)
+
+        if self.dependency_graph is not None:
+            self._dynamic_presence = {t: False for t in self.dependency_graph.triggers if t not in self.properties}
+            for trigger in self.dependency_graph.triggers:
+                self._update_dependents(trigger)
 
     @classmethod
     def supports_schema(cls, schema: dict) -> bool:
         return schema.get("type") == "object"
 
+    def reload_schema(self, schema: dict, ctx: Context) -> bool:
+        # Keywords other than `properties` (including `dependencies`) must be unchanged
+        ignored = ("properties",) + RELOAD_IGNORED_KEYWORDS
+        if (_get_widget_class(schema) is not type(self) or ("properties" in schema) != ("properties" in self.schema)
+                or _without(schema, *ignored) != _without(self.schema, *ignored)):
+            return False
+
+        # Presence controls and subforms are laid out between the properties, and depend on which are declared
+        if self.dependency_graph is not None and list(schema.get('properties', {})) != list(self.properties):
+            return False
+
+        # Placeholders replace themselves in the layout when built, so are built before it is cleared
+        for widget in list(self.properties.values()):
+            widget.materialise()
+
+        if self.dependency_graph is not None:
+            self._reload_properties_in_place(schema, ctx)
+        else:
+            self._reload_properties(schema, ctx)
+
+        self.node = get_schema_node(schema, ctx)
+        self.update_annotations()
+
+        if self.map_widget is not None:
+            self.map_widget.reload_schema(schema, ctx)
+
+        self.mark_changed()
+        return True
+
+    def update_annotations(self):
+        self.setTitle(self.name)
+        self.setToolTip(self.schema.get('description', ""))
+
+    def _reload_properties_in_place(self, schema: dict, ctx: Context):
+        # The dependency graph is unchanged, so presence controls and subforms are kept
+        self.dependency_graph = get_dependency_graph(schema, ctx)
+
+        for k, v in schema.get('properties', {}).items():
+            previous_widget = self.properties[k]
+            widget = _reload_widget(previous_widget, k, v, ctx, self)
+            if widget is previous_widget:
+                continue
+
+            self.layout.replaceWidget(previous_widget, widget)
+            self.properties[k] = widget
+            widget.setVisible(self._is_present(k))
+            self._update_required(k)
+            previous_widget.deleteLater()
+
+    def _reload_properties(self, schema: dict, ctx: Context):
+        previous_properties = self.properties
+        self.properties = {}
+
+        for widget in previous_properties.values():
+            self.layout.removeWidget(widget)
+
+        for i, (k, v) in enumerate(schema.get('properties', {}).items()):
+            previous_widget = previous_properties.pop(k, None)
+            if previous_widget is None:
+                widget = _create_widget(k, v, ctx, self)
+            else:
+                widget = _reload_widget(previous_widget, k, v, ctx, self)
+                if widget is not previous_widget:
+                    previous_widget.deleteLater()
+
+            self.layout.insertWidget(i, widget)
+            self.properties[k] = widget
+
+        # Properties which have been removed from the schema
+        for widget in previous_properties.values():
+            widget.deleteLater()
+
+    def replace_child(self, child: JSONBaseWidget, widget: JSONBaseWidget):
+        self.layout.replaceWidget(child, widget)
+        self.properties[child.name] = widget
+        widget.setVisible(self._is_present(child.name))
+        self._update_required(child.name)
+        child.deleteLater()
+
+    def child_changed(self, child: JSONBaseWidget):
+        # Dynamic properties may be triggers of dependencies
+        if child is self.map_widget:
+            for trigger, was_present in self._dynamic_presence.items():
+                present = self._is_present(trigger)
+                if present != was_present:
+                    self._dynamic_presence[trigger] = present
+                    self._update_dependents(trigger)
+
+        self.mark_changed()
+
     def dump_json_object(self) -> dict:
-        return {k: v.dump_json_object() for k, v in self.properties.items()}
+        data = {k: v.dump_json_object() for k, v in self.properties.items() if self._is_present(k)}
+        for subform in self._iter_present_subforms():
+            data.update(subform.dump_json_object())
+        if self.map_widget is not None:
+            data.update(self.map_widget.dump_json_object())
+        return data
+
+    def iter_json_children(self):
+        yield from ((k, v) for k, v in self.properties.items() if self._is_present(k))
+        for subform in self._iter_present_subforms():
+            yield from subform.iter_json_children()
+        if self.map_widget is not None:
+            yield from self.map_widget.iter_json_children()
 
     def load_json_object(self, data: dict):
+        if self.dependency_graph is not None:
+            self._load_presence(data)
+
+        subforms = list(self._iter_present_subforms())
+        subform_properties = [{} for _ in subforms]
+        dynamic_properties = {}
+
         for k, v in data.items():
             try:
                 widget = self.properties[k]
             except KeyError:
-                continue  # Probably a patternProperty
+                pass
+            else:
+                widget.load_json_object(v)
+                continue
+
+            for subform, properties in zip(subforms, subform_properties):
+                if k in subform.properties:
+                    properties[k] = v
+                    break
+            else:
+                dynamic_properties[k] = materialise(v)
+
+        for subform, properties in zip(subforms, subform_properties):
+            subform.load_json_object(properties)
+
+        if self.map_widget is not None:
+            self.map_widget.load_json_object(dynamic_properties)
+
+    def _add_presence_checkbox(self, name: str, schema: dict):
+        checkbox = QtWidgets.QCheckBox("Include {}".format(schema.get('title', name)), self)
+        checkbox.toggled.connect(lambda checked: self._presence_changed(name))
+
+        self.layout.addWidget(checkbox)
+        self._presence[name] = checkbox
+
+    def _is_present(self, name: str) -> bool:
+        checkbox = self._presence.get(name)
+        if checkbox is not None:
+            return checkbox.isChecked()
+
+        if name in self.properties:
+            return True
+
+        return self.map_widget is not None and self.map_widget.model.contains(name)
+
+    def _presence_changed(self, name: str):
+        self.properties[name].setVisible(self._is_present(name))
+        self._update_dependents(name)
+        self.mark_changed()
+
+    def _load_presence(self, data: dict):
+        for name, checkbox in self._presence.items():
+            checkbox.setChecked(name in data)
+
+        # Properties required by a trigger are present whether or not in the data
+        for trigger in self.dependency_graph.triggers:
+            self._update_dependents(trigger)
+
+    def _update_dependents(self, trigger: str):
+        """Re-evaluate the properties depending on a trigger, after a change in its presence"""
+        graph = self.dependency_graph
+
+        for name in graph.get_dependents(trigger):
+            required = graph.is_required(name, self._is_present)
+
+            widget = self.properties.get(name)
+            if widget is not None:
+                set_required(widget, required)
+
+            checkbox = self._presence.get(name)
+            if checkbox is not None:
+                set_required(checkbox, required)
+                checkbox.setEnabled(not required)
+                if required:
+                    checkbox.setChecked(True)
+
+        if trigger in graph.schema_dependencies:
+            self._update_subform(trigger)
+
+    def _update_required(self, name: str):
+        """Style a property which has replaced another widget as required, if required by a present trigger"""
+        if self.dependency_graph is not None and name in self.dependency_graph.required_by:
+            set_required(self.properties[name], self.dependency_graph.is_required(name, self._is_present))
+
+    def _update_subform(self, trigger: str):
+        present = self._is_present(trigger)
+
+        subform = self._subforms.get(trigger)
+        if subform is None:
+            if not present:
+                return
+            subform = self._subforms[trigger] = self._create_subform(trigger)
+
+        subform.setVisible(present)
+
+    def _create_subform(self, trigger: str) -> JSONBaseWidget:
+        schema, ctx = _resolve_schema(self.dependency_graph.schema_dependencies[trigger], self.ctx)
+
+        # Properties of the object itself keep their own widgets, and are otherwise only constrained by validation
+        properties = {k: v for k, v in schema.get("properties", {}).items() if k not in self.properties}
+        subform_schema = {"type": "object", "properties": properties}
 
-            widget.load_json_object(v)
+        subform = JSONObjectWidget(trigger, subform_schema, ctx, self)
+        subform.setTitle("With {}".format(trigger))
+
+        default = generate_default(subform_schema, ctx)
+        if default is not NO_DEFAULT:
+            subform.load_json_object(default)
+
+        self.layout.addWidget(subform)
+        return subform
+
+    def _iter_present_subforms(self):
+        for trigger, subform in self._subforms.items():
+            if self._is_present(trigger):
+                yield subform
+
+
+class JSONMapWidget(JSONBaseWidget, QtWidgets.QWidget):
+    """Widget representation of the dynamic properties of an object.
+
+    Properties matching `patternProperties`, or permitted by `additionalProperties`, are listed in a table of which
+    only the visible rows are rendered. The value of the selected row is edited by a widget for its subschema.
+    """
+
+    json_type = 'object'
+
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget, router: PropertyRouter):
+        super().__init__(name, schema, ctx, parent)
+
+        self.router = router
+        self.model = JSONMapModel(router, self)
+
+        layout = QtWidgets.QVBoxLayout()
+        controls_layout = QtWidgets.QHBoxLayout()
+
+        label = QtWidgets.QLabel("Additional properties", self)
+
+        append_button = QtWidgets.QPushButton("", self)
+        icon = append_button.style().standardIcon(QtWidgets.QStyle.SP_FileIcon)
+        append_button.setIcon(icon)
+        append_button.clicked.connect(self.click_add)
+        size_policy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Maximum,
+                                            QtWidgets.QSizePolicy.Maximum)
+        append_button.setSizePolicy(size_policy)
+
+        remove_button = QtWidgets.QPushButton("", self)
+        icon = remove_button.style().standardIcon(QtWidgets.QStyle.SP_TrashIcon)
+        remove_button.setIcon(icon)
+        remove_button.clicked.connect(self.click_remove)
+        remove_button.setSizePolicy(size_policy)
+
+        controls_layout.addWidget(label)
+        controls_layout.addWidget(append_button)
+        controls_layout.addWidget(remove_button)
+
+        self.table = QtWidgets.QTableView(self)
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.selectionModel().currentRowChanged.connect(self._current_row_changed)
+        self.model.dataChanged.connect(self._model_data_changed)
+
+        # Editor of the selected value, and the subschema to which its key was routed
+        self.detail_layout = QtWidgets.QVBoxLayout()
+        self.detail_widget = None
+        self._detail_row = None
+        self._detail_schema = None
+
+        layout.addLayout(controls_layout)
+        layout.addWidget(self.table)
+        layout.addLayout(self.detail_layout)
+        self.setLayout(layout)
+
+    def click_add(self):
+        key, accepted = QtWidgets.QInputDialog.getText(self, "Add property", "Property name:")
+        if not accepted:
+            return
+
+        if self.model.contains(key) or not self.router.accepts(key):
+            QtWidgets.QMessageBox.warning(self, "Add property", "Property {!r} cannot be added".format(key))
+            return
+
+        self.add_entry(key)
+
+    def click_remove(self):
+        row = self.table.currentIndex().row()
+        if row >= 0:
+            self.remove_entry(row)
+
+    def add_entry(self, key: str):
+        """Add property with the initial value of its subschema widget"""
+        row = self.model.add_entry(key, _NEW_ENTRY)
+        self.table.selectRow(row)
+
+        if isinstance(self.detail_widget, UnsupportedSchemaWidget):
+            self.model.set_value(row, None)
+        else:
+            self._commit_detail()
+        self.mark_changed()
+
+    def remove_entry(self, row: int):
+        self._commit_detail()
+        self._clear_detail()
+        self.model.remove_entry(row)
+        self.mark_changed()
+
+        # The current row may not have changed, in which case its editor is not rebuilt by _current_row_changed
+        current_row = self.table.currentIndex().row()
+        if current_row >= 0 and self.detail_widget is None:
+            self._show_detail(current_row)
+
+    def _model_data_changed(self, top_left, bottom_right):
+        # Values are committed from the detail widget, whose own changes have already been recorded
+        if top_left.column() != JSONMapModel.KEY_COLUMN:
+            return
+
+        # A renamed key may be routed to another subschema, whose editor replaces the current one
+        row = top_left.row()
+        if row == self._detail_row and self.router.route(self.model.key(row)) is not self._detail_schema:
+            self._commit_detail()
+            self._clear_detail()
+            self._show_detail(row)
+
+        self.mark_changed()
+
+    def _current_row_changed(self, current, previous):
+        self._commit_detail()
+        self._clear_detail()
+
+        if current.isValid():
+            self._show_detail(current.row())
+
+    def _show_detail(self, row: int):
+        key = self.model.key(row)
+        schema = self.router.route(key)
+
+        widget = _create_widget(key, schema or {}, self.ctx, self)
+
+        # New entries have no value until the editor's initial value is committed
+        value = self.model.value(row)
+        if value is not _NEW_ENTRY and not isinstance(widget, UnsupportedSchemaWidget):
+            try:
+                widget.load_json_object(value)
+            except (KeyError, IndexError, TypeError, ValueError, AttributeError, AssertionError):
+                pass  # Values which do not fit the subschema (as after renaming the key) are discarded
+
+        self.detail_layout.addWidget(widget)
+        self.detail_widget = widget
+        self._detail_row = row
+        self._detail_schema = schema
+
+    def _commit_detail(self):
+        # Values without a supported subschema are kept as they were loaded
+        if self._detail_row is None or isinstance(self.detail_widget, UnsupportedSchemaWidget):
+            return
+
+        self.model.set_value(self._detail_row, self.detail_widget.dump_json_object())
+
+    def _clear_detail(self):
+        if self.detail_widget is not None:
+            self.detail_layout.removeWidget(self.detail_widget)
+            self.detail_widget.deleteLater()
+
+        self.detail_widget = None
+        self._detail_row = None
+        self._detail_schema = None
+
+    def reload_schema(self, schema: dict, ctx: Context) -> bool:
+        current_row = self._detail_row
+        self._commit_detail()
+        self._clear_detail()
+
+        self.node = get_schema_node(schema, ctx)
+        self.router = self.model.router = get_property_router(schema, ctx)
+
+        if current_row is not None:
+            self._show_detail(current_row)
+        return True
+
+    def dump_json_object(self) -> dict:
+        return {k: v.dump_json_object() if isinstance(v, JSONBaseWidget) else v for k, v in self.iter_json_children()}
+
+    def iter_json_children(self):
+        # The value of the selected row is held by its editor until committed
+        detail_row = self._detail_row
+        if isinstance(self.detail_widget, UnsupportedSchemaWidget):
+            detail_row = None
+
+        for row, (k, v) in enumerate(self.model.iter_entries()):
+            yield k, self.detail_widget if row == detail_row else v
+
+    def load_json_object(self, data: dict):
+        self._clear_detail()
+        self.model.set_entries(data)
+        self.mark_changed()
 
 
 class JSONPrimitiveBaseWidget(JSONBaseWidget, QtWidgets.QWidget):
     """Base class for JSON serialising widgets which have a single input widget"""
 
     PRIMITIVE_CLASS = not_implemented_property()
+    #: Name of the signal of the primitive widget emitted when its value changes
+    CHANGED_SIGNAL = not_implemented_property()
 
-    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget):
-        super().__init__(name, schema, ctx, parent)
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget, builder=None):
+        super().__init__(name, schema, ctx, parent, builder)
         layout = QtWidgets.QHBoxLayout()
 
         self.label = QtWidgets.QLabel(schema.get('title', name))
@@ -198,19 +782,49 @@ class JSONPrimitiveBaseWidget(JSONBaseWidget, QtWidgets.QWidget):
 
         self.setLayout(layout)
 
+        getattr(self._primitive_widget, self.CHANGED_SIGNAL).connect(self._primitive_changed)
+
     def _create_primitive_widget(self):
         return self.PRIMITIVE_CLASS(self)
 
+    def update_annotations(self):
+        self.label.setText(self.schema.get('title', self.name))
+        self.label.setToolTip(self.schema.get('description', ""))
+
+    # As a slot of the widget, the connection is made by Qt without a Python proxy for each widget
+    @QtCore.pyqtSlot()
+    def _primitive_changed(self):
+        self.mark_changed()
+
 class JSONEnumWidget(JSONPrimitiveBaseWidget):
-    """Widget representation of an enumerated property."""
+    """Widget representation of an enumerated property.
+
+    The combo-box is editable, offering a filtering completer over the enumerated values.
+    Its model is shared between all widgets of the same enum schema.
+    """
 
     PRIMITIVE_CLASS = QtWidgets.QComboBox
+    CHANGED_SIGNAL = 'currentIndexChanged'
 
-    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget):
-        super().__init__(name, schema, ctx, parent)
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget, builder=None):
+        super().__init__(name, schema, ctx, parent, builder)
+
+        self._enum_index = get_enum_index(schema['enum'], ctx.registry.schema_cache)
 
-        self._enum_values = schema['enum']
-        self._primitive_widget.addItems([str(e) for e in schema['enum']])
+        combo_box = self._primitive_widget
+        combo_box.setModel(self._enum_index.model)
+        combo_box.setEditable(True)
+        combo_box.setInsertPolicy(QtWidgets.QComboBox.NoInsert)
+        combo_box.setMaxVisibleItems(20)
+        combo_box.view().setUniformItemSizes(True)
+
+        completer = QtWidgets.QCompleter(self._enum_index.model, combo_box)
+        completer.setFilterMode(QtCore.Qt.MatchContains)
+        completer.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        completer.setCompletionMode(QtWidgets.QCompleter.PopupCompletion)
+        combo_box.setCompleter(completer)
+
+        combo_box.lineEdit().editingFinished.connect(self._text_edited)
 
     @classmethod
     def supports_schema(cls, schema: dict) -> bool:
@@ -218,17 +832,33 @@ class JSONEnumWidget(JSONPrimitiveBaseWidget):
 
     def dump_json_object(self):
         index = self._primitive_widget.currentIndex()
-        return self._enum_values[index]
+        if index < 0:
+            return None
+        return self._enum_index.values[index]
 
     def load_json_object(self, obj):
-        index = self._enum_values.index(obj)
+        index = self._enum_index.index_of(obj)
+        if index < 0:
+            raise ValueError("{!r} is not an enumerated value".format(obj))
+
         self._primitive_widget.setCurrentIndex(index)
 
+    def _text_edited(self):
+        # Select the entered value, or restore the text of the current value
+        combo_box = self._primitive_widget
+        index = self._enum_index.index_of_label(combo_box.currentText())
+        if index < 0:
+            index = combo_box.currentIndex()
+
+        combo_box.setCurrentIndex(index)
+        combo_box.setEditText(combo_box.itemText(index))
+
 
 class JSONColorStringWidget(JSONPrimitiveBaseWidget):
     """Widget representation of a string with the 'color' format keyword."""
 
     PRIMITIVE_CLASS = QColorButton
+    CHANGED_SIGNAL = 'colorChanged'
 
     @classmethod
     def supports_schema(cls, schema: dict) -> bool:
@@ -244,6 +874,9 @@ class JSONColorStringWidget(JSONPrimitiveBaseWidget):
 
 class JSONDateTimeStringWidget(JSONPrimitiveBaseWidget):
     """Widget representation of a string with the 'date-time' format keyword."""
+
+    CHANGED_SIGNAL = 'dateTimeChanged'
+
     def _create_primitive_widget(self):
         widget = QtWidgets.QDateTimeEdit()
         widget.setCalendarPopup(True)
@@ -271,9 +904,10 @@ class JSONStringWidget(JSONPrimitiveBaseWidget):
     """
 
     PRIMITIVE_CLASS = QtWidgets.QLineEdit
+    CHANGED_SIGNAL = 'textChanged'
 
-    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget):
-        super().__init__(name, schema, ctx, parent)
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget, builder=None):
+        super().__init__(name, schema, ctx, parent, builder)
 
         self._validator = ValidationFormatter(self._primitive_widget)
 
@@ -327,10 +961,11 @@ class SpinBoxWidgetBase(JSONPrimitiveBaseWidget):
     """Base class for spinbox JSON serialising widgets."""
 
     PRIMITIVE_CLASS = not_implemented_property()
+    CHANGED_SIGNAL = 'valueChanged'
     step = not_implemented_property()
 
-    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget):
-        super().__init__(name, schema, ctx, parent)
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget, builder=None):
+        super().__init__(name, schema, ctx, parent, builder)
 
         self._set_limits(schema)
 
@@ -382,6 +1017,7 @@ class JSONBooleanWidget(JSONPrimitiveBaseWidget):
     """Widget representing a boolean (CheckBox)."""
 
     PRIMITIVE_CLASS = QtWidgets.QCheckBox
+    CHANGED_SIGNAL = 'toggled'
 
     @classmethod
     def supports_schema(cls, schema):
@@ -395,6 +1031,100 @@ class JSONBooleanWidget(JSONPrimitiveBaseWidget):
 
 
 class JSONArrayBaseWidget(JSONBaseWidget):
+    """Base class of array widgets.
+
+    The number of items is kept within `minItems` and `maxItems` by the add and remove controls. For `uniqueItems`,
+    items are indexed by the hashes of their values, which is updated as single items change, and duplicates flagged.
+    """
+
+    def _init_item_constraints(self, schema: dict):
+        self.min_items = schema.get("minItems", 0)
+        self.max_items = schema.get("maxItems")
+        self._unique_index = UniqueItemIndex() if schema.get("uniqueItems", False) else None
+
+        self.constraint_label = QtWidgets.QLabel(self)
+        self.constraint_label.hide()
+
+    def child_changed(self, child: JSONBaseWidget):
+        if self._unique_index is not None:
+            self._update_duplicates(self._unique_index.set(child, child.json_hash()))
+        self.mark_changed()
+
+    def _track_item(self, item, item_hash: bytes = None):
+        """Index an item (a widget, or a value yet to be loaded) for uniqueness"""
+        if self._unique_index is None:
+            return
+
+        if item_hash is None:
+            item_hash = item.json_hash()
+        self._update_duplicates([item, *self._unique_index.set(item, item_hash)])
+
+    def _untrack_item(self, item):
+        if self._unique_index is not None:
+            self._update_duplicates(self._unique_index.remove(item))
+
+    def _update_duplicates(self, items):
+        for item in items:
+            self._set_item_duplicate(item, self._unique_index.is_duplicate(item))
+        self._update_constraints()
+
+    def _update_constraints(self):
+        count = self._get_item_count()
+        messages = []
+
+        if self._unique_index is not None and self._unique_index.duplicate_count:
+            messages.append("{} duplicate {}".format(self._unique_index.duplicate_count,
+                                                     "item" if self._unique_index.duplicate_count == 1 else "items"))
+        if count < self.min_items:
+            messages.append("At least {} {} required".format(self.min_items,
+                                                             "item is" if self.min_items == 1 else "items are"))
+        if self.max_items is not None and count > self.max_items:
+            messages.append("At most {} {} allowed".format(self.max_items,
+                                                           "item is" if self.max_items == 1 else "items are"))
+
+        self.constraint_label.setText("\n".join(messages))
+        self.constraint_label.setVisible(bool(messages))
+        set_state(self.constraint_label, "invalid")
+
+        self._update_controls(count)
+
+    def _get_item_count(self) -> int:
+        raise NotImplementedError
+
+    def _set_item_duplicate(self, item, duplicate: bool):
+        raise NotImplementedError
+
+    def _update_controls(self, count: int):
+        raise NotImplementedError
+
+    def reload_schema(self, schema: dict, ctx: Context) -> bool:
+        ignored = ("items", "additionalItems") + RELOAD_IGNORED_KEYWORDS
+        if _get_widget_class(schema) is not type(self) or _without(schema, *ignored) != _without(self.schema, *ignored):
+            return False
+
+        self.node = get_schema_node(schema, ctx)
+        self.items_schema = schema['items']
+        self.additional_item_schema = schema.get("additionalItems")
+        self.update_annotations()
+
+        for index, widget in enumerate(list(self.iter_json_children())):
+            # Items not yet loaded are built with the new schema when needed
+            if not isinstance(widget, JSONBaseWidget):
+                continue
+
+            item_widget = _reload_widget(widget, widget.name, self._get_item_schema(index), ctx, self)
+            if item_widget is not widget:
+                self._replace_item(index, item_widget)
+
+        return True
+
+    def update_annotations(self):
+        self.label.setText(self.schema.get('title', self.name))
+        self.label.setToolTip(self.schema.get('description', ""))
+
+    def _replace_item(self, index: int, widget: JSONBaseWidget):
+        raise NotImplementedError
+
     def _get_item_schema(self, index):
         if isinstance(self.items_schema, list):
             try:
@@ -413,42 +1143,49 @@ class JSONArrayWidget(JSONArrayBaseWidget, QtWidgets.QWidget):
     """Widget representation of an array.
 
     Arrays can contain multiple objects of a type, or they can contain objects of specific types.
-    We include a label and button for adding types. """
+    We include a label and button for adding types.
 
-    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget):
-        super().__init__(name, schema, ctx, parent)
+    Items of lazy arrays (see `offsets`) are parsed, and their widgets built, when first selected. """
+
+    json_type = 'array'
+
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget, builder=None):
+        super().__init__(name, schema, ctx, parent, builder)
 
         self.layout = QtWidgets.QVBoxLayout()
         self.controls_layout = QtWidgets.QHBoxLayout()
         self.items_layout = QtWidgets.QVBoxLayout()
 
-        label = QtWidgets.QLabel(schema.get('title', name), self)
-        label.setStyleSheet("QLabel { font-weight: bold; }")
+        self.label = QtWidgets.QLabel(schema.get('title', name), self)
+        set_heading(self.label)
         if "description" in schema:
-            label.setToolTip(schema['description'])
+            self.label.setToolTip(schema['description'])
 
-        append_button = QtWidgets.QPushButton("", self)
-        icon = append_button.style().standardIcon(QtWidgets.QStyle.SP_FileIcon)
-        append_button.setIcon(icon)
-        append_button.clicked.connect(self.click_add)
+        self.append_button = QtWidgets.QPushButton("", self)
+        icon = self.append_button.style().standardIcon(QtWidgets.QStyle.SP_FileIcon)
+        self.append_button.setIcon(icon)
+        self.append_button.clicked.connect(self.click_add)
         size_policy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Maximum,
                                             QtWidgets.QSizePolicy.Maximum)
-        append_button.setSizePolicy(size_policy)
+        self.append_button.setSizePolicy(size_policy)
 
-        remove_button = QtWidgets.QPushButton("", self)
-        icon = remove_button.style().standardIcon(QtWidgets.QStyle.SP_TrashIcon)
-        remove_button.setIcon(icon)
-        remove_button.clicked.connect(self.click_remove)
+        self.remove_button = QtWidgets.QPushButton("", self)
+        icon = self.remove_button.style().standardIcon(QtWidgets.QStyle.SP_TrashIcon)
+        self.remove_button.setIcon(icon)
+        self.remove_button.clicked.connect(self.click_remove)
         size_policy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Maximum,
                                             QtWidgets.QSizePolicy.Maximum)
-        remove_button.setSizePolicy(size_policy)
+        self.remove_button.setSizePolicy(size_policy)
 
-        self.controls_layout.addWidget(label)
-        self.controls_layout.addWidget(append_button)
-        self.controls_layout.addWidget(remove_button)
+        self.controls_layout.addWidget(self.label)
+        self.controls_layout.addWidget(self.append_button)
+        self.controls_layout.addWidget(self.remove_button)
 
         self.layout.addLayout(self.controls_layout)
 
+        self._init_item_constraints(schema)
+        self.layout.addWidget(self.constraint_label)
+
         self.items_list = QtWidgets.QListWidget(self)
         self.widget_stack = QtWidgets.QStackedWidget(self)
 
@@ -466,81 +1203,199 @@ class JSONArrayWidget(JSONArrayBaseWidget, QtWidgets.QWidget):
 
         self.additional_item_schema = schema.get("additionalItems")
 
+        # Widget of each item, or None for items yet to be loaded from the lazy array
+        self._item_widgets = []
+        self._item_rows = {}
+        self._lazy_items = None
+
+        self._update_constraints()
+
     @classmethod
     def supports_schema(cls, schema):
         return schema.get('type') == 'array'
 
     def add_item(self, data=None):
-        index = self.items_list.count()
-        schema = self._get_item_schema(index)
-        obj = _create_widget("Item #{:d}".format(index), schema, self.ctx, self)
+        index = len(self._item_widgets)
+        obj = self._create_item_widget(index)
 
+        self._item_widgets.append(obj)
+        self._item_rows[obj] = index
         self.items_list.addItem("# {}".format(index))
-        self.widget_stack.addWidget(obj)
+        self._track_item(obj)
 
         if data is not None:
             obj.load_json_object(data)
 
+        self._update_constraints()
+        self.mark_changed()
+
+    def _create_item_widget(self, index: int) -> JSONBaseWidget:
+        obj = _create_widget("Item #{:d}".format(index), self._get_item_schema(index), self.ctx, self)
+        self.widget_stack.addWidget(obj)
+        return obj
+
+    def _get_item_widget(self, index: int) -> JSONBaseWidget:
+        widget = self._item_widgets[index]
+        if widget is None:
+            self._untrack_item(index)
+
+            widget = self._item_widgets[index] = self._create_item_widget(index)
+            self._item_rows[widget] = index
+            widget.load_json_object(self._lazy_items[index])
+            self._track_item(widget)
+
+        return widget
+
     def click_add(self):
-        self.add_item()
+        if self.max_items is None or len(self._item_widgets) < self.max_items:
+            self.add_item()
 
     def click_remove(self):
         self.remove_item()
 
     def dump_json_object(self):
-        return [w.dump_json_object() for w in iter_widgets(self.widget_stack)]
+        return [c.dump_json_object() if isinstance(c, JSONBaseWidget) else c for c in self.iter_json_children()]
+
+    def iter_json_children(self):
+        # Items not yet loaded are yielded as their (parsed) JSON values
+        for index, widget in enumerate(self._item_widgets):
+            yield self._lazy_items[index] if widget is None else widget
 
     def load_json_object(self, data):
+        if isinstance(data, LazyJSONArray):
+            self._load_lazy_items(data)
+            return
+
         for i, datum in enumerate(data):
-            if i < self.widget_stack.count():
-                self.widget_stack.widget(i).load_json_object(datum)
+            if i < len(self._item_widgets):
+                self._get_item_widget(i).load_json_object(datum)
             else:
                 self.add_item(datum)
 
+    def _load_lazy_items(self, data: LazyJSONArray):
+        count = len(self._item_widgets)
+
+        # Items beyond the new data keep their values, so must be loaded from the previous array before it is replaced
+        for i in range(len(data), count):
+            self._get_item_widget(i)
+
+        self._lazy_items = data
+
+        self._item_widgets.extend([None] * (len(data) - count))
+        self.items_list.addItems(["# {}".format(i) for i in range(count, len(data))])
+
+        # Uniqueness requires the values of all items, of which those not yet built are hashed from the new data
+        for i in range(len(data)):
+            if self._item_widgets[i] is None:
+                self._track_item(i, hash_json_value(data[i]))
+            else:
+                self._item_widgets[i].load_json_object(data[i])
+
+        self._update_constraints()
+        self.mark_changed()
+
     def remove_item(self):
-        last_item_index = self.items_list.count() - 1
-        if last_item_index < 0:
+        if len(self._item_widgets) <= self.min_items:
             return
 
-        self.items_list.takeItem(last_item_index)
+        index = len(self._item_widgets) - 1
+        widget = self._item_widgets[index]
+        self._untrack_item(index if widget is None else widget)
+
+        self.items_list.takeItem(index)
+        self._item_widgets.pop()
+
+        if widget is not None:
+            del self._item_rows[widget]
+            self.widget_stack.removeWidget(widget)
+
+        self._update_constraints()
+        self.mark_changed()
+
+    def _replace_item(self, index: int, widget: JSONBaseWidget):
+        previous_widget = self._item_widgets[index]
+        is_current = self.widget_stack.currentWidget() is previous_widget
+        self._untrack_item(previous_widget)
+
+        self.widget_stack.removeWidget(previous_widget)
+        self.widget_stack.addWidget(widget)
+        self._item_widgets[index] = widget
+        del self._item_rows[previous_widget]
+        self._item_rows[widget] = index
+        previous_widget.deleteLater()
 
-        widget = self.widget_stack.widget(last_item_index)
-        self.widget_stack.removeWidget(widget)
+        self._track_item(widget)
+
+        if is_current:
+            self.widget_stack.setCurrentWidget(widget)
+
+        self.mark_changed()
 
     def _current_item_changed(self, current, previous):
         index = self.items_list.indexFromItem(current).row()
-        self.widget_stack.setCurrentIndex(index)
+        if index < 0:
+            return
+
+        self.widget_stack.setCurrentWidget(self._get_item_widget(index))
+
+    def _get_item_count(self) -> int:
+        return len(self._item_widgets)
+
+    def _set_item_duplicate(self, item, duplicate: bool):
+        # Items yet to be loaded are indexed by row
+        row = item if isinstance(item, int) else self._item_rows.get(item)
+        list_item = self.items_list.item(row) if row is not None else None
+        if list_item is None:
+            return
+
+        list_item.setBackground(QtGui.QBrush(QtGui.QColor(INVALID_COLOUR)) if duplicate else QtGui.QBrush())
+        list_item.setToolTip("Duplicate item" if duplicate else "")
+
+    def _update_controls(self, count: int):
+        self.append_button.setEnabled(self.max_items is None or count < self.max_items)
+        self.remove_button.setEnabled(count > self.min_items)
 
 
 class JSONArrayTabWidget(JSONArrayBaseWidget, QtWidgets.QWidget):
-    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget):
-        super().__init__(name, schema, ctx, parent)
+    """Widget representation of an array of objects, with a tab for each item.
+
+    Items of lazy arrays (see `offsets`) are held by empty pages, and are parsed, and their widgets built, when their
+    tab is first selected. Only the current tab has a close button, as the tab bar is laid out again for each button
+    added.
+    """
+
+    json_type = 'array'
+
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget, builder=None):
+        super().__init__(name, schema, ctx, parent, builder)
         self.layout = QtWidgets.QVBoxLayout()
         self.controls_layout = QtWidgets.QHBoxLayout()
         self.items_layout = QtWidgets.QVBoxLayout()
 
-        label = QtWidgets.QLabel(schema.get('title', name), self)
-        label.setStyleSheet("QLabel { font-weight: bold; }")
+        self.label = QtWidgets.QLabel(schema.get('title', name), self)
+        set_heading(self.label)
         if "description" in schema:
-            label.setToolTip(schema['description'])
+            self.label.setToolTip(schema['description'])
 
-        append_button = QtWidgets.QPushButton("", self)
-        icon = append_button.style().standardIcon(QtWidgets.QStyle.SP_FileIcon)
-        append_button.setIcon(icon)
-        append_button.clicked.connect(self.click_add)
+        self.append_button = QtWidgets.QPushButton("", self)
+        icon = self.append_button.style().standardIcon(QtWidgets.QStyle.SP_FileIcon)
+        self.append_button.setIcon(icon)
+        self.append_button.clicked.connect(self.click_add)
         size_policy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Maximum,
                                             QtWidgets.QSizePolicy.Maximum)
-        append_button.setSizePolicy(size_policy)
+        self.append_button.setSizePolicy(size_policy)
 
-        self.controls_layout.addWidget(label)
-        self.controls_layout.addWidget(append_button)
+        self.controls_layout.addWidget(self.label)
+        self.controls_layout.addWidget(self.append_button)
 
         self.layout.addLayout(self.controls_layout)
 
+        self._init_item_constraints(schema)
+        self.layout.addWidget(self.constraint_label)
+
         self.tabs = QtWidgets.QTabWidget(self)
-        self.tabs.setTabsClosable(True)
         self.tabs.setMovable(True)
-        self.tabs.tabCloseRequested.connect(self.remove_item)
+        self.tabs.currentChanged.connect(self._current_item_changed)
         self.tabs.currentChanged.connect(self.rename_tab)
 
         self.tabs.tabBar().tabMoved.connect(self._item_moved)
@@ -556,12 +1411,119 @@ class JSONArrayTabWidget(JSONArrayBaseWidget, QtWidgets.QWidget):
 
         self.additional_item_schema = schema.get("additionalItems")
 
+        # Index in the lazy array of the item held by each page yet to be loaded
+        self._lazy_items = None
+        self._lazy_pages = {}
+
+        # Page of the tab with the close button
+        self._closable_page = None
+
+        self._update_constraints()
+
     def _item_moved(self, from_index, to_index):
-        pass
+        self.mark_changed()
+
+    def _replace_item(self, index: int, widget: JSONBaseWidget):
+        previous_widget = self.tabs.widget(index)
+        self._untrack_item(previous_widget)
+
+        self._set_tab_page(index, widget)
+        previous_widget.deleteLater()
+
+        self._track_item(widget)
+        self.mark_changed()
+
+    def _set_tab_page(self, index: int, page: QtWidgets.QWidget):
+        is_current = self.tabs.currentIndex() == index
+        text = self.tabs.tabText(index)
+
+        # The current tab changes only while the page is replaced
+        self.tabs.blockSignals(True)
+        try:
+            self.tabs.removeTab(index)
+            self.tabs.insertTab(index, page, text)
+            if is_current:
+                self.tabs.setCurrentIndex(index)
+        finally:
+            self.tabs.blockSignals(False)
+
+        self._update_close_button()
+
+    def _update_close_button(self):
+        """Move the close button to the current tab, if items may be removed"""
+        tab_bar = self.tabs.tabBar()
+        side = tab_bar.style().styleHint(QtWidgets.QStyle.SH_TabBar_CloseButtonPosition, None, tab_bar)
+        index = self.tabs.currentIndex()
+
+        # Buttons are deleted with their tabs, so are created for each tab
+        previous_index = self.tabs.indexOf(self._closable_page) if self._closable_page is not None else -1
+        if previous_index >= 0:
+            if self._closable_page is self.tabs.widget(index) and self.tabs.count() > self.min_items:
+                return
+            tab_bar.tabButton(previous_index, side).deleteLater()
+            tab_bar.setTabButton(previous_index, side, None)
+        self._closable_page = None
+
+        if index < 0 or self.tabs.count() <= self.min_items:
+            return
+
+        close_button = QtWidgets.QToolButton(tab_bar)
+        close_button.setIcon(close_button.style().standardIcon(QtWidgets.QStyle.SP_TitleBarCloseButton))
+        close_button.setAutoRaise(True)
+        close_button.setToolTip("Remove item")
+        close_button.clicked.connect(lambda: self.remove_item(self.tabs.indexOf(self._closable_page)))
+
+        tab_bar.setTabButton(index, side, close_button)
+        self._closable_page = self.tabs.widget(index)
+
+    def _get_item_widget(self, index: int) -> JSONBaseWidget:
+        page = self.tabs.widget(index)
+        if page not in self._lazy_pages:
+            return page
+
+        self._untrack_item(page)
+        data = self._lazy_items[self._lazy_pages.pop(page)]
+
+        widget = _create_widget("Item #{:d}".format(index), self._get_item_schema(index), self.ctx, self)
+        widget.load_json_object(data)
+        self._set_tab_page(index, widget)
+        page.deleteLater()
+
+        self._track_item(widget)
+        return widget
+
+    def _current_item_changed(self, index: int):
+        if index >= 0:
+            self._get_item_widget(index)
+        self._update_close_button()
 
     def remove_item(self, index):
+        if self.tabs.count() <= self.min_items:
+            return
+
+        page = self.tabs.widget(index)
+        self._lazy_pages.pop(page, None)
+        self._untrack_item(page)
         self.tabs.removeTab(index)
 
+        self._update_constraints()
+        self.mark_changed()
+
+    def _get_item_count(self) -> int:
+        return self.tabs.count()
+
+    def _set_item_duplicate(self, item, duplicate: bool):
+        index = self.tabs.indexOf(item)
+        if index < 0:
+            return
+
+        self.tabs.tabBar().setTabTextColor(index, QtGui.QColor(INVALID_COLOUR) if duplicate else QtGui.QColor())
+        self.tabs.setTabToolTip(index, "Duplicate item" if duplicate else "")
+
+    def _update_controls(self, count: int):
+        self.append_button.setEnabled(self.max_items is None or count < self.max_items)
+        self._update_close_button()
+
     @classmethod
     def supports_schema(cls, schema):
         return (
@@ -574,15 +1536,18 @@ class JSONArrayTabWidget(JSONArrayBaseWidget, QtWidgets.QWidget):
         obj = _create_widget("Item #{:d}".format(index), schema, self.ctx, self)
 
         self.tabs.addTab(obj, "# {}".format(index))
+        self._track_item(obj)
 
         if data is not None and data.keys():
             self.rename_tab(index)
             obj.load_json_object(data)
 
+        self._update_constraints()
+        self.mark_changed()
+
     def rename_tab(self, index):
         data = self.tabs.widget(index).dump_json_object()
-        title = self.items_schema.get('title', "Item")
-        self.tabs.setTabText(index, "{} #{}".format(title, index))
+        self.tabs.setTabText(index, self._get_tab_text(index))
         # first_property = list(self.items_schema['properties'].items())[0][0]
         # self.tabs.setTabText(
         #     index,
@@ -593,21 +1558,223 @@ class JSONArrayTabWidget(JSONArrayBaseWidget, QtWidgets.QWidget):
         #     )
         # )
 
+    def _get_tab_text(self, index: int) -> str:
+        title = self.items_schema.get('title', "Item")
+        return "{} #{}".format(title, index)
+
+    def update_annotations(self):
+        super().update_annotations()
+
+        # Tabs are titled by the items schema
+        for index in range(self.tabs.count()):
+            self.tabs.setTabText(index, self._get_tab_text(index))
+
     def click_add(self):
-        self.add_item()
+        if self.max_items is None or self.tabs.count() < self.max_items:
+            self.add_item()
 
     def dump_json_object(self):
-        return [w.dump_json_object() for w in iter_widgets(self.tabs)]
+        return [c.dump_json_object() if isinstance(c, JSONBaseWidget) else c for c in self.iter_json_children()]
+
+    def iter_json_children(self):
+        # Items not yet loaded are yielded as their (parsed) JSON values
+        for page in iter_widgets(self.tabs):
+            yield self._lazy_items[self._lazy_pages[page]] if page in self._lazy_pages else page
 
     def load_json_object(self, data):
+        if isinstance(data, LazyJSONArray):
+            self._load_lazy_items(data)
+            return
+
         for i, datum in enumerate(data):
             if i < self.tabs.count():
-                self.tabs.widget(i).load_json_object(datum)
+                self._get_item_widget(i).load_json_object(datum)
             else:
                 self.add_item(datum)
 
+    def _load_lazy_items(self, data: LazyJSONArray):
+        count = self.tabs.count()
+
+        # Items beyond the new data keep their values, so must be loaded from the previous array before it is replaced
+        for i in range(len(data), count):
+            self._get_item_widget(i)
+
+        self._lazy_items = data
+
+        for i in range(min(count, len(data))):
+            page = self.tabs.widget(i)
+            if page in self._lazy_pages:
+                self._lazy_pages[page] = i
+                self._track_item(page, hash_json_value(data[i]))
+            else:
+                page.load_json_object(data[i])
+
+        # Pages are added without selecting them, and the current item built once all are added
+        self.tabs.blockSignals(True)
+        try:
+            for i in range(count, len(data)):
+                page = QtWidgets.QWidget()
+                self._lazy_pages[page] = i
+                self.tabs.addTab(page, self._get_tab_text(i))
+
+                # Uniqueness requires the values of all items
+                self._track_item(page, hash_json_value(data[i]))
+        finally:
+            self.tabs.blockSignals(False)
+
+        self._current_item_changed(self.tabs.currentIndex())
+
+        self._update_constraints()
+        self.mark_changed()
+
+
+class JSONCombinatorWidget(JSONBaseWidget, QtWidgets.QWidget):
+    """Widget representation of a oneOf or anyOf schema.
+
+    A combo-box chooses between the branches, of which only the active branch is displayed.
+    Branch widgets are built when first chosen, and are kept when switching to another branch.
+    """
+
+    def __init__(self, name: str, schema: dict, ctx: Context, parent: JSONBaseWidget, builder=None):
+        super().__init__(name, schema, ctx, parent, builder)
+
+        keyword = "oneOf" if "oneOf" in schema else "anyOf"
+        if not schema[keyword]:
+            raise UnsupportedSchemaError("{} requires at least one schema".format(keyword))
+
+        self._branches, self._index = _get_branches(schema, ctx)
+        self._branch_widgets = {}
+
+        layout = QtWidgets.QVBoxLayout()
+        controls_layout = QtWidgets.QHBoxLayout()
+
+        self.label = QtWidgets.QLabel(schema.get('title', name), self)
+        if "description" in schema:
+            self.label.setToolTip(schema['description'])
+
+        self.branch_selector = QtWidgets.QComboBox(self)
+        self.branch_selector.addItems([self._get_branch_title(i, b) for i, (b, _) in enumerate(self._branches)])
+
+        controls_layout.addWidget(self.label)
+        controls_layout.addWidget(self.branch_selector)
+
+        self.widget_stack = QtWidgets.QStackedWidget(self)
+
+        layout.addLayout(controls_layout)
+        layout.addWidget(self.widget_stack)
+        self.setLayout(layout)
+
+        self.select_branch(0)
+        self.branch_selector.currentIndexChanged.connect(self.select_branch)
+
+    @property
+    def json_type(self):
+        return self.current_widget.json_type
+
+    @property
+    def current_widget(self) -> JSONBaseWidget:
+        return self.widget_stack.currentWidget()
+
+    @classmethod
+    def supports_schema(cls, schema: dict) -> bool:
+        return "oneOf" in schema or "anyOf" in schema
+
+    @staticmethod
+    def _get_branch_title(index: int, branch: dict) -> str:
+        try:
+            return branch['title']
+        except KeyError:
+            pass
+
+        if "type" in branch:
+            return "Option {} ({})".format(index + 1, branch["type"])
+
+        return "Option {}".format(index + 1)
+
+    def select_branch(self, index: int):
+        """Display the widget of the given branch, building it if necessary"""
+        try:
+            widget = self._branch_widgets[index]
+        except KeyError:
+            schema, ctx = self._branches[index]
+            widget = self._branch_widgets[index] = _create_widget(self.name, schema, ctx, self)
+            self.widget_stack.addWidget(widget)
+
+        if widget is not self.widget_stack.currentWidget():
+            self.widget_stack.setCurrentWidget(widget)
+            self.mark_changed()
+
+        if self.branch_selector.currentIndex() != index:
+            self.branch_selector.setCurrentIndex(index)
+
+    def reload_schema(self, schema: dict, ctx: Context) -> bool:
+        keyword = "oneOf" if "oneOf" in schema else "anyOf"
+        ignored = (keyword,) + COMBINATOR_INHERITED_KEYWORDS + RELOAD_IGNORED_KEYWORDS
+        if (_get_widget_class(schema) is not type(self) or keyword not in self.schema
+                or _without(schema, *ignored) != _without(self.schema, *ignored)):
+            return False
+
+        # The union is rebuilt only if its active branch has been removed
+        current_index = self.branch_selector.currentIndex()
+        branches, index = _get_branches(schema, ctx)
+        if current_index >= len(branches):
+            return False
+
+        # Built branches are each reloaded, rebuilding only those whose schema has changed
+        for i, widget in list(self._branch_widgets.items()):
+            if i < len(branches):
+                branch_schema, branch_ctx = branches[i]
+                branch_widget = _reload_widget(widget, self.name, branch_schema, branch_ctx, self)
+                if branch_widget is widget:
+                    continue
+
+                self.widget_stack.addWidget(branch_widget)
+                self._branch_widgets[i] = branch_widget
+            else:
+                del self._branch_widgets[i]
+
+            self.widget_stack.removeWidget(widget)
+            widget.deleteLater()
+
+        self._branches = branches
+        self._index = index
+        self.node = get_schema_node(schema, ctx)
+        self.update_annotations()
+
+        self.branch_selector.blockSignals(True)
+        self.branch_selector.clear()
+        self.branch_selector.addItems([self._get_branch_title(i, b) for i, (b, _) in enumerate(branches)])
+        self.branch_selector.setCurrentIndex(current_index)
+        self.branch_selector.blockSignals(False)
+
+        self.widget_stack.setCurrentWidget(self._branch_widgets[current_index])
+
+        self.mark_changed()
+        return True
+
+    def update_annotations(self):
+        self.label.setText(self.schema.get('title', self.name))
+        self.label.setToolTip(self.schema.get('description', ""))
+
+    def json_hash(self) -> bytes:
+        return self.current_widget.json_hash()
+
+    def dump_json_object(self):
+        return self.current_widget.dump_json_object()
+
+    def iter_json_children(self):
+        return self.current_widget.iter_json_children()
+
+    def load_json_object(self, data):
+        index = self._index.select(data)
+        if index is not None:
+            self.select_branch(index)
+
+        self.current_widget.load_json_object(data)
+
 
 supported_widgets = (
+    JSONCombinatorWidget,
     JSONArrayTabWidget,
     JSONObjectWidget,
     JSONEnumWidget,
@@ -621,45 +1788,146 @@ supported_widgets = (
 )
 
 
-def create_widget(name: str, schema: dict, schema_uri: str = None) -> JSONBaseWidget:
+def create_widget(name: str, schema: dict, schema_uri: str = None,
+                  registry: URILoaderRegistry = None, builder=None) -> JSONBaseWidget:
     """Create widget according to given JSON schema.
     if `schema_uri` is omitted, external references may only be resolved against absolute URI `id` fields--
     
     :param name: widget name
     :param schema: dict-like JSON object
     :param schema_uri: URI corresponding to given schema object
+    :param registry: URILoaderRegistry shared between widgets of the same schema (created if omitted)
+    :param builder: ProgressiveBuilder to which the construction of nested widgets is deferred (optional)
     """
-    registry_class = create_cached_uri_loader_registry()
-    registry = registry_class()
+    if registry is None:
+        registry = create_default_uri_loader_registry(schema, schema_uri)
+
+    install_stylesheet()
+
+    ctx = Context(schema_uri or "#", registry)
+
+    # The builder is given to the root, from which the other widgets of the tree inherit it
+    return _create_widget(name, schema, ctx, None, builder=builder)
 
-    http_loader = HTTPResourceLoader()
-    file_resource_loader = FileResourceLoader()
-    document_loader = DocumentLoader(schema, schema_uri)
 
-    registry.register_for_scheme('http', http_loader)
-    registry.register_for_scheme('https', http_loader)
-    registry.register_for_scheme('file', file_resource_loader)
-    registry.register_for_scheme(None, document_loader)
+def reload_widget(widget: JSONBaseWidget, name: str, schema: dict, schema_uri: str = None,
+                  registry: URILoaderRegistry = None) -> JSONBaseWidget:
+    """Update widget created by `create_widget` for a changed JSON schema.
+    Only subtrees whose schema has changed are rebuilt, and the values of rebuilt subtrees are carried over where they
+    remain valid. Returns the given widget, or its replacement if the root itself was rebuilt.
+
+    :param widget: root widget
+    :param name: widget name
+    :param schema: dict-like JSON object
+    :param schema_uri: URI corresponding to given schema object
+    :param registry: URILoaderRegistry for the changed schema (created if omitted)
+    """
+    if registry is None:
+        registry = create_default_uri_loader_registry(schema, schema_uri)
 
     ctx = Context(schema_uri or "#", registry)
-    return _create_widget(name, schema, ctx, None)
+    return _reload_widget(widget, name, schema, ctx, None)
+
+
+def _get_branches(schema: dict, ctx: Context) -> tuple:
+    """Return the resolved (schema, context) branches of a oneOf/anyOf schema, and their DiscriminatorIndex
+
+    Branches are shared by the widgets of the schema in the same context.
+    """
+    def create(schema):
+        keyword = "oneOf" if "oneOf" in schema else "anyOf"
+        branches = [_resolve_branch(schema, b, ctx) for b in schema[keyword]]
+        return branches, DiscriminatorIndex([b for b, _ in branches])
+
+    return ctx.registry.schema_cache.get(('branches', ctx), schema, create)
+
+
+def _resolve_branch(schema: dict, branch: dict, ctx: Context) -> tuple:
+    resolved, ctx = _resolve_schema(branch, ctx)
+
+    # The `id` of the branch itself has been followed, and must not be followed again when its widget is built
+    if resolved is branch and "id" in branch:
+        resolved = _without(branch, "id")
+
+    inherited = {k: schema[k] for k in COMBINATOR_INHERITED_KEYWORDS if k in schema}
+    if not inherited:
+        return resolved, ctx
+
+    merged = dict(inherited)
+    merged.update(resolved)
+    if "properties" in inherited and "properties" in resolved:
+        merged["properties"] = dict(inherited["properties"], **resolved["properties"])
+    if "required" in inherited and "required" in resolved:
+        merged["required"] = list(inherited["required"]) + list(resolved["required"])
+
+    return merged, ctx
+
+
+def _without(schema: dict, *keys) -> dict:
+    return {k: v for k, v in schema.items() if k not in keys}
+
+
+def _reload_widget(widget: JSONBaseWidget, name: str, schema: dict, ctx: Context,
+                   parent: JSONBaseWidget) -> JSONBaseWidget:
+    resolved_schema, resolved_ctx = _resolve_schema(schema, ctx)
+
+    # The name of the root is the title of its schema
+    widget.name = name
+    if widget.reload_schema(resolved_schema, resolved_ctx):
+        return widget
+
+    new_widget = _create_widget(name, schema, ctx, parent)
+    try:
+        new_widget.load_json_object(widget.dump_json_object())
+    except (KeyError, IndexError, TypeError, ValueError, AttributeError, AssertionError):
+        pass  # Values which no longer fit the schema are discarded
+
+    return new_widget
+
+
+def _resolve_schema(schema: dict, ctx: Context):
+    """Return schema and context after following `id` scope changes and `$ref` references
+
+    :param schema: dict-like JSON object
+    :param ctx: Context of given schema
+    """
+    return ctx.resolve(schema)
+
+
+def _create_child_widget(name: str, schema: dict, ctx: Context, parent: JSONBaseWidget) -> JSONBaseWidget:
+    # Construction of nested widgets may be deferred to a progressive builder
+    if parent.builder is not None and parent.builder.is_active:
+        return parent.builder.defer(name, schema, ctx, parent)
+
+    # Defaults of children are part of the default document loaded by the root of the subtree
+    return _create_widget(name, schema, ctx, parent, apply_default=False)
+
+
+def _get_node_hash(node) -> bytes:
+    # Children of container widgets may be widgets, or plain JSON values
+    if isinstance(node, JSONBaseWidget):
+        return node.json_hash()
+    return hash_json_value(node)
+
 
+def _get_widget_class(schema: dict) -> type:
+    return next((c for c in supported_widgets if c.supports_schema(schema)), UnsupportedSchemaWidget)
 
-def _create_widget(name: str, schema: dict, ctx: Context, parent: JSONBaseWidget) -> JSONBaseWidget:
-    if "id" in schema:
-        ctx = ctx.follow_uri(schema['id'])
 
-    while "$ref" in schema:
-        schema = ctx.dereference(schema['$ref'])
+def _create_widget(name: str, schema: dict, ctx: Context, parent: JSONBaseWidget,
+                   apply_default: bool = True, builder=None) -> JSONBaseWidget:
+    schema, ctx = _resolve_schema(schema, ctx)
 
-    widget_class = next((c for c in supported_widgets if c.supports_schema(schema)),
-                        UnsupportedSchemaWidget)
+    # The node is held until the widget holds it
+    node = get_schema_node(schema, ctx)
+    widget_class = node.widget_class
 
     # If instantiation fails, error
     try:
-        widget = widget_class(name, schema, ctx, parent)
+        widget = widget_class(name, schema, ctx, parent, builder)
     except UnsupportedSchemaError:
-        widget = UnsupportedSchemaWidget(name, schema, ctx, parent)
+        widget = UnsupportedSchemaWidget(name, schema, ctx, parent, builder)
 
-    widget.initialise()
+    if apply_default:
+        widget.initialise()
     return widget
@@ -0,0 +1,11 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def app():
+    """QApplication for tests of widgets, shared by the session so that it outlives the widgets"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5 import QtWidgets
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
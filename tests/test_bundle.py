@@ -0,0 +1,113 @@
+import json
+import shutil
+
+import pytest
+
+from qtjsonschema.bundle import (BundleResourceLoader, crawl_schema, get_relative_uri, iter_references, register_bundle,
+                                 write_bundle)
+from qtjsonschema.tools import create_default_uri_loader_registry
+
+ROOT = {
+    "type": "object",
+    "properties": {
+        "address": {"$ref": "types/address.json"},
+        "scoped": {"id": "types/", "$ref": "name.json#/definitions/name"},
+        "local": {"$ref": "#/definitions/local"},
+    },
+    "definitions": {"local": {"type": "string"}},
+}
+ADDRESS = {"type": "object", "properties": {"street": {"$ref": "name.json#/definitions/name"}}}
+NAME = {"definitions": {"name": {"type": "string"}}}
+
+
+@pytest.fixture
+def schema_dir(tmp_path):
+    directory = tmp_path / "schemas"
+    (directory / "types").mkdir(parents=True)
+    (directory / "root.json").write_text(json.dumps(ROOT))
+    (directory / "types" / "address.json").write_text(json.dumps(ADDRESS))
+    (directory / "types" / "name.json").write_text(json.dumps(NAME))
+    return directory
+
+
+@pytest.fixture
+def bundle_path(schema_dir, tmp_path):
+    root_uri = (schema_dir / "root.json").as_uri()
+    path = str(tmp_path / "schema.bundle")
+    write_bundle(path, crawl_schema(ROOT, root_uri))
+    return path
+
+
+def test_references_follow_id_scopes():
+    uris = set(iter_references(ROOT, "file:///schemas/root.json"))
+    assert uris == {
+        "file:///schemas/types/address.json",
+        "file:///schemas/types/name.json#/definitions/name",
+        "file:///schemas/root.json#/definitions/local",
+    }
+
+
+def test_crawl_finds_every_referenced_document(schema_dir):
+    root_uri = (schema_dir / "root.json").as_uri()
+    documents = crawl_schema(ROOT, root_uri)
+
+    assert list(documents)[0] == root_uri
+    assert documents == {
+        root_uri: ROOT,
+        (schema_dir / "types" / "address.json").as_uri(): ADDRESS,
+        (schema_dir / "types" / "name.json").as_uri(): NAME,
+    }
+
+
+def test_bundle_round_trip(schema_dir, bundle_path):
+    root_uri = (schema_dir / "root.json").as_uri()
+
+    with BundleResourceLoader(bundle_path) as bundle:
+        assert bundle.root_uri == root_uri
+        assert len(bundle) == 3
+        assert bundle.schemes == {"file"}
+        assert bundle.load_resource(root_uri) == ROOT
+        assert bundle.load_resource((schema_dir / "types" / "name.json").as_uri()) == NAME
+
+        with pytest.raises(ValueError):
+            bundle.load_resource((schema_dir / "other.json").as_uri())
+
+
+def test_bundle_is_served_relative_to_moved_root(schema_dir, bundle_path, tmp_path):
+    moved_dir = tmp_path / "moved"
+    shutil.move(str(schema_dir), str(moved_dir))
+    root_uri = (moved_dir / "root.json").as_uri()
+
+    # The bundle alone serves the referenced documents
+    shutil.rmtree(str(moved_dir / "types"))
+
+    changed_root = dict(ROOT, title="Changed")
+    registry = create_default_uri_loader_registry(changed_root, root_uri)
+    with BundleResourceLoader(bundle_path, root_uri, changed_root) as bundle:
+        register_bundle(registry, bundle)
+
+        assert registry.load_uri(root_uri) is changed_root
+        assert registry.load_uri((moved_dir / "types" / "address.json").as_uri()) == ADDRESS
+        assert registry.load_uri((moved_dir / "types" / "name.json").as_uri() + "#/definitions/name") == \
+            NAME["definitions"]["name"]
+
+
+def test_closed_bundle_cannot_be_read(schema_dir, bundle_path):
+    bundle = BundleResourceLoader(bundle_path)
+    bundle.close()
+
+    with pytest.raises(ValueError):
+        bundle.load_resource((schema_dir / "root.json").as_uri())
+
+
+def test_other_files_are_not_bundles(schema_dir):
+    with pytest.raises(ValueError):
+        BundleResourceLoader(str(schema_dir / "root.json"))
+
+
+def test_relative_uris():
+    assert get_relative_uri("file:///a/b/c.json", "file:///a/root.json") == "b/c.json"
+    assert get_relative_uri("file:///c.json", "file:///a/root.json") == "../c.json"
+    assert get_relative_uri("file:///a/x:y.json", "file:///a/root.json") == "./x:y.json"
+    assert get_relative_uri("http://host/c.json", "file:///a/root.json") == "http://host/c.json"
+    assert get_relative_uri("http://other/c.json", "http://host/root.json") == "http://other/c.json"
@@ -0,0 +1,76 @@
+import pytest
+from jsonschema import Draft4Validator
+
+from qtjsonschema import columnar
+from qtjsonschema.columnar import COLUMNAR_THRESHOLD, ColumnarDraft4Validator, is_columnar_schema
+
+ROW_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "minLength": 1, "maxLength": 3},
+        "code": {"type": "string", "maxLength": 0},
+        "count": {"type": "integer", "minimum": 0, "maximum": 10, "exclusiveMaximum": True},
+        "ratio": {"type": "number", "minimum": 0.5, "exclusiveMinimum": True},
+        "kind": {"enum": ["a", "b"], "type": "string"},
+        "large": {"type": "integer", "maximum": 2 ** 53},
+    },
+    "required": ["name", "count"],
+}
+
+ROWS = [
+    {"name": "", "code": "", "count": 10, "ratio": 0.5, "kind": "a"},
+    {"name": "long", "code": "x", "count": -1, "ratio": 1, "kind": "c"},
+    {"name": 1, "count": 1.5, "ratio": True, "large": 2 ** 53 + 1},
+    {"code": "", "kind": None},
+    {"name": "ok", "count": 3, "ratio": 0.75, "kind": "b", "large": 2 ** 53},
+]
+
+
+def get_errors(validator, instance):
+    return [(e.message, list(e.path), list(e.schema_path), e.validator, e.validator_value)
+            for e in validator.iter_errors(instance)]
+
+
+def create_instance():
+    return [ROWS[i % len(ROWS)] for i in range(COLUMNAR_THRESHOLD)]
+
+
+@pytest.fixture
+def columnar_calls(monkeypatch):
+    calls = []
+    iter_columnar_errors = columnar.iter_columnar_errors
+
+    def spy(*args):
+        calls.append(args)
+        return iter_columnar_errors(*args)
+
+    monkeypatch.setattr(columnar, "iter_columnar_errors", spy)
+    return calls
+
+
+def test_row_schema_is_columnar():
+    assert is_columnar_schema(ROW_SCHEMA)
+    assert not is_columnar_schema({"type": "object", "properties": {"a": {"pattern": "x"}}})
+    assert not is_columnar_schema({"type": "object", "properties": {"a": {"type": "object"}}})
+
+
+def test_errors_match_draft4(columnar_calls):
+    schema = {"type": "array", "items": ROW_SCHEMA}
+    instance = create_instance()
+
+    assert get_errors(ColumnarDraft4Validator(schema), instance) == get_errors(Draft4Validator(schema), instance)
+    assert columnar_calls
+
+
+def test_referenced_items_are_validated_by_column(columnar_calls):
+    schema = {"type": "array", "items": {"$ref": "#/definitions/row"}, "definitions": {"row": ROW_SCHEMA}}
+    instance = create_instance()
+
+    assert get_errors(ColumnarDraft4Validator(schema), instance) == get_errors(Draft4Validator(schema), instance)
+    assert columnar_calls
+
+
+def test_short_arrays_are_validated_by_item(columnar_calls):
+    schema = {"type": "array", "items": ROW_SCHEMA}
+    assert get_errors(ColumnarDraft4Validator(schema), ROWS) == get_errors(Draft4Validator(schema), ROWS)
+    assert not columnar_calls
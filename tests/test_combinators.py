@@ -0,0 +1,50 @@
+from qtjsonschema.combinators import DiscriminatorIndex, get_branch_types
+
+
+def test_branch_types_are_declared_or_implied():
+    assert get_branch_types({"type": "string"}) == {"string"}
+    assert get_branch_types({"type": ["string", "null"]}) == {"string", "null"}
+    assert get_branch_types({"properties": {"a": {}}}) == {"object"}
+    assert get_branch_types({"required": ["a"]}) == {"object"}
+    assert get_branch_types({"items": {}}) == {"array"}
+    assert get_branch_types({"description": "Anything"}) is None
+
+
+def test_branches_are_selected_by_type():
+    index = DiscriminatorIndex([{"type": "string"}, {"type": "number"}, {"items": {"type": "string"}}])
+
+    assert index.select("text") == 0
+    assert index.select(1.5) == 1
+    # Integers are numbers
+    assert index.select(2) == 1
+    assert index.select(["text"]) == 2
+    assert index.select(None) is None
+
+
+def test_typeless_object_branches_are_not_selected_for_other_values():
+    index = DiscriminatorIndex([{"properties": {"a": {}}}, {"type": "string"}])
+
+    assert index.select({"a": 1}) == 0
+    assert index.select("text") == 1
+
+
+def test_object_branches_are_selected_by_const_and_enum_properties():
+    index = DiscriminatorIndex([
+        {"type": "object", "properties": {"kind": {"const": "circle"}, "radius": {"type": "number"}}},
+        {"type": "object", "properties": {"kind": {"enum": ["square", "rectangle"]}}},
+        {"type": "object", "required": ["name"]},
+    ])
+
+    assert index.select({"kind": "circle", "radius": 1}) == 0
+    assert index.select({"kind": "rectangle"}) == 1
+    assert index.select({"kind": "triangle", "name": "a"}) == 2
+    # Branches requiring absent properties are not selected
+    assert index.select({"kind": "triangle"}) is None
+
+
+def test_scalar_branches_are_selected_by_their_values():
+    index = DiscriminatorIndex([{"enum": [1, 2]}, {"const": {"a": [1]}}, {"type": "integer"}])
+
+    assert index.select(2) == 0
+    assert index.select({"a": [1]}) == 1
+    assert index.select(3) == 2
@@ -0,0 +1,126 @@
+import json
+
+import pytest
+
+from qtjsonschema.defaults import NO_DEFAULT, generate_default_instance, get_default
+from qtjsonschema.tools import Context, create_default_uri_loader_registry
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "default": "Untitled"},
+        "size": {"$ref": "#/definitions/size"},
+        "tags": {"type": "array"},
+    },
+    "definitions": {
+        "size": {
+            "type": "object",
+            "properties": {
+                "width": {"type": "integer", "default": 1},
+                "height": {"type": "integer", "default": 2},
+            },
+            "default": {"height": 3},
+        },
+    },
+}
+
+
+@pytest.fixture
+def write_schema(tmp_path):
+    """Return function writing a schema to a file, and returning the schema with its URI"""
+    def write(schema):
+        path = tmp_path / "schema.json"
+        path.write_text(json.dumps(schema))
+        return schema, path.as_uri()
+    return write
+
+
+def test_property_defaults_are_merged_under_enclosing_defaults(write_schema):
+    assert generate_default_instance(*write_schema(SCHEMA)) == {"name": "Untitled", "size": {"width": 1, "height": 3}}
+
+    schema = dict(SCHEMA, default={"name": "Named", "size": {"width": 4}})
+    assert generate_default_instance(*write_schema(schema)) == {"name": "Named", "size": {"width": 4, "height": 3}}
+
+
+def test_schemas_without_defaults():
+    assert generate_default_instance({"type": "object", "properties": {"a": {"type": "string"}}}) == {}
+    assert generate_default_instance({"type": "string"}) is None
+    assert generate_default_instance({"type": "string", "default": "text"}) == "text"
+
+
+def test_branches_apply_their_own_defaults():
+    schema = {"type": "object", "properties": {"a": {"default": 1}}, "oneOf": [{"default": {"b": 2}}]}
+    assert generate_default_instance(schema) == {}
+
+
+def test_recursive_schemas(write_schema):
+    schema = {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string", "default": "node"},
+            "child": {"$ref": "#"},
+        },
+    }
+    default = generate_default_instance(*write_schema(schema))
+
+    # Defaults stop at the recurrence of a schema
+    assert default["name"] == "node"
+    assert "child" not in default.get("child", {})
+
+
+def test_defaults_are_cached_and_instances_copied(write_schema):
+    schema, schema_uri = write_schema(SCHEMA)
+    registry = create_default_uri_loader_registry(schema, schema_uri)
+    ctx = Context(schema_uri, registry)
+
+    default = get_default(SCHEMA, ctx)
+    assert get_default(SCHEMA, ctx) is default
+    assert get_default({"type": "string"}, ctx) is NO_DEFAULT
+
+    instance = generate_default_instance(SCHEMA, schema_uri, registry)
+    instance["size"]["width"] = 10
+    assert default["size"]["width"] == 1
+
+
+def test_defaults_of_recursive_schemas_do_not_depend_on_generation_order(write_schema):
+    schema = {
+        "definitions": {
+            "a": {"type": "object", "properties": {"x": {"default": 1}, "b": {"$ref": "#/definitions/b"}}},
+            "b": {"type": "object", "properties": {"y": {"default": 2}, "a": {"$ref": "#/definitions/a"}}},
+        },
+    }
+    schema, schema_uri = write_schema(schema)
+
+    defaults = []
+    for first, second in (("a", "b"), ("b", "a")):
+        registry = create_default_uri_loader_registry(schema, schema_uri)
+        ctx = Context(schema_uri, registry)
+        generated = {k: get_default(*ctx.resolve({"$ref": "#/definitions/" + k})) for k in (first, second)}
+        defaults.append(generated)
+
+    assert defaults[0] == defaults[1]
+    assert defaults[0]["a"] == {"x": 1, "b": {"y": 2}}
+    assert defaults[0]["b"] == {"y": 2, "a": {"x": 1}}
+
+
+def test_defaults_are_generated_in_the_scope_of_the_schema(tmp_path):
+    # The same definition is reached in the scope of each document, in which its reference resolves differently
+    definitions = {
+        "pair": {"type": "object", "properties": {"value": {"$ref": "#/definitions/value"}}},
+        "value": {"default": "root"},
+    }
+    schema = {
+        "type": "object",
+        "properties": {
+            "a": {"$ref": "#/definitions/pair"},
+            "b": {"id": "other.json", "$ref": "schema.json#/definitions/pair"},
+        },
+        "definitions": definitions,
+    }
+    other = {"definitions": {"value": {"default": "other"}}}
+
+    (tmp_path / "other.json").write_text(json.dumps(other))
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps(schema))
+
+    assert generate_default_instance(schema, path.as_uri()) == {"a": {"value": "root"}, "b": {"value": "other"}}
@@ -0,0 +1,96 @@
+import json
+
+from qtjsonschema.dependencies import DependencyGraph, get_dependency_graph
+from qtjsonschema.tools import Context, URILoaderRegistry, create_default_uri_loader_registry
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "card": {"type": "string"},
+        "billing": {"type": "string"},
+        "name": {"type": "string"},
+        "postcode": {"type": "string"},
+    },
+    "dependencies": {
+        "card": ["billing", "name"],
+        "billing": ["name"],
+        "postcode": {"required": ["billing"]},
+    },
+}
+
+
+def test_graph_maps_triggers_and_dependents():
+    graph = DependencyGraph(SCHEMA)
+
+    assert graph.triggers == {"card", "billing", "postcode"}
+    assert graph.get_dependents("card") == ("billing", "name")
+    assert graph.get_dependents("name") == ()
+    assert graph.required_by == {"billing": ["card", "postcode"], "name": ["card", "billing"]}
+    assert graph.schema_dependencies == {"postcode": {"required": ["billing"]}}
+
+    # Properties required by schema dependencies are dependents too
+    assert graph.get_dependents("postcode") == ("billing",)
+
+
+def test_properties_are_required_by_present_triggers():
+    graph = DependencyGraph(SCHEMA)
+
+    present = {"billing"}
+    assert graph.is_required("name", present.__contains__)
+    assert not graph.is_required("billing", present.__contains__)
+    assert not graph.is_required("card", present.__contains__)
+
+    present = {"card"}
+    assert graph.is_required("billing", present.__contains__)
+
+    present = {"postcode"}
+    assert graph.is_required("billing", present.__contains__)
+    assert not graph.is_required("name", present.__contains__)
+
+
+def test_schema_without_dependencies():
+    graph = DependencyGraph({"type": "object"})
+    assert not graph.triggers
+    assert not graph.is_required("name", lambda name: True)
+
+
+def test_graphs_are_shared_between_users_of_a_schema():
+    ctx = Context("#", URILoaderRegistry())
+    graph = get_dependency_graph(SCHEMA, ctx)
+
+    assert get_dependency_graph(SCHEMA, ctx) is graph
+    assert get_dependency_graph(dict(SCHEMA), ctx) is graph
+    assert get_dependency_graph(dict(SCHEMA, dependencies={}), ctx) is not graph
+
+
+def test_referenced_schema_dependencies_are_resolved(tmp_path):
+    schema = {
+        "type": "object",
+        "properties": {"x": {"type": "string"}, "y": {"type": "string"}},
+        "dependencies": {"x": {"$ref": "#/definitions/needsY"}},
+        "definitions": {"needsY": {"required": ["y"]}},
+    }
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps(schema))
+    schema_uri = path.as_uri()
+    ctx = Context(schema_uri, create_default_uri_loader_registry(schema, schema_uri))
+
+    graph = get_dependency_graph(schema, ctx)
+    assert graph.required_by == {"y": ["x"]}
+    assert graph.schema_dependencies == {"x": {"$ref": "#/definitions/needsY"}}
+    assert graph.is_required("y", lambda name: name == "x")
+
+
+def test_optional_triggers_are_present_only_with_a_default_or_when_loaded(app):
+    from qtjsonschema.widgets import create_widget
+
+    schema = dict(SCHEMA, properties=dict(SCHEMA["properties"], postcode={"type": "string", "default": "AB1"}))
+    widget = create_widget("root", schema)
+
+    assert widget.dump_json_object() == {"postcode": "AB1", "billing": "", "name": ""}
+    assert widget.properties["billing"].property("required") is True
+    assert not widget.properties["card"].isVisibleTo(widget)
+
+    widget.load_json_object({"card": "1234", "billing": "x", "name": "y"})
+    assert widget.dump_json_object() == {"card": "1234", "billing": "x", "name": "y"}
+    assert widget.properties["card"].isVisibleTo(widget)
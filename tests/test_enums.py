@@ -0,0 +1,70 @@
+import pytest
+
+from qtjsonschema.enums import EnumIndex
+
+ENUM_SCHEMA = {"enum": ["one", 1, True, "1", None, 1]}
+
+
+def test_values_are_distinguished_by_type():
+    index = EnumIndex(ENUM_SCHEMA["enum"])
+
+    assert len(index) == 6
+    assert index.index_of("one") == 0
+    assert index.index_of(1) == 1
+    assert index.index_of(True) == 2
+    assert index.index_of("1") == 3
+    assert index.index_of(None) == 4
+    assert index.index_of(1.5) == -1
+    assert index.index_of({}) == -1
+
+
+def test_labels_of_mixed_values_are_json():
+    index = EnumIndex(ENUM_SCHEMA["enum"])
+
+    assert index.model.stringList() == ['"one"', "1", "true", '"1"', "null", "1"]
+    assert index.index_of_label('"1"') == 3
+    assert index.index_of_label("true") == 2
+    assert index.index_of_label("one") == -1
+
+    index = EnumIndex(["red", "green"])
+    assert index.model.stringList() == ["red", "green"]
+    assert index.index_of_label("green") == 1
+
+
+@pytest.fixture
+def widget(app):
+    from qtjsonschema.widgets import create_widget
+
+    widget = create_widget("root", {"type": "object", "properties": {"first": ENUM_SCHEMA, "second": ENUM_SCHEMA}})
+    yield widget
+    widget.deleteLater()
+
+
+def test_widgets_of_the_same_enum_share_its_index(widget):
+    first, second = widget.properties["first"], widget.properties["second"]
+
+    assert first._enum_index is second._enum_index
+    assert first._primitive_widget.model() is second._primitive_widget.model()
+
+    widget.load_json_object({"first": True, "second": "1"})
+    assert first._primitive_widget.currentIndex() == 2
+    assert second._primitive_widget.currentIndex() == 3
+    assert widget.dump_json_object() == {"first": True, "second": "1"}
+
+    with pytest.raises(ValueError):
+        first.load_json_object(2)
+
+
+def test_entered_labels_select_their_value(widget):
+    combo_box = widget.properties["first"]._primitive_widget
+
+    combo_box.setEditText("null")
+    combo_box.lineEdit().editingFinished.emit()
+    assert widget.properties["first"].dump_json_object() is None
+    assert combo_box.currentIndex() == 4
+
+    # Unknown labels restore the text of the current value
+    combo_box.setEditText("two")
+    combo_box.lineEdit().editingFinished.emit()
+    assert combo_box.currentIndex() == 4
+    assert combo_box.currentText() == "null"
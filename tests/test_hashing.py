@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+from qtjsonschema.hashing import hash_array, hash_json_value, hash_leaf, hash_object
+
+
+def test_object_hash_ignores_key_order():
+    a = OrderedDict([("x", 1), ("y", [1, 2])])
+    b = OrderedDict([("y", [1, 2]), ("x", 1)])
+    assert hash_json_value(a) == hash_json_value(b)
+
+
+def test_integral_floats_hash_as_integers():
+    assert hash_json_value({"x": 1.0}) == hash_json_value({"x": 1})
+    assert hash_json_value(1.5) != hash_json_value(1)
+
+
+def test_distinguishes_types_and_order():
+    assert hash_json_value([1, 2]) != hash_json_value([2, 1])
+    assert hash_json_value([]) != hash_json_value({})
+    assert hash_json_value("1") != hash_json_value(1)
+    assert hash_json_value(True) != hash_json_value(1)
+    assert hash_json_value({"0": 1}) != hash_json_value([1])
+
+
+def test_container_hashes_compose_from_children():
+    value = {"a": [1, {"b": None}]}
+    expected = hash_object([("a", hash_array([hash_leaf(1), hash_object([("b", hash_leaf(None))])]))])
+    assert hash_json_value(value) == expected
+
+
+def test_memo_records_containers():
+    child = [1, 2]
+    value = {"a": child}
+    memo = {}
+
+    value_hash = hash_json_value(value, memo)
+    assert memo[id(value)] == value_hash
+    assert memo[id(child)] == hash_json_value(child)
+    assert hash_json_value(value, memo) == value_hash
+
+
+RECORD_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+}
+
+
+def create_record_widget(value):
+    from qtjsonschema.widgets import create_widget
+
+    widget = create_widget("root", RECORD_SCHEMA)
+    widget.load_json_object(value)
+    return widget
+
+
+def test_widget_hashes_match_their_values(app):
+    first = create_record_widget({"name": "first", "tags": ["a", "b"]})
+    second = create_record_widget({"name": "second", "tags": ["a", "b"]})
+
+    assert first.json_hash() == hash_json_value(first.dump_json_object())
+    assert first.json_hash() != second.json_hash()
+
+    first.properties["name"]._primitive_widget.setText("second")
+    assert first.json_hash() == second.json_hash()
+
+
+def test_changes_invalidate_cached_hashes_up_to_the_root(app):
+    widget = create_record_widget({"name": "first", "tags": ["a", "b"]})
+    root_hash = widget.json_hash()
+    name_hash = widget.properties["name"].json_hash()
+
+    widget.properties["name"]._primitive_widget.setText("changed")
+    assert widget.properties["name"].json_hash() != name_hash
+    assert widget.json_hash() != root_hash
+
+    # Restoring the value restores the hash
+    widget.properties["name"]._primitive_widget.setText("first")
+    assert widget.json_hash() == root_hash
+
+
+def test_changes_of_array_items_invalidate_cached_hashes(app):
+    widget = create_record_widget({"name": "first", "tags": ["a", "b"]})
+    root_hash = widget.json_hash()
+    tags = widget.properties["tags"]
+    tags_hash = tags.json_hash()
+
+    item = next(tags.iter_json_children())
+    item._primitive_widget.setText("c")
+
+    assert tags.json_hash() != tags_hash
+    assert widget.json_hash() != root_hash
+    assert widget.json_hash() == hash_json_value({"name": "first", "tags": ["c", "b"]})
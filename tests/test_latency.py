@@ -0,0 +1,108 @@
+import json
+import time
+
+import pytest
+
+from qtjsonschema.latency import FRAME_INTERVAL, LatencyReport, percentile
+
+
+@pytest.mark.parametrize("p, expected", [
+    (0, 1),
+    (10, 1),
+    (50, 5),
+    (51, 6),
+    (95, 10),
+    (100, 10),
+])
+def test_percentile_is_nearest_rank(p, expected):
+    assert percentile(list(range(1, 11)), p) == expected
+
+
+def test_percentile_of_no_values():
+    assert percentile([], 50) == 0.0
+
+
+def test_report_summarises_latencies_by_event_type():
+    report = LatencyReport()
+    for latency in (0.003, 0.001, 0.002):
+        report.add_latency("KeyPress", latency)
+    report.add_latency("MouseButtonPress", 0.004)
+
+    summary = report.summary()
+    assert list(summary) == ["all", "KeyPress", "MouseButtonPress", "slow_events", "stalls"]
+    assert summary["KeyPress"] == {"count": 3, "p50": 0.002, "p95": 0.003, "p99": 0.003, "max": 0.003}
+    assert summary["all"]["count"] == 4
+    assert summary["all"]["max"] == 0.004
+    assert summary["slow_events"] == {"count": 0, "dropped_frames": 0}
+    assert summary["stalls"] == {"count": 0, "dropped_frames": 0, "longest": 0.0}
+
+
+def test_report_counts_slow_events_apart_from_stalls():
+    report = LatencyReport()
+    report.add_latency("KeyPress", FRAME_INTERVAL * 2.5)
+    report.add_latency("KeyPress", FRAME_INTERVAL / 2)
+    report.add_stall(FRAME_INTERVAL * 1.5)
+
+    summary = report.summary()
+    assert summary["slow_events"] == {"count": 1, "dropped_frames": 2}
+    assert summary["stalls"] == {"count": 1, "dropped_frames": 1, "longest": FRAME_INTERVAL * 1.5}
+
+    lines = report.format().splitlines()
+    assert lines[0].split() == ["event", "count", "p50", "ms", "p95", "ms", "p99", "ms", "max", "ms"]
+    assert lines[1].split()[:2] == ["all", "2"]
+    assert lines[-2].startswith("1 events slower")
+    assert lines[-1].startswith("1 stalls")
+
+
+def test_busy_event_loop_is_not_one_stall(app):
+    from PyQt5 import QtCore
+    from qtjsonschema.latency import _run_event_loop
+
+    # Zero-interval timers, as used by progressive builds, keep events pending without stalling the loop
+    ticks = []
+    timer = QtCore.QTimer()
+    timer.setInterval(0)
+    timer.timeout.connect(lambda: ticks.append(None))
+    timer.start()
+
+    report = LatencyReport()
+    try:
+        _run_event_loop(app, time.perf_counter() + FRAME_INTERVAL * 6, report)
+    finally:
+        timer.stop()
+
+    assert len(ticks) > 1
+    assert report.stalls == []
+
+
+def test_empty_report():
+    summary = LatencyReport().summary()
+    assert summary["all"] == {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+
+def test_recorded_options_are_applied_on_replay(app, tmp_path):
+    from qtjsonschema.latency import EventRecorder, open_recorded_window
+
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps({"type": "object", "properties": {"name": {"type": "string"}}}))
+    options = dict(progressive=True, lazy_load_size=1024, indent=None)
+
+    window = open_recorded_window(str(schema_path), (), {})
+    recorder = EventRecorder(window, options)
+    recorder.start()
+    recorder.stop()
+
+    recording_path = tmp_path / "recording.json"
+    recorder.save(str(recording_path))
+    recording = json.loads(recording_path.read_text())
+    assert recording["options"] == options
+
+    replay_window = open_recorded_window(str(schema_path), (), recording)
+    assert (replay_window.progressive, replay_window.lazy_load_size, replay_window.indent) == (True, 1024, None)
+
+    # Recordings without options are replayed with the default options
+    assert window.progressive is False
+
+    for w in (window, replay_window):
+        w.close()
+        w.deleteLater()
@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "count": {"type": "integer"},
+    },
+}
+
+DOCUMENT = {"items": [{"name": "Item {}".format(i), "count": i} for i in range(50)]}
+
+
+@pytest.fixture
+def lazy_items(tmp_path):
+    from qtjsonschema.offsets import open_lazy_json
+
+    path = tmp_path / "document.json"
+    path.write_text(json.dumps(DOCUMENT))
+    return open_lazy_json(str(path))["items"]
+
+
+def get_built_items(widget):
+    from qtjsonschema.widgets import JSONBaseWidget
+
+    return [i for i, c in enumerate(widget.iter_json_children()) if isinstance(c, JSONBaseWidget)]
+
+
+def test_tabs_are_built_when_selected(app, lazy_items):
+    from qtjsonschema.widgets import JSONArrayTabWidget, create_widget
+
+    widget = create_widget("items", {"type": "array", "items": ITEM_SCHEMA})
+    assert isinstance(widget, JSONArrayTabWidget)
+
+    widget.load_json_object(lazy_items)
+    assert widget.tabs.count() == len(DOCUMENT["items"])
+    assert get_built_items(widget) == [0]
+    assert widget.dump_json_object() == DOCUMENT["items"]
+
+    widget.tabs.setCurrentIndex(10)
+    assert get_built_items(widget) == [0, 10]
+    assert widget.tabs.widget(10).dump_json_object() == DOCUMENT["items"][10]
+    assert widget.tabs.tabText(10) == "Item #10"
+
+    widget.remove_item(20)
+    assert widget.dump_json_object() == DOCUMENT["items"][:20] + DOCUMENT["items"][21:]
+
+
+def test_tabs_reload_lazy_items(app, lazy_items):
+    from qtjsonschema.widgets import create_widget
+
+    widget = create_widget("items", {"type": "array", "items": ITEM_SCHEMA})
+    widget.load_json_object([{"name": "first"}] + [{"name": "kept {}".format(i)} for i in range(59)])
+    widget.tabs.setCurrentIndex(55)
+
+    widget.load_json_object(lazy_items)
+    assert widget.dump_json_object()[:50] == DOCUMENT["items"]
+    assert widget.dump_json_object()[50:] == [{"name": "kept {}".format(i), "count": 0} for i in range(49, 59)]
+
+
+def test_duplicates_among_tabs_yet_to_be_built(app, tmp_path):
+    from qtjsonschema.offsets import open_lazy_json
+    from qtjsonschema.widgets import create_widget
+
+    path = tmp_path / "document.json"
+    path.write_text(json.dumps([{"name": "a", "count": 1}, {"name": "b", "count": 1}, {"name": "a", "count": 1}]))
+
+    widget = create_widget("items", {"type": "array", "items": ITEM_SCHEMA, "uniqueItems": True})
+    widget.load_json_object(open_lazy_json(str(path)))
+    assert widget.tabs.tabToolTip(2) == "Duplicate item"
+
+    widget.tabs.setCurrentIndex(2)
+    widget.tabs.widget(2).properties["name"].load_json_object("c")
+    assert widget.tabs.tabToolTip(0) == widget.tabs.tabToolTip(2) == ""
+
+
+def test_list_items_are_built_when_selected(app, tmp_path):
+    from qtjsonschema.offsets import open_lazy_json
+    from qtjsonschema.widgets import JSONArrayWidget, create_widget
+
+    path = tmp_path / "document.json"
+    path.write_text(json.dumps(["a", "b", "c", "d"]))
+
+    widget = create_widget("items", {"type": "array", "items": {"type": "string"}})
+    assert isinstance(widget, JSONArrayWidget)
+
+    widget.load_json_object(open_lazy_json(str(path)))
+    assert get_built_items(widget) == []
+    assert widget.dump_json_object() == ["a", "b", "c", "d"]
+
+    widget.items_list.setCurrentRow(3)
+    assert get_built_items(widget) == [3]
+
+
+def test_reloaded_list_items_are_checked_for_uniqueness(app, tmp_path):
+    from qtjsonschema.offsets import open_lazy_json
+    from qtjsonschema.widgets import create_widget
+
+    widget = create_widget("items", {"type": "array", "items": {"type": "string"}, "uniqueItems": True})
+
+    path = tmp_path / "duplicates.json"
+    path.write_text(json.dumps(["a", "a", "b"]))
+    widget.load_json_object(open_lazy_json(str(path)))
+    assert widget.constraint_label.text() == "1 duplicate item"
+
+    path = tmp_path / "unique.json"
+    path.write_text(json.dumps(["x", "y", "z"]))
+    widget.load_json_object(open_lazy_json(str(path)))
+    assert widget.constraint_label.text() == ""
+    assert widget.dump_json_object() == ["x", "y", "z"]
+
+    # Built and unbuilt items alike are hashed from the reloaded data
+    widget.items_list.setCurrentRow(0)
+    path = tmp_path / "reloaded.json"
+    path.write_text(json.dumps(["b", "c", "b", "d"]))
+    widget.load_json_object(open_lazy_json(str(path)))
+    assert widget.constraint_label.text() == "1 duplicate item"
+
+
+def test_close_button_follows_current_tab(app):
+    from PyQt5 import QtWidgets
+    from qtjsonschema.widgets import create_widget
+
+    widget = create_widget("items", {"type": "array", "items": ITEM_SCHEMA, "minItems": 1})
+    widget.load_json_object(DOCUMENT["items"][:3])
+    tab_bar = widget.tabs.tabBar()
+
+    def get_closable_tabs():
+        return [i for i in range(widget.tabs.count()) if tab_bar.tabButton(i, QtWidgets.QTabBar.RightSide) is not None]
+
+    widget.tabs.setCurrentIndex(1)
+    assert get_closable_tabs() == [1]
+
+    tab_bar.tabButton(1, QtWidgets.QTabBar.RightSide).click()
+    assert widget.dump_json_object() == [DOCUMENT["items"][0], DOCUMENT["items"][2]]
+    assert get_closable_tabs() == [widget.tabs.currentIndex()]
+
+    widget.remove_item(widget.tabs.currentIndex())
+    assert get_closable_tabs() == []
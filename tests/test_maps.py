@@ -0,0 +1,100 @@
+from qtjsonschema.maps import PropertyRouter, get_property_router
+from qtjsonschema.tools import Context, URILoaderRegistry
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "patternProperties": {
+        "^n_": {"type": "number"},
+        "_id$": {"type": "string", "pattern": "^[0-9]+$"},
+    },
+    "additionalProperties": {"type": "boolean"},
+}
+
+
+def test_names_are_routed_to_patterns_before_additional_properties():
+    router = PropertyRouter(SCHEMA)
+    patterns = SCHEMA["patternProperties"]
+
+    assert router.is_open
+    assert router.route("n_count") is patterns["^n_"]
+    assert router.route("user_id") is patterns["_id$"]
+    assert router.route("flag") is SCHEMA["additionalProperties"]
+
+
+def test_names_matching_several_patterns_are_routed_to_all_of_them():
+    router = PropertyRouter(SCHEMA)
+    patterns = SCHEMA["patternProperties"]
+
+    schema = router.route("n_id")
+    assert schema == {"allOf": [patterns["^n_"], patterns["_id$"]]}
+
+    # Each combination is routed to one schema, so that its editor is not rebuilt
+    assert router.route("n_user_id") is schema
+
+
+def test_closed_objects_accept_only_pattern_properties():
+    router = PropertyRouter(dict(SCHEMA, additionalProperties=False))
+
+    assert router.accepts("n_count")
+    assert not router.accepts("flag")
+    assert not router.accepts("name")
+
+    router = PropertyRouter({"type": "object", "properties": {"name": {"type": "string"}}})
+    assert not router.is_open
+    assert not router.accepts("other")
+
+
+def test_explicit_additional_properties_permit_any_value():
+    router = PropertyRouter({"type": "object", "additionalProperties": True})
+    assert router.route("anything") == {}
+
+
+def test_routers_are_shared_and_their_routes_bounded(monkeypatch):
+    from qtjsonschema import maps
+
+    monkeypatch.setattr(maps, "ROUTE_CACHE_SIZE", 2)
+    ctx = Context("#", URILoaderRegistry())
+
+    router = get_property_router(SCHEMA, ctx)
+    assert get_property_router(SCHEMA, ctx) is router
+    assert get_property_router(dict(SCHEMA), ctx) is not router
+
+    for i in range(10):
+        router.route("n_{}".format(i))
+    assert router._cached_route.cache_info().currsize == 2
+
+
+def test_model_rejects_duplicate_and_unroutable_keys(app):
+    from qtjsonschema.maps import JSONMapModel
+
+    model = JSONMapModel(PropertyRouter(dict(SCHEMA, additionalProperties=False)))
+    model.set_entries({"n_a": 1, "n_b": 2})
+    index = model.index(0, JSONMapModel.KEY_COLUMN)
+
+    assert not model.setData(index, "n_b")
+    assert not model.setData(index, "other")
+    assert not model.setData(index, "name")
+    assert model.setData(index, "n_c")
+    assert list(model.iter_entries()) == [("n_c", 1), ("n_b", 2)]
+    assert model.contains("n_c") and not model.contains("n_a")
+
+    model.remove_entry(0)
+    assert model.key(0) == "n_b"
+    assert model.contains("n_b")
+
+
+def test_map_widget_edits_values_with_routed_editors(app):
+    from qtjsonschema.widgets import create_widget
+
+    widget = create_widget("root", SCHEMA)
+    widget.load_json_object({"name": "x", "n_count": 3, "flag": True, "n_id": "7"})
+    map_widget = widget.map_widget
+
+    map_widget.table.selectRow(0)
+    assert map_widget.detail_widget.schema is SCHEMA["patternProperties"]["^n_"]
+
+    # Values of names matching several patterns have no editor, and are kept as loaded
+    map_widget.table.selectRow(2)
+    assert map_widget.detail_widget.schema["allOf"]
+    assert widget.dump_json_object() == {"name": "x", "n_count": 3, "flag": True, "n_id": "7"}
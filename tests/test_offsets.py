@@ -0,0 +1,155 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from qtjsonschema.offsets import (LazyJSONArray, LazyJSONObject, OffsetIndex, build_offset_index, get_index_path,
+                                  load_offset_index, materialise, open_lazy_json)
+
+DOCUMENT = {
+    "name": "a \"quoted\" {name}, with [brackets]",
+    "items": [1, {"x": [2, 3]}, "four", [], {}],
+    "empty": [],
+    "nested": {"a": {"b": 1}, "c": [True, None]},
+}
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    path = tmp_path / "document.json"
+    path.write_text(json.dumps(DOCUMENT, indent=2))
+    return str(path)
+
+
+def test_index_records_values_of_root_and_its_children():
+    data = json.dumps(DOCUMENT).encode()
+    index = build_offset_index(data)
+
+    assert index.json_type == 'object'
+    assert index.keys == list(DOCUMENT)
+    for position, key in enumerate(index.keys):
+        assert json.loads(data[index.starts[position]:index.ends[position]]) == DOCUMENT[key]
+
+    items = index.children[1]
+    assert items.json_type == 'array'
+    assert len(items) == len(DOCUMENT["items"])
+    assert [json.loads(data[s:e]) for s, e in zip(items.starts, items.ends)] == DOCUMENT["items"]
+
+    # Items of arrays are not indexed further
+    assert not items.children
+    assert len(index.children[2]) == 0
+
+
+def test_deeply_nested_values_are_skipped():
+    items = [[[[[{"a": ["]", "}"]}]]]], "[{", {"b": [[[[]]]]}, 1.5e3, None]
+    data = json.dumps({"items": items}, indent=2).encode()
+    index = build_offset_index(data, max_depth=1)
+
+    assert index.keys == ["items"]
+    assert not index.children
+    assert json.loads(data[index.starts[0]:index.ends[0]]) == items
+
+    index = build_offset_index(data).children[0]
+    assert [json.loads(data[s:e]) for s, e in zip(index.starts, index.ends)] == items
+
+
+def nest(depth: int, leaf):
+    for level in range(depth):
+        leaf = {"level {}".format(level): [leaf, "a b c"]}
+    return leaf
+
+
+@pytest.mark.parametrize("items", [
+    [{"a": {"b": {"c": {"d": 1}}}}],
+    [{"id": 1, "meta": {"owner": {"roles": ["x"]}}}],
+    [[[[1] * 40 + [[1]]]]],
+    [nest(depth, "x y z") for depth in range(3, 6)] * 20,
+    [nest(12, None)],
+])
+@pytest.mark.parametrize("malformed", [False, True])
+def test_nested_items_are_skipped_in_linear_time(items, malformed):
+    # Run apart, so that catastrophic backtracking fails the test rather than hanging it
+    script = """
+import json, sys
+from qtjsonschema.offsets import build_offset_index
+data = sys.stdin.buffer.read()
+try:
+    index = build_offset_index(data)
+except ValueError:
+    sys.exit(2)
+json.dump([json.loads(data[s:e]) for s, e in zip(index.starts, index.ends)], sys.stdout)
+"""
+    data = json.dumps(items, indent=4).encode()
+    if malformed:
+        # Unbalanced brackets, found only after the whole of the last item is matched
+        data = data[:-1] + b"}"
+
+    process = subprocess.run([sys.executable, "-c", script], input=data, capture_output=True, timeout=10,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    if malformed:
+        assert process.returncode == 2
+    else:
+        assert process.returncode == 0, process.stderr
+        assert json.loads(process.stdout) == items
+
+
+def test_index_of_scalar_document_is_none():
+    assert build_offset_index(b' "text" ') is None
+
+
+def test_malformed_documents_are_rejected():
+    with pytest.raises(ValueError):
+        build_offset_index(b'{"a": [1, 2}')
+    with pytest.raises(ValueError):
+        build_offset_index(b'[1] [2]')
+    with pytest.raises(ValueError):
+        build_offset_index(b'[[[[[1]]]], 2')
+    with pytest.raises(ValueError):
+        build_offset_index(b'[1,, 2]')
+
+
+def test_index_round_trips_through_json():
+    index = build_offset_index(json.dumps(DOCUMENT).encode())
+    copy = OffsetIndex.from_json(json.loads(json.dumps(index.to_json())))
+
+    assert copy.to_json() == index.to_json()
+    assert list(copy.children[1].starts) == list(index.children[1].starts)
+
+
+def test_lazy_document_matches_parsed_document(json_file):
+    document = open_lazy_json(json_file)
+
+    assert isinstance(document, LazyJSONObject)
+    assert isinstance(document["items"], LazyJSONArray)
+    assert document["items"][1] == {"x": [2, 3]}
+    assert document["items"][-1] == {}
+    assert document["items"][1:3] == [{"x": [2, 3]}, "four"]
+    assert materialise(document) == DOCUMENT
+    assert materialise(document["nested"]) == DOCUMENT["nested"]
+    assert materialise(3) == 3
+
+    with pytest.raises(IndexError):
+        document["items"][len(DOCUMENT["items"])]
+
+
+def test_index_is_cached_until_file_changes(json_file):
+    index = load_offset_index(json_file)
+    index_path = get_index_path(json_file)
+    assert os.path.exists(index_path)
+
+    # An up to date cache is used as is
+    with open(index_path) as f:
+        cached = json.load(f)
+    cached['root']['keys'] = ["cached"] + cached['root']['keys'][1:]
+    with open(index_path, 'w') as f:
+        json.dump(cached, f)
+    assert load_offset_index(json_file).keys[0] == "cached"
+
+    # A changed file is indexed again
+    with open(json_file, 'w') as f:
+        json.dump({"other": 1}, f)
+    assert load_offset_index(json_file).keys == ["other"]
+    assert index.keys == list(DOCUMENT)
@@ -0,0 +1,104 @@
+import pytest
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "default": "Untitled"},
+        "size": {"type": "object", "properties": {"width": {"type": "integer", "default": 1}}},
+        "shape": {"oneOf": [{"type": "string"}, {"type": "integer"}]},
+    },
+}
+
+
+def run_builder(app, builder):
+    finished = []
+    builder.finished.connect(lambda: finished.append(True))
+    while builder.is_active:
+        app.processEvents()
+    return finished
+
+
+def test_tree_is_built_progressively(app):
+    from qtjsonschema.progressive import PendingWidget, ProgressiveBuilder
+    from qtjsonschema.widgets import create_widget
+
+    builder = ProgressiveBuilder()
+    widget = create_widget("root", SCHEMA, builder=builder)
+    assert any(isinstance(w, PendingWidget) for w in widget.properties.values())
+
+    assert run_builder(app, builder) == [True]
+    assert not any(isinstance(w, PendingWidget) for w in widget.properties.values())
+    assert widget.dump_json_object() == create_widget("root", SCHEMA).dump_json_object()
+    # Including the property of the nested object
+    assert builder.built_count == builder.deferred_count == 4
+
+
+@pytest.mark.parametrize("schema", [
+    {"type": "string"},
+    {"type": "array", "items": {"type": "integer"}},
+    {"type": "object", "additionalProperties": {"type": "string"}},
+])
+def test_builder_finishes_if_nothing_is_deferred(app, schema):
+    from qtjsonschema.progressive import ProgressiveBuilder
+    from qtjsonschema.widgets import create_widget
+
+    builder = ProgressiveBuilder()
+    create_widget("root", schema, builder=builder)
+
+    assert run_builder(app, builder) == [True]
+    assert builder.deferred_count == 0
+
+
+def test_documents_share_contexts(app):
+    from qtjsonschema.progressive import ProgressiveBuilder
+    from qtjsonschema.tools import create_default_uri_loader_registry
+    from qtjsonschema.widgets import create_widget
+
+    registry = create_default_uri_loader_registry(SCHEMA)
+    widgets = []
+    for _ in range(2):
+        builder = ProgressiveBuilder()
+        widgets.append(create_widget("root", SCHEMA, registry=registry, builder=builder))
+        run_builder(app, builder)
+
+    first, second = widgets
+    assert first.ctx is second.ctx
+    assert first.properties["shape"].node is second.properties["shape"].node
+
+
+def test_built_properties_keep_their_required_styling(app):
+    from qtjsonschema.progressive import PendingWidget, ProgressiveBuilder
+    from qtjsonschema.widgets import create_widget
+
+    schema = {
+        "type": "object",
+        "properties": {"card": {"type": "string"}, "billing": {"type": "string"}, "name": {"type": "string"}},
+        "dependencies": {"card": ["billing"]},
+    }
+
+    builder = ProgressiveBuilder()
+    widget = create_widget("root", schema, builder=builder)
+    widget.load_json_object({"card": "1234"})
+    assert isinstance(widget.properties["billing"], PendingWidget)
+
+    run_builder(app, builder)
+    assert widget.properties["billing"].property("required") is True
+    assert not widget.properties["name"].property("required")
+
+
+def test_builder_is_held_by_its_own_tree(app):
+    from qtjsonschema.progressive import ProgressiveBuilder
+    from qtjsonschema.widgets import create_widget
+
+    builder = ProgressiveBuilder()
+    widget = create_widget("root", SCHEMA, builder=builder)
+    # A tree created while another is being built progressively is built eagerly
+    other = create_widget("other", SCHEMA)
+
+    assert widget.builder is builder
+    assert widget.properties["name"].builder is builder
+    assert other.builder is None
+    assert other.properties["size"].builder is None
+
+    run_builder(app, builder)
+    assert widget.properties["size"].properties["width"].builder is builder
@@ -0,0 +1,133 @@
+import copy
+import json
+
+SCHEMA = {
+    "type": "object",
+    "title": "Root",
+    "description": "Root object",
+    "properties": {
+        "a": {"type": "string", "title": "A"},
+        "b": {"$ref": "#/definitions/b"},
+        "c": {"type": "integer"},
+    },
+    "definitions": {
+        "b": {"type": "string"},
+    },
+}
+
+ARRAY_SCHEMA = {
+    "type": "array",
+    "title": "Items",
+    "items": {"type": "object", "properties": {"a": {"type": "string"}, "b": {"$ref": "#/definitions/b"}}},
+    "definitions": {
+        "b": {"type": "string"},
+    },
+}
+
+COMBINATOR_SCHEMA = {
+    "title": "Value",
+    "oneOf": [{"type": "string"}, {"$ref": "#/definitions/b"}],
+    "definitions": {
+        "b": {"type": "integer"},
+    },
+}
+
+
+def load_session(path, schema):
+    from qtjsonschema.session import SchemaSession
+
+    path.write_text(json.dumps(schema))
+    return SchemaSession.from_file(str(path))
+
+
+def test_changed_definition_rebuilds_only_referencing_properties(app, tmp_path):
+    path = tmp_path / "schema.json"
+    widget = load_session(path, SCHEMA).create_widget()
+    widget.load_json_object({"a": "x", "b": "y", "c": 1})
+    a, b, c = (widget.properties[k] for k in "abc")
+
+    schema = copy.deepcopy(SCHEMA)
+    schema["definitions"]["b"]["maxLength"] = 10
+
+    assert load_session(path, schema).reload_widget(widget) is widget
+    assert widget.properties["a"] is a
+    assert widget.properties["c"] is c
+    assert widget.properties["b"] is not b
+    assert widget.dump_json_object() == {"a": "x", "b": "y", "c": 1}
+
+
+def test_changed_annotations_are_updated_in_place(app, tmp_path):
+    path = tmp_path / "schema.json"
+    widget = load_session(path, SCHEMA).create_widget()
+    a = widget.properties["a"]
+
+    schema = copy.deepcopy(SCHEMA)
+    schema["description"] = "Changed"
+    schema["title"] = "Changed root"
+    schema["properties"]["a"]["title"] = "Changed A"
+
+    assert load_session(path, schema).reload_widget(widget) is widget
+    assert widget.properties["a"] is a
+    assert widget.title() == "Changed root"
+    assert widget.toolTip() == "Changed"
+    assert a.label.text() == "Changed A"
+
+
+def test_changed_property_rebuilds_only_that_property(app, tmp_path):
+    path = tmp_path / "schema.json"
+    widget = load_session(path, SCHEMA).create_widget()
+    a, b = widget.properties["a"], widget.properties["b"]
+
+    schema = copy.deepcopy(SCHEMA)
+    schema["properties"]["c"]["minimum"] = 5
+
+    assert load_session(path, schema).reload_widget(widget) is widget
+    assert widget.properties["a"] is a
+    assert widget.properties["b"] is b
+    assert widget.properties["c"].schema["minimum"] == 5
+
+
+def test_changed_validation_keyword_rebuilds_object(app, tmp_path):
+    path = tmp_path / "schema.json"
+    widget = load_session(path, SCHEMA).create_widget()
+
+    schema = copy.deepcopy(SCHEMA)
+    schema["required"] = ["a"]
+
+    assert load_session(path, schema).reload_widget(widget) is not widget
+
+
+def test_changed_definition_rebuilds_only_referencing_items(app, tmp_path):
+    path = tmp_path / "schema.json"
+    widget = load_session(path, ARRAY_SCHEMA).create_widget()
+    widget.load_json_object([{"a": "x", "b": "y"}])
+    item = widget.tabs.widget(0)
+    a = item.properties["a"]
+
+    schema = copy.deepcopy(ARRAY_SCHEMA)
+    schema["definitions"]["b"]["maxLength"] = 10
+    schema["description"] = "Changed"
+
+    assert load_session(path, schema).reload_widget(widget) is widget
+    assert widget.tabs.widget(0) is item
+    assert item.properties["a"] is a
+    assert widget.label.toolTip() == "Changed"
+    assert widget.dump_json_object() == [{"a": "x", "b": "y"}]
+
+
+def test_changed_definition_rebuilds_only_referencing_branches(app, tmp_path):
+    path = tmp_path / "schema.json"
+    widget = load_session(path, COMBINATOR_SCHEMA).create_widget()
+    widget.select_branch(1)
+    string_widget = widget._branch_widgets[0]
+    integer_widget = widget._branch_widgets[1]
+
+    schema = copy.deepcopy(COMBINATOR_SCHEMA)
+    schema["definitions"]["b"]["maximum"] = 10
+    schema["title"] = "Changed"
+
+    assert load_session(path, schema).reload_widget(widget) is widget
+    assert widget._branch_widgets[0] is string_widget
+    assert widget._branch_widgets[1] is not integer_widget
+    assert widget.current_widget is widget._branch_widgets[1]
+    assert widget.label.text() == "Changed"
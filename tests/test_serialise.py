@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from qtjsonschema.serialise import iter_json_chunks, write_json
+
+DOCUMENT = {
+    "name": "Example",
+    "size": {"width": 1.5, "height": 2},
+    "tags": ["a", "b", []],
+    "empty": {},
+    "enabled": True,
+    "parent": None,
+}
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "size": {"type": "object", "properties": {"width": {"type": "number"}, "height": {"type": "integer"}}},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "enabled": {"type": "boolean"},
+    },
+}
+
+
+@pytest.mark.parametrize("indent", [None, 0, 2])
+@pytest.mark.parametrize("sort_keys", [False, True])
+def test_chunks_match_json_dumps(indent, sort_keys):
+    text = "".join(iter_json_chunks(DOCUMENT, indent, sort_keys))
+    assert text == json.dumps(DOCUMENT, indent=indent, sort_keys=sort_keys)
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("sort_keys", [False, True])
+def test_widget_chunks_match_dumped_object(app, indent, sort_keys):
+    from qtjsonschema.widgets import create_widget
+
+    widget = create_widget("root", SCHEMA)
+    widget.load_json_object({"name": "Example", "size": {"width": 1.5, "height": 2}, "tags": ["a", "b"]})
+
+    text = "".join(iter_json_chunks(widget, indent, sort_keys))
+    assert text == json.dumps(widget.dump_json_object(), indent=indent, sort_keys=sort_keys)
+
+
+def test_write_json_replaces_file(tmp_path):
+    path = tmp_path / "document.json"
+    path.write_text("previous")
+    os.chmod(str(path), 0o640)
+
+    write_json(str(path), DOCUMENT)
+
+    assert json.loads(path.read_text()) == DOCUMENT
+    assert os.stat(str(path)).st_mode & 0o777 == 0o640
+    assert os.listdir(str(tmp_path)) == ["document.json"]
+
+
+def test_failed_write_keeps_file_and_removes_temporary_file(tmp_path):
+    path = tmp_path / "document.json"
+    path.write_text("previous")
+
+    with pytest.raises(TypeError):
+        write_json(str(path), {"a": 1, "b": object()})
+
+    assert path.read_text() == "previous"
+    assert os.listdir(str(tmp_path)) == ["document.json"]
+
+
+@pytest.mark.parametrize("value, indent", [("4", 4), ("0", 0), ("none", None), ("None", None), ("-1", None)])
+def test_indent_option(value, indent):
+    from qtjsonschema.__main__ import _parse_indent
+    assert _parse_indent(None, None, value) == indent
+
+
+@pytest.mark.parametrize("value", ["-2", "two", ""])
+def test_invalid_indent_option(value):
+    import click
+    from qtjsonschema.__main__ import _parse_indent
+
+    with pytest.raises(click.BadParameter):
+        _parse_indent(None, None, value)
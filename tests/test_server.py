@@ -0,0 +1,146 @@
+import json
+import time
+import uuid
+
+import pytest
+
+SCHEMA = {"type": "object", "title": "Record", "properties": {"name": {"type": "string"}}}
+
+
+def run_until(app, condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+@pytest.fixture
+def server(app, monkeypatch):
+    from PyQt5 import QtWidgets
+    from qtjsonschema.__main__ import EditorServer
+
+    server = EditorServer(request_timeout=200)
+    server.name = "qtjsonschema-test-{}".format(uuid.uuid4().hex)
+    assert server.listen(server.name)
+
+    # Requests which cannot be served are reported in a message box
+    server.warnings = []
+    monkeypatch.setattr(QtWidgets.QMessageBox, "warning", lambda parent, title, text: server.warnings.append(text))
+
+    yield server
+
+    from PyQt5 import QtCore
+
+    for window in list(server.windows):
+        window.close()
+    app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    server._server.close()
+    server._quit_timer.stop()
+    server.deleteLater()
+
+
+@pytest.fixture
+def schema_path(tmp_path):
+    path = tmp_path / "schema.json"
+    path.write_text(json.dumps(SCHEMA))
+    return str(path)
+
+
+def send(server, request: dict):
+    from qtjsonschema.__main__ import send_to_server
+    assert send_to_server(request, server.name)
+
+
+def test_request_opens_window_with_its_options(app, server, schema_path):
+    send(server, {"schema": schema_path, "json_files": [], "progressive": True, "indent": 2})
+    assert run_until(app, lambda: server.windows)
+
+    window, = server.windows
+    assert window.progressive is True
+    assert window.indent == 2
+    assert window.session_cache is server.session_cache
+    assert window.schema == SCHEMA
+
+
+def test_windows_share_sessions(app, server, schema_path):
+    for _ in range(2):
+        send(server, {"schema": schema_path})
+    assert run_until(app, lambda: len(server.windows) == 2)
+
+    first, second = server.windows
+    assert first.session is second.session
+
+
+def test_server_remains_for_a_time_after_its_last_window_closes(app, server, schema_path):
+    from PyQt5 import QtCore
+
+    send(server, {"schema": schema_path})
+    assert run_until(app, lambda: server.windows)
+
+    server.windows[0].close()
+    app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+    assert server.windows == []
+    assert server._quit_timer.isActive()
+
+
+@pytest.mark.parametrize("obj, message", [
+    ({"schema": None, "session_cache": None}, "Unknown options session_cache"),
+    ({"schema": None, "parent": None, "validation_interval": 0}, "Unknown options parent, validation_interval"),
+    ([], "Request is not a JSON object"),
+])
+def test_requests_are_limited_to_whitelisted_options(app, server, obj, message):
+    send(server, obj)
+
+    assert run_until(app, lambda: server.warnings)
+    assert message in server.warnings[0]
+    assert not server.windows
+
+
+def test_documents_which_do_not_fit_their_schema_are_reported(app, server, schema_path, tmp_path):
+    from PyQt5 import QtCore, QtWidgets
+    from qtjsonschema.__main__ import MainWindow
+
+    document_path = tmp_path / "document.json"
+    document_path.write_text(json.dumps(["not", "an", "object"]))
+
+    send(server, {"schema": schema_path, "json_files": [str(document_path)]})
+    assert run_until(app, lambda: server.warnings)
+    assert not server.windows
+
+    # The half-built window is closed, and the server goes on serving requests
+    app.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    assert not [w for w in QtWidgets.QApplication.topLevelWidgets() if isinstance(w, MainWindow) and w.isVisible()]
+
+    send(server, {"schema": schema_path})
+    assert run_until(app, lambda: server.windows)
+
+
+def test_malformed_request_is_reported(app, server):
+    from PyQt5 import QtNetwork
+
+    socket = QtNetwork.QLocalSocket()
+    socket.connectToServer(server.name)
+    assert socket.waitForConnected(1000)
+    socket.write(b'{"schema": \n')
+    socket.flush()
+
+    assert run_until(app, lambda: server.warnings)
+    assert not server.windows
+
+
+def test_idle_connections_are_dropped(app, server):
+    from PyQt5 import QtNetwork
+
+    socket = QtNetwork.QLocalSocket()
+    socket.connectToServer(server.name)
+    assert socket.waitForConnected(1000)
+
+    # A request without its terminating newline is never complete
+    socket.write(b'{"schema": null')
+    socket.flush()
+
+    assert run_until(app, lambda: socket.state() == QtNetwork.QLocalSocket.UnconnectedState)
+    assert not server.windows
+    assert not server.warnings
@@ -0,0 +1,143 @@
+import json
+import os
+
+import pytest
+
+SCHEMA = {
+    "type": "object",
+    "title": "Record",
+    "properties": {
+        "name": {"type": "string"},
+        "tags": {"type": "array", "items": {"$ref": "#/definitions/tag"}},
+    },
+    "definitions": {
+        "tag": {"type": "string"},
+    },
+}
+
+
+@pytest.fixture
+def window(app, tmp_path):
+    from qtjsonschema.__main__ import MainWindow
+
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(SCHEMA))
+    for name in ("first", "second"):
+        (tmp_path / (name + ".json")).write_text(json.dumps({"name": name, "tags": ["a", "b"]}))
+
+    window = MainWindow()
+    window.load_schema(str(schema_path))
+    window.load_json(str(tmp_path / "first.json"))
+    window.load_json(str(tmp_path / "second.json"), new_document=True)
+
+    yield window
+
+    window.close()
+    window.deleteLater()
+
+
+def get_roots(window):
+    return [window.documents.widget(i).schema_widget for i in range(window.documents.count())]
+
+
+def test_documents_share_the_session(window):
+    first, second = get_roots(window)
+
+    assert window.documents.count() == 2
+    assert first.ctx is second.ctx
+    assert first.ctx.registry is window.session.registry
+
+    # Widgets of the same schema share its node, as the items of each array do
+    assert first.properties["name"].node is second.properties["name"].node
+    assert first.properties["tags"].node is second.properties["tags"].node
+
+
+def test_edits_apply_to_their_own_document_only(window):
+    first, second = get_roots(window)
+
+    first.properties["name"]._primitive_widget.setText("changed")
+
+    assert first.dump_json_object() == {"name": "changed", "tags": ["a", "b"]}
+    assert second.dump_json_object() == {"name": "second", "tags": ["a", "b"]}
+
+
+def test_closing_a_document_keeps_the_others(window):
+    first, second = get_roots(window)
+
+    window.close_document(0)
+    assert window.documents.count() == 1
+    assert window.schema_widget is second
+    assert second.dump_json_object() == {"name": "second", "tags": ["a", "b"]}
+
+
+@pytest.fixture
+def bundled_schema(tmp_path):
+    from qtjsonschema.bundle import crawl_schema, write_bundle
+
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps(dict(SCHEMA, properties={"name": {"$ref": "name.json"}})))
+    (tmp_path / "name.json").write_text(json.dumps({"type": "string"}))
+
+    bundle_path = tmp_path / "schema.bundle"
+    write_bundle(str(bundle_path), crawl_schema(json.loads(schema_path.read_text()), schema_path.as_uri()))
+    return str(schema_path), str(bundle_path)
+
+
+def test_replaced_sessions_close_their_bundle_once_released(bundled_schema):
+    from qtjsonschema.session import SessionCache
+
+    schema_path, bundle_path = bundled_schema
+    cache = SessionCache()
+    session = cache.get(schema_path, bundle_path=bundle_path)
+    bundle = session.bundle
+    assert cache.get(schema_path, bundle_path=bundle_path) is session
+
+    stat = os.stat(schema_path)
+    os.utime(schema_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    replacement = cache.get(schema_path, bundle_path=bundle_path)
+    assert replacement is not session
+
+    # The replaced session remains usable by those still editing its documents
+    assert not bundle._buffer.closed
+    session.registry.load_uri(bundle.root_uri.rsplit("/", 1)[0] + "/name.json")
+
+    del session
+    assert bundle._buffer.closed
+    assert not replacement.bundle._buffer.closed
+
+
+def test_closed_sessions_close_their_bundle(bundled_schema):
+    from qtjsonschema.session import SchemaSession
+
+    schema_path, bundle_path = bundled_schema
+    session = SchemaSession.from_file(schema_path, bundle_path=bundle_path)
+
+    session.close()
+    session.close()
+    assert session.bundle._buffer.closed
+
+
+def test_validator_resolves_references_relative_to_the_schema_file(tmp_path):
+    import warnings
+    from qtjsonschema.columnar import COLUMNAR_THRESHOLD
+    from qtjsonschema.session import SchemaSession
+
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_text(json.dumps({
+        "type": "object",
+        "properties": {
+            "name": {"$ref": "name.json"},
+            "rows": {"type": "array", "items": {"$ref": "#/definitions/row"}},
+        },
+        "definitions": {"row": {"type": "object", "properties": {"size": {"type": "integer"}}}},
+    }))
+    (tmp_path / "name.json").write_text(json.dumps({"type": "string"}))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        session = SchemaSession.from_file(str(schema_path))
+
+        rows = [{"size": 1}] * COLUMNAR_THRESHOLD + [{"size": "large"}]
+        errors = list(session.iter_errors({"name": 1, "rows": rows}))
+
+    assert [list(e.path) for e in errors] == [["name"], ["rows", COLUMNAR_THRESHOLD, "size"]]
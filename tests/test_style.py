@@ -0,0 +1,131 @@
+import pytest
+
+
+@pytest.fixture
+def styled_app(app):
+    from qtjsonschema.style import install_stylesheet
+
+    stylesheet = app.styleSheet()
+    install_stylesheet(app)
+    yield app
+    app.setStyleSheet(stylesheet)
+
+
+@pytest.fixture
+def form(styled_app):
+    from PyQt5 import QtWidgets
+
+    form = QtWidgets.QWidget()
+    form.label = QtWidgets.QLabel("Name", form)
+    form.line_edit = QtWidgets.QLineEdit(form)
+    form.show()
+    styled_app.processEvents()
+
+    yield form
+
+    form.close()
+    form.deleteLater()
+
+
+def text_colour(widget):
+    from PyQt5 import QtGui
+    return widget.palette().color(QtGui.QPalette.WindowText).name()
+
+
+def base_colour(widget):
+    from PyQt5 import QtGui
+    return widget.palette().color(QtGui.QPalette.Base).name()
+
+
+def test_stylesheet_is_installed_once(app):
+    from qtjsonschema.style import STYLESHEET, install_stylesheet
+
+    stylesheet = app.styleSheet()
+    try:
+        app.setStyleSheet("QLabel { margin: 1px; }")
+        install_stylesheet(app)
+        install_stylesheet(app)
+        assert app.styleSheet() == "QLabel { margin: 1px; }" + STYLESHEET
+    finally:
+        app.setStyleSheet(stylesheet)
+
+
+def test_state_styles_the_widget(form):
+    from qtjsonschema.style import INVALID_COLOUR, VALID_COLOUR, set_state
+
+    set_state(form.label, "invalid")
+    set_state(form.line_edit, "valid")
+    assert text_colour(form.label) == "#ff0000"
+    assert base_colour(form.line_edit) == VALID_COLOUR
+
+    set_state(form.line_edit, "invalid")
+    assert base_colour(form.line_edit) == INVALID_COLOUR
+
+    set_state(form.label, "unsupported")
+    assert form.label.font().italic()
+    assert text_colour(form.label) != "#ff0000"
+
+
+def test_required_styles_the_labels_of_the_widget(form):
+    from qtjsonschema.style import set_required
+
+    set_required(form, True)
+    assert form.property("required") is True
+    assert form.label.font().bold()
+
+    set_required(form, False)
+    assert not form.label.font().bold()
+
+
+def test_heading_and_difference_styles(form, styled_app):
+    from PyQt5 import QtGui, QtWidgets
+    from qtjsonschema.style import DIFFERENT_COLOUR, set_different, set_heading
+
+    heading = QtWidgets.QLabel("Heading", form)
+    set_heading(heading)
+    heading.show()
+    styled_app.processEvents()
+    assert heading.font().bold()
+    assert not form.label.font().bold()
+
+    set_different(form, True)
+    assert form.palette().color(QtGui.QPalette.Window).name() == DIFFERENT_COLOUR
+
+    set_different(form, False)
+    assert form.palette().color(QtGui.QPalette.Window).name() != DIFFERENT_COLOUR
+
+
+def test_widgets_are_repolished_only_when_their_state_changes(form, monkeypatch):
+    from qtjsonschema import style
+
+    repolished = []
+    monkeypatch.setattr(style, "_repolish", repolished.append)
+
+    style.set_state(form.label, "valid")
+    style.set_state(form.label, "valid")
+    assert repolished == [form.label]
+
+    style.set_required(form, False)
+    assert repolished == [form.label, form, form.label]
+    style.set_required(form, False)
+    assert len(repolished) == 3
+
+
+def test_validation_state_of_string_widgets(styled_app):
+    from qtjsonschema.style import INVALID_COLOUR, VALID_COLOUR
+    from qtjsonschema.widgets import create_widget
+
+    widget = create_widget("root", {"type": "string", "minLength": 3})
+    widget.show()
+    line_edit = widget._primitive_widget
+
+    line_edit.setText("ab")
+    assert line_edit.property("state") == "invalid"
+    assert base_colour(line_edit) == INVALID_COLOUR
+
+    line_edit.setText("abc")
+    assert line_edit.property("state") == "valid"
+    assert base_colour(line_edit) == VALID_COLOUR
+
+    widget.close()
+    widget.deleteLater()
@@ -0,0 +1,98 @@
+import gc
+import weakref
+
+import pytest
+
+from qtjsonschema.tools import Context, SchemaCache, URILoaderRegistry, get_reference
+
+
+def test_equal_contexts_are_shared():
+    registry = URILoaderRegistry()
+    ctx = Context("file:///schemas/root.json", registry)
+
+    assert Context("file:///schemas/" + "root.json", registry) is ctx
+    assert ctx.follow_uri("root.json") is ctx
+    assert ctx.follow_uri("#/definitions/a") is not ctx
+
+    assert Context("file:///schemas/root.json", URILoaderRegistry()) is not ctx
+
+
+def test_contexts_are_immutable():
+    ctx = Context("#", URILoaderRegistry())
+
+    with pytest.raises(AttributeError):
+        ctx.scope_uri = "other"
+    with pytest.raises(AttributeError):
+        ctx.extra = None
+
+
+def test_unused_contexts_are_released():
+    registry = URILoaderRegistry()
+    ctx_ref = weakref.ref(Context("file:///schemas/unused.json", registry))
+    gc.collect()
+
+    assert ctx_ref() is None
+
+
+def test_references_are_shared():
+    reference = get_reference("definitions/a~1b/c~0d")
+
+    assert get_reference("definitions/a~1b/c~0d") is reference
+    assert reference.elements == ("definitions", "a/b", "c~d")
+    assert reference.extract({"definitions": {"a/b": {"c~d": 1}}}) == 1
+
+
+def test_schema_cache_identifies_objects():
+    cache = SchemaCache()
+    schema = {"enum": [1, 2]}
+    calls = []
+
+    def create(obj):
+        calls.append(obj)
+        return len(obj["enum"])
+
+    assert cache.get("count", schema, create) == 2
+    assert cache.get("count", schema, create) == 2
+    assert calls == [schema]
+
+    # Equal objects and other kinds are distinct
+    cache.get("count", dict(schema), create)
+    cache.get("other", schema, create)
+    assert len(calls) == 3
+    assert len(cache) == 3
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_registries_have_their_own_caches():
+    assert URILoaderRegistry().schema_cache is not URILoaderRegistry().schema_cache
+
+
+def test_widgets_of_the_same_schema_share_its_node(app, tmp_path):
+    import json
+    from qtjsonschema.widgets import create_widget
+
+    # Items have their own `id` scope, from which they dereference a definition
+    item_schema = {
+        "id": "item.json",
+        "type": "object",
+        "properties": {"name": {"type": "string"}, "position": {"$ref": "#/definitions/position"}},
+        "definitions": {"position": {"type": "object", "properties": {"x": {"type": "number"}}}},
+    }
+    (tmp_path / "item.json").write_text(json.dumps(item_schema))
+    schema_path = tmp_path / "root.json"
+    schema = {"type": "array", "items": item_schema}
+    schema_path.write_text(json.dumps(schema))
+
+    widget = create_widget("root", schema, schema_path.as_uri())
+    widget.load_json_object([{"name": str(i), "position": {"x": i}} for i in range(3)])
+    items = list(widget.iter_json_children())
+
+    assert len(items) == 3
+    assert all(item.node is items[0].node for item in items)
+    assert all(item.properties["position"].node is items[0].properties["position"].node for item in items)
+    assert items[0].properties["position"].ctx is items[0].ctx
+    assert items[0].properties["position"].schema == item_schema["definitions"]["position"]
+
+    widget.deleteLater()
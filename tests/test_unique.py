@@ -0,0 +1,61 @@
+from qtjsonschema.hashing import hash_json_value
+from qtjsonschema.unique import UniqueItemIndex
+
+
+def duplicates(index, items):
+    return [item for item in items if index.is_duplicate(item)]
+
+
+def test_duplicates_are_tracked_as_items_change():
+    index = UniqueItemIndex()
+    index.set("a", hash_json_value(1))
+    index.set("b", hash_json_value(2))
+    assert index.duplicate_count == 0
+
+    # The first duplicate marks both items
+    assert set(index.set("c", hash_json_value(1))) == {"a", "c"}
+    assert duplicates(index, "abc") == ["a", "c"]
+    assert index.duplicate_count == 1
+
+    index.set("b", hash_json_value(1))
+    assert duplicates(index, "abc") == ["a", "b", "c"]
+    assert index.duplicate_count == 2
+
+    # Changing a value away reports the items sharing the old and the new value
+    assert set(index.set("a", hash_json_value(3))) == {"a"}
+    assert duplicates(index, "abc") == ["b", "c"]
+    assert set(index.set("b", hash_json_value(3))) == {"a", "b", "c"}
+    assert duplicates(index, "abc") == ["a", "b"]
+    assert index.duplicate_count == 1
+
+
+def test_unchanged_value_affects_nothing():
+    index = UniqueItemIndex()
+    index.set("a", hash_json_value({"x": 1}))
+    assert index.set("a", hash_json_value({"x": 1})) == []
+
+
+def test_removing_items():
+    index = UniqueItemIndex()
+    for item in "abc":
+        index.set(item, hash_json_value([]))
+    assert index.duplicate_count == 2
+
+    assert index.remove("a") == ["a"]
+    assert set(index.remove("b")) == {"b", "c"}
+    assert not index.is_duplicate("c")
+    assert index.duplicate_count == 0
+
+    assert "b" not in index
+    assert index.remove("b") == []
+    assert not index.is_duplicate("b")
+
+
+def test_clear():
+    index = UniqueItemIndex()
+    index.set("a", hash_json_value(1))
+    index.set("b", hash_json_value(1))
+    index.clear()
+
+    assert "a" not in index
+    assert index.duplicate_count == 0
@@ -0,0 +1,149 @@
+import time
+
+import pytest
+
+from qtjsonschema import validators
+from qtjsonschema.errors import ValidationError
+from qtjsonschema.validators import PatternEvaluator, PatternUnavailableError, RegexValidator
+
+# Backtracks catastrophically when searched in text of many "a"s not followed by "b"
+SLOW_PATTERN = "(a+)+b"
+SLOW_TEXT = "a" * 40
+
+
+@pytest.fixture
+def evaluator():
+    evaluator = PatternEvaluator(timeout=0.5)
+    yield evaluator
+    evaluator.restart()
+
+
+def wait(pending, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not pending.ready():
+        assert time.monotonic() < deadline, "Search did not complete"
+        time.sleep(0.01)
+    return pending
+
+
+class NeverStartingPool:
+    """Pool whose worker never starts"""
+
+    def __init__(self, processes):
+        pass
+
+    def apply_async(self, func, args, callback=None):
+        return NeverReadyResult()
+
+    def terminate(self):
+        pass
+
+
+class NeverReadyResult:
+    def ready(self):
+        return False
+
+
+class Context:
+    def __init__(self, pool_class):
+        self.Pool = pool_class
+
+
+def failing_pool(processes):
+    raise RuntimeError("An attempt has been made to start a new process before the current process has finished "
+                       "its bootstrapping phase.")
+
+
+def test_patterns_are_searched_for_anywhere_in_text():
+    validator = RegexValidator("b+")
+    validator("abbc")
+    validator("b")
+
+    for text in ("", "ac"):
+        with pytest.raises(ValidationError):
+            validator(text)
+
+    with pytest.raises(ValidationError):
+        RegexValidator("^b")("ab")
+
+
+def test_submitted_validation_matches_synchronous_validation(evaluator):
+    validator = RegexValidator("b+", evaluator)
+
+    wait(validator.submit("abbc")).validate()
+    with pytest.raises(ValidationError):
+        wait(validator.submit("ac")).validate()
+
+
+def test_unresponsive_search_times_out_and_queued_search_is_resubmitted(evaluator):
+    # Started before the slow search is submitted, so that it is timed from its submission
+    wait(evaluator.submit("a", "a"))
+    generation = evaluator.generation
+
+    slow = evaluator.submit(SLOW_PATTERN, SLOW_TEXT)
+    queued = evaluator.submit("b", "abc")
+
+    wait(slow)
+    with pytest.raises(TimeoutError):
+        slow.found()
+    assert evaluator.generation == generation + 1
+
+    # The search queued behind the slow search was abandoned by the restart, and is evaluated by the new worker
+    assert wait(queued).found()
+
+
+def test_search_fails_if_worker_cannot_start(evaluator, monkeypatch):
+    monkeypatch.setattr(validators.multiprocessing, "get_context", lambda method: Context(failing_pool))
+
+    search = evaluator.submit("b", "abc")
+    assert search.ready()
+    with pytest.raises(PatternUnavailableError):
+        search.found()
+    assert not evaluator.available
+
+    # Valid text too is reported, as the pattern is not evaluated in the calling thread
+    with pytest.raises(ValidationError, match="could not be evaluated"):
+        RegexValidator("b", evaluator).submit("abc").validate()
+
+
+def test_search_fails_if_worker_does_not_start_in_time(monkeypatch):
+    monkeypatch.setattr(validators.multiprocessing, "get_context", lambda method: Context(NeverStartingPool))
+    evaluator = PatternEvaluator(timeout=0.5, start_timeout=0.1)
+
+    search = evaluator.submit("b", "abc")
+    assert not search.ready()
+
+    with pytest.raises(PatternUnavailableError):
+        wait(search, timeout=5).found()
+    assert not evaluator.available
+
+
+def test_formatter_queues_only_the_latest_value(app, evaluator):
+    from PyQt5 import QtWidgets
+    from qtjsonschema.validators import ValidationFormatter
+
+    wait(evaluator.submit("a", "a"))
+
+    submitted = []
+    apply = evaluator.apply
+    evaluator.apply = lambda pattern, text: submitted.append(text) or apply(pattern, text)
+
+    widget = QtWidgets.QLineEdit()
+    formatter = ValidationFormatter(widget)
+    formatter.add_validator(RegexValidator(SLOW_PATTERN, evaluator))
+
+    # Typed while the search of the first value occupies the worker
+    for length in range(len(SLOW_TEXT), len(SLOW_TEXT) + 10):
+        formatter("a" * length)
+    formatter("ab")
+    assert submitted == [SLOW_TEXT]
+
+    deadline = time.monotonic() + 30
+    while formatter._is_waiting():
+        assert time.monotonic() < deadline, "Validation did not complete"
+        app.processEvents()
+        time.sleep(0.01)
+
+    # The slow search timed out, and only the latest value was searched after it
+    assert submitted == [SLOW_TEXT, "ab"]
+    assert widget.property("state") == "valid"